@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+
+T = TypeVar("T")
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when a request arrives while the inference queue is at its limit."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Inference queue is full, retry later")
+        self.retry_after = retry_after
+
+
+class BoundedInferenceExecutor:
+    """Dedicated inference threads with an explicit admission limit.
+
+    At most ``workers`` calls run and at most ``max_queue`` more wait; anything
+    beyond that is rejected immediately with ``InferenceQueueFull`` so latency
+    stays bounded instead of growing with the backlog.
+    """
+
+    def __init__(self, workers: int = 8, max_queue: int = 32) -> None:
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fer-infer")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._avg_service_sec = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            if self._admitted >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise InferenceQueueFull(self._retry_after())
+            self._admitted += 1
+
+        try:
+            future = self._executor.submit(self._call, fn, args, kwargs)
+        except RuntimeError:
+            # Executor already shut down.
+            self._release()
+            raise
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # The caller went away (client disconnect) or shutdown dropped the
+            # job. If _call never started, its finally will not free the slot.
+            if future.cancel():
+                self._release()
+            raise
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_service_ms": round(self._avg_service_sec * 1000.0, 3),
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _call(self, fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._running -= 1
+                self._admitted -= 1
+                self._completed += 1
+                # Exponential moving average keeps the Retry-After estimate current.
+                self._avg_service_sec = (
+                    elapsed if self._completed == 1 else 0.9 * self._avg_service_sec + 0.1 * elapsed
+                )
+
+    def _release(self) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def _retry_after(self) -> int:
+        backlog = self._admitted - self._running + 1
+        return max(1, math.ceil(backlog * self._avg_service_sec / self.workers))
@@ -0,0 +1,229 @@
+"""Interchangeable face detectors and emotion classifiers.
+
+Detectors take a BGR frame and return ``(x, y, w, h)`` boxes; classifiers
+take preprocessed ``(n, h, w)`` float32 crops (see ``preprocessing``) and
+return ``(n, 7)`` scores in ``EMOTION_LABELS`` order. ``EmotionModelService``
+picks one of each by name, so the heavy runtimes (TensorFlow, PyTorch, ONNX
+Runtime) are only imported for the backends actually in use.
+
+Export the bundled Keras model to ONNX (and an int8 copy) from the service
+folder with:
+    python backends.py --export-onnx models
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+from importlib import resources
+from pathlib import Path
+from typing import Any
+
+import cv2
+import numpy as np
+
+from timeline import EMOTION_LABELS
+
+
+DNN_MIN_CONFIDENCE = float(os.getenv("FER_DNN_MIN_CONFIDENCE", "0.5"))
+ONNX_THREADS = int(os.getenv("FER_ONNX_THREADS", "0"))
+
+HAAR_SCALE_FACTOR = 1.1
+HAAR_MIN_NEIGHBORS = 5
+HAAR_MIN_FACE_PX = 50
+DNN_PROTOTXT = "deploy.prototxt"
+DNN_CAFFEMODEL = "res10_300x300_ssd_iter_140000.caffemodel"
+DNN_INPUT_SIZE = (300, 300)
+DNN_MEAN = (104.0, 177.0, 123.0)
+ONNX_MODEL = "emotion_model.onnx"
+ONNX_INT8_MODEL = "emotion_model.int8.onnx"
+
+
+def keras_model_path() -> Path:
+    return Path(str(resources.files("fer") / "data" / "emotion_model.hdf5"))
+
+
+class HaarDetector:
+    """OpenCV Haar cascade with the parameters ``fer.FER(mtcnn=False)`` uses."""
+
+    name = "haar"
+    requires: tuple[str, ...] = ()
+
+    def __init__(self, model_dir: Path) -> None:
+        self._cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        if self._cascade.empty():
+            raise RuntimeError("OpenCV Haar cascade for frontal faces could not be loaded")
+
+    def detect(self, frame: np.ndarray) -> list[tuple[int, int, int, int]]:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = self._cascade.detectMultiScale(
+            gray,
+            scaleFactor=HAAR_SCALE_FACTOR,
+            minNeighbors=HAAR_MIN_NEIGHBORS,
+            flags=cv2.CASCADE_SCALE_IMAGE,
+            minSize=(HAAR_MIN_FACE_PX, HAAR_MIN_FACE_PX),
+        )
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class DnnSSDDetector:
+    """OpenCV DNN ResNet-10 SSD (``res10_300x300``) face detector.
+
+    Needs ``deploy.prototxt`` and ``res10_300x300_ssd_iter_140000.caffemodel``
+    in the model folder; boxes scoring below ``FER_DNN_MIN_CONFIDENCE`` are
+    dropped.
+    """
+
+    name = "dnn"
+    requires: tuple[str, ...] = ()
+
+    def __init__(self, model_dir: Path) -> None:
+        prototxt, caffemodel = model_dir / DNN_PROTOTXT, model_dir / DNN_CAFFEMODEL
+        missing = [path.name for path in (prototxt, caffemodel) if not path.exists()]
+        if missing:
+            raise FileNotFoundError(f"DNN face detector files missing from {model_dir}: {', '.join(missing)}")
+        self._net = cv2.dnn.readNetFromCaffe(str(prototxt), str(caffemodel))
+        self.min_confidence = DNN_MIN_CONFIDENCE
+
+    def detect(self, frame: np.ndarray) -> list[tuple[int, int, int, int]]:
+        height, width = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(
+            cv2.resize(frame, DNN_INPUT_SIZE, interpolation=cv2.INTER_AREA), 1.0, DNN_INPUT_SIZE, DNN_MEAN
+        )
+        self._net.setInput(blob)
+        detections = self._net.forward()[0, 0]
+        detections = detections[detections[:, 2] >= self.min_confidence]
+
+        boxes = []
+        corners = np.clip(detections[:, 3:7], 0.0, 1.0) * (width, height, width, height)
+        for x1, y1, x2, y2 in corners.astype(int):
+            if x2 > x1 and y2 > y1:
+                boxes.append((int(x1), int(y1), int(x2 - x1), int(y2 - y1)))
+        return boxes
+
+
+class MTCNNDetector:
+    """facenet-pytorch MTCNN, configured and called exactly as ``fer.FER`` does."""
+
+    name = "mtcnn"
+    requires = ("torch", "facenet_pytorch")
+
+    def __init__(self, model_dir: Path) -> None:
+        import torch
+        from facenet_pytorch import MTCNN
+
+        device = torch.device("cuda") if torch.cuda.is_available() else None
+        self._mtcnn = MTCNN(keep_all=True, device=device)
+
+    def detect(self, frame: np.ndarray) -> list[tuple[int, int, int, int]]:
+        # fer feeds the BGR frame straight to MTCNN; doing the same keeps the
+        # boxes identical to the previous detector.
+        boxes, _ = self._mtcnn.detect(frame)
+        if not isinstance(boxes, np.ndarray):
+            return []
+        return [
+            (int(x1), int(y1), int(x2) - int(x1), int(y2) - int(y1))
+            for x1, y1, x2, y2 in boxes
+        ]
+
+
+class KerasClassifier:
+    """The Keras emotion model bundled with ``fer``, run on TensorFlow."""
+
+    name = "keras"
+    requires = ("tensorflow",)
+
+    def __init__(self, model_dir: Path) -> None:
+        from tensorflow.keras.models import load_model
+
+        self._model = load_model(str(keras_model_path()), compile=False)
+        self.input_size = tuple(int(v) for v in self._model.input_shape[1:3])
+        self.labels = dict(enumerate(EMOTION_LABELS))
+
+    def classify(self, faces: np.ndarray) -> np.ndarray:
+        return np.asarray(self._model(faces[..., np.newaxis], training=False))
+
+
+class OnnxClassifier:
+    """The same emotion model exported to ONNX and run on ONNX Runtime."""
+
+    name = "onnx"
+    requires = ("onnxruntime",)
+    model_file = ONNX_MODEL
+
+    def __init__(self, model_dir: Path) -> None:
+        import onnxruntime as ort
+
+        path = model_dir / self.model_file
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found; create it with `python backends.py --export-onnx {model_dir}`")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if ONNX_THREADS > 0:
+            options.intra_op_num_threads = ONNX_THREADS
+        self._session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.input_size = tuple(int(v) for v in model_input.shape[1:3])
+        self.labels = dict(enumerate(EMOTION_LABELS))
+
+    def classify(self, faces: np.ndarray) -> np.ndarray:
+        batch = np.ascontiguousarray(faces[..., np.newaxis], dtype=np.float32)
+        return self._session.run(None, {self._input_name: batch})[0]
+
+
+class OnnxInt8Classifier(OnnxClassifier):
+    """ONNX export with int8 weights (dynamic quantization)."""
+
+    name = "onnx-int8"
+    model_file = ONNX_INT8_MODEL
+
+
+DETECTORS = {cls.name: cls for cls in (MTCNNDetector, HaarDetector, DnnSSDDetector)}
+CLASSIFIERS = {cls.name: cls for cls in (KerasClassifier, OnnxClassifier, OnnxInt8Classifier)}
+
+
+def resolve(registry: dict[str, type], name: str, kind: str) -> type:
+    try:
+        return registry[name.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown {kind} backend {name!r}; choose one of: {', '.join(registry)}") from None
+
+
+def import_runtimes(*backends: type) -> None:
+    """Import the runtimes the given backend classes need, e.g. to time them."""
+    for backend in backends:
+        for module in backend.requires:
+            importlib.import_module(module)
+
+
+def export_onnx(model_dir: Path, opset: int = 13) -> dict[str, Any]:
+    """Convert the bundled Keras model to ONNX and write an int8 copy next to it."""
+    import tensorflow as tf
+    import tf2onnx
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from tensorflow.keras.models import load_model
+
+    model_dir.mkdir(parents=True, exist_ok=True)
+    model = load_model(str(keras_model_path()), compile=False)
+    signature = (tf.TensorSpec((None, *model.input_shape[1:]), tf.float32, name="faces"),)
+    fp32_path, int8_path = model_dir / ONNX_MODEL, model_dir / ONNX_INT8_MODEL
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=opset, output_path=str(fp32_path))
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    return {
+        ONNX_MODEL: fp32_path.stat().st_size,
+        ONNX_INT8_MODEL: int8_path.stat().st_size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model backend utilities")
+    parser.add_argument("--export-onnx", type=Path, metavar="DIR", required=True, help="Folder for the ONNX models")
+    args = parser.parse_args()
+    for name, size in export_onnx(args.export_onnx).items():
+        print(f"{name}: {size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
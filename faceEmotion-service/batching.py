@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import numpy as np
+
+
+@dataclass
+class _PendingFaces:
+    faces: np.ndarray
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """Coalesce face crops from concurrent requests into one classifier pass.
+
+    Callers hand in a ``(n, h, w)`` batch of crops and block on a future. A
+    single worker thread waits up to ``max_wait_ms`` after the first pending
+    request (or until ``max_batch_size`` crops are queued), runs one stacked
+    forward pass and hands every caller back its own rows. ``observe``, if
+    given, receives ``("batch_wait", seconds)`` per request and
+    ``("classify", seconds)`` per forward pass.
+    """
+
+    def __init__(
+        self,
+        classify: Callable[[np.ndarray], Any],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        name: str = "fer-batcher",
+        observe: Callable[[str, float], None] | None = None,
+    ) -> None:
+        self.classify = classify
+        self.observe = observe
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_sec = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue: queue.Queue[_PendingFaces | None] = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._faces = 0
+        self._max_batch_seen = 0
+        self._wait_total_sec = 0.0
+        self._wait_max_sec = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, faces: np.ndarray) -> Future:
+        pending = _PendingFaces(faces=faces)
+        if not len(faces):
+            pending.future.set_result(np.empty((0, 0), dtype=np.float32))
+            return pending.future
+        self._queue.put(pending)
+        return pending.future
+
+    def classify_faces(self, faces: np.ndarray) -> np.ndarray:
+        return self.submit(faces).result()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            batches = self._batches
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait_sec * 1000.0, 3),
+                "batches": batches,
+                "requests": self._requests,
+                "faces": self._faces,
+                "avg_batch_size": round(self._faces / batches, 3) if batches else 0.0,
+                "max_batch_seen": self._max_batch_seen,
+                "avg_queue_wait_ms": (
+                    round(self._wait_total_sec * 1000.0 / self._requests, 3) if self._requests else 0.0
+                ),
+                "max_queue_wait_ms": round(self._wait_max_sec * 1000.0, 3),
+                "queued": self._queue.qsize(),
+            }
+
+    def _collect(self, first: _PendingFaces) -> tuple[list[_PendingFaces], bool]:
+        batch = [first]
+        size = len(first.faces)
+        deadline = time.perf_counter() + self.max_wait_sec
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                return batch, True
+            batch.append(pending)
+            size += len(pending.faces)
+        return batch, False
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch, closing = self._collect(first)
+            started = time.perf_counter()
+            try:
+                stacked = batch[0].faces if len(batch) == 1 else np.concatenate([p.faces for p in batch])
+                predictions = np.asarray(self.classify(stacked), dtype=np.float32)
+                forward_sec = time.perf_counter() - started
+            except Exception as exc:
+                forward_sec = None
+                for pending in batch:
+                    pending.future.set_exception(exc)
+            else:
+                offset = 0
+                for pending in batch:
+                    count = len(pending.faces)
+                    pending.future.set_result(predictions[offset:offset + count])
+                    offset += count
+
+            waits = [started - pending.enqueued_at for pending in batch]
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._faces += sum(len(p.faces) for p in batch)
+                self._max_batch_seen = max(self._max_batch_seen, sum(len(p.faces) for p in batch))
+                self._wait_total_sec += sum(waits)
+                self._wait_max_sec = max(self._wait_max_sec, max(waits))
+            if self.observe is not None:
+                for wait in waits:
+                    self.observe("batch_wait", wait)
+                if forward_sec is not None:
+                    self.observe("classify", forward_sec)
+
+            if closing:
+                return
@@ -0,0 +1,20 @@
+"""Latency summaries shared by the benchmark scripts (no model imports)."""
+
+from __future__ import annotations
+
+import statistics
+
+
+def summarize(latencies: list[float], percentiles: tuple[int, ...] = (50, 95)) -> dict[str, float]:
+    """``p<N>_ms`` for each percentile: the median for 50, nearest rank otherwise."""
+    latencies = sorted(latencies)
+    summary = {}
+    for percentile in percentiles:
+        if not latencies:
+            value = 0.0
+        elif percentile == 50:
+            value = statistics.median(latencies)
+        else:
+            value = latencies[int(percentile / 100 * (len(latencies) - 1))]
+        summary[f"p{percentile}_ms"] = round(value, 3)
+    return summary
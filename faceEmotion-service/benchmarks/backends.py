@@ -0,0 +1,280 @@
+"""Parity and latency of the detector/classifier backends against fer.FER.
+
+The reference is ``fer.FER`` (MTCNN when available, as the service used it
+before backends existed). For every image in ``--images``:
+
+- each detector is timed and its boxes matched to the reference boxes
+  (IoU >= 0.5) to get face recall;
+- each classifier runs on the reference face crops and is compared with
+  ``FER._classify_emotions`` on the same crops: max absolute score
+  difference and top-1 agreement, plus latency at batch size 1 and with all
+  crops in one batch;
+- every detector + classifier pair runs end to end through
+  ``EmotionModelService`` and its dominant emotion is compared with
+  ``FER.detect_emotions``.
+
+With ``--check`` the script exits non-zero when a classifier drifts past
+``--max-score-diff`` or ``--min-agreement``, when the MTCNN backend finds
+fewer faces than fer, or when a requested backend fails to load.
+
+Run from the service folder:
+    python -m benchmarks.backends --images path/to/faces --repeat 5 --check
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from backends import CLASSIFIERS, DETECTORS
+from benchmarks._stats import summarize
+from benchmarks.resolution_ladder import load_images
+from emotion_service import EmotionModelService
+from preprocessing import prepare_faces
+
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+INT8_CLASSIFIERS = {"onnx-int8"}
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> tuple[Any, list[float]]:
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    return result, latencies
+
+
+def iou(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    inter_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
+
+
+def load_reference(images: list[np.ndarray]) -> dict[str, Any]:
+    from fer.fer import FER
+
+    try:
+        fer = FER(mtcnn=True)
+    except Exception:
+        fer = FER(mtcnn=False)
+
+    boxes, crops, dominant = [], [], []
+    for image in images:
+        found = fer.detect_emotions(image)
+        boxes.append([tuple(int(v) for v in face["box"]) for face in found])
+        faces, _ = prepare_faces(image, boxes[-1])
+        crops.append(faces)
+        if found:
+            best = max(found, key=lambda face: max(face["emotions"].values()))
+            dominant.append(max(best["emotions"], key=best["emotions"].get))
+        else:
+            dominant.append(None)
+
+    stacked = np.concatenate(crops) if crops else np.empty((0, 64, 64), dtype=np.float32)
+    scores = np.asarray(fer._classify_emotions(stacked), dtype=np.float32) if len(stacked) else stacked
+    return {"boxes": boxes, "crops": crops, "faces": stacked, "scores": scores, "dominant": dominant}
+
+
+def backend_reference(images: list[np.ndarray], detector: str, classifier: str) -> dict[str, Any]:
+    """Same shape as ``load_reference``, with one of this service's backend pairs as the reference."""
+    detector_backend = DETECTORS[detector](SERVICE_ROOT / "models")
+    classifier_backend = CLASSIFIERS[classifier](SERVICE_ROOT / "models")
+
+    boxes, crops, dominant = [], [], []
+    for image in images:
+        faces, kept = prepare_faces(image, detector_backend.detect(image))
+        boxes.append(kept)
+        crops.append(faces)
+        if len(faces):
+            scores = np.asarray(classifier_backend.classify(faces), dtype=np.float32)
+            dominant.append(classifier_backend.labels[int(scores[scores.max(axis=1).argmax()].argmax())])
+        else:
+            dominant.append(None)
+
+    stacked = np.concatenate(crops) if crops else np.empty((0, 64, 64), dtype=np.float32)
+    scores = np.asarray(classifier_backend.classify(stacked), dtype=np.float32) if len(stacked) else stacked
+    return {"boxes": boxes, "crops": crops, "faces": stacked, "scores": scores, "dominant": dominant}
+
+
+def bench_detector(name: str, images: list[np.ndarray], reference: dict[str, Any], repeat: int) -> dict[str, Any]:
+    detector = DETECTORS[name](SERVICE_ROOT / "models")
+    latencies: list[float] = []
+    expected = matched = 0
+    for image, reference_boxes in zip(images, reference["boxes"]):
+        boxes, runs = timed(lambda: detector.detect(image), repeat)
+        latencies.extend(runs)
+        expected += len(reference_boxes)
+        matched += sum(1 for ref in reference_boxes if any(iou(ref, box) >= 0.5 for box in boxes))
+    return {"detector": name, "face_recall": round(matched / expected, 4) if expected else None, **summarize(latencies)}
+
+
+def bench_classifier(name: str, reference: dict[str, Any], repeat: int) -> dict[str, Any]:
+    classifier = CLASSIFIERS[name](SERVICE_ROOT / "models")
+    faces, expected = reference["faces"], reference["scores"]
+    if not len(faces):
+        return {"classifier": name, "faces": 0}
+
+    scores, batch_runs = timed(lambda: np.asarray(classifier.classify(faces), dtype=np.float32), repeat)
+    single_runs: list[float] = []
+    for index in range(len(faces)):
+        _, runs = timed(lambda: classifier.classify(faces[index:index + 1]), repeat)
+        single_runs.extend(runs)
+
+    return {
+        "classifier": name,
+        "faces": len(faces),
+        "max_score_diff": round(float(np.abs(scores - expected).max()), 6),
+        "top1_agreement": round(float(np.mean(scores.argmax(axis=1) == expected.argmax(axis=1))), 4),
+        "single": summarize(single_runs),
+        "batch": summarize([run / len(faces) for run in batch_runs]),
+    }
+
+
+def bench_pipeline(
+    detector: str, classifier: str, images: list[np.ndarray], reference: dict[str, Any], repeat: int
+) -> dict[str, Any]:
+    service = EmotionModelService(
+        SERVICE_ROOT, batch_max_wait_ms=0, workers=0, detector=detector, classifier=classifier, cache_mb=0
+    )
+    try:
+        service.warm_up()
+        latencies: list[float] = []
+        agreed = with_faces = 0
+        for image, expected in zip(images, reference["dominant"]):
+            frame = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes()
+            prediction, runs = timed(lambda: service.predict_from_bytes(frame, detect_side=0), repeat)
+            latencies.extend(runs)
+            if expected is not None:
+                with_faces += 1
+                agreed += prediction["faces_detected"] > 0 and prediction["emotion"] == expected
+        return {
+            "pipeline": service.detector_name,
+            "emotion_agreement": round(agreed / with_faces, 4) if with_faces else None,
+            **summarize(latencies),
+            "timings": service.timings,
+        }
+    finally:
+        service.close()
+
+
+def guarded(kind: str, name: str, fn: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    try:
+        return fn()
+    except Exception as exc:
+        return {kind: name, "error": f"{type(exc).__name__}: {exc}"}
+
+
+def run_parity(
+    images: list[np.ndarray],
+    detectors: list[str],
+    classifiers: list[str],
+    repeat: int,
+    reference: dict[str, Any],
+) -> dict[str, Any]:
+    """Every detector, classifier and detector + classifier pair against ``reference``."""
+    return {
+        "images": len(images),
+        "reference_faces": len(reference["faces"]),
+        "detectors": [guarded("detector", name, lambda: bench_detector(name, images, reference, repeat)) for name in detectors],
+        "classifiers": [guarded("classifier", name, lambda: bench_classifier(name, reference, repeat)) for name in classifiers],
+        "pipelines": [
+            guarded("pipeline", f"{detector}+{classifier}", lambda: bench_pipeline(detector, classifier, images, reference, repeat))
+            for detector in detectors
+            for classifier in classifiers
+        ],
+    }
+
+
+def failures(results: dict[str, Any], max_score_diff: float, min_agreement: float) -> list[str]:
+    problems = []
+    for section in ("detectors", "classifiers", "pipelines"):
+        for row in results[section]:
+            if "error" in row:
+                name = row.get("detector") or row.get("classifier") or row.get("pipeline")
+                problems.append(f"{name}: {row['error']}")
+    for row in results["classifiers"]:
+        if "max_score_diff" not in row:
+            continue
+        if row["top1_agreement"] < min_agreement:
+            problems.append(f"{row['classifier']}: top-1 agreement {row['top1_agreement']} < {min_agreement}")
+        if row["classifier"] not in INT8_CLASSIFIERS and row["max_score_diff"] > max_score_diff:
+            problems.append(f"{row['classifier']}: max score diff {row['max_score_diff']} > {max_score_diff}")
+    for row in results["detectors"]:
+        if row.get("detector") == "mtcnn" and row.get("face_recall") not in (None, 1.0):
+            problems.append(f"mtcnn: face recall {row['face_recall']} against fer")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, required=True, help="Folder of face photos (jpg/png)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per image and backend")
+    parser.add_argument("--detectors", default=",".join(DETECTORS), help="Comma-separated detector backends")
+    parser.add_argument("--classifiers", default=",".join(CLASSIFIERS), help="Comma-separated classifier backends")
+    parser.add_argument("--max-score-diff", type=float, default=1e-3, help="Allowed score drift for float models")
+    parser.add_argument("--min-agreement", type=float, default=0.95, help="Required top-1 agreement with fer")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when parity fails")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for machine-readable results")
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    if not images:
+        raise SystemExit(f"No images found in {args.images}")
+    detectors = [name.strip() for name in args.detectors.split(",") if name.strip()]
+    classifiers = [name.strip() for name in args.classifiers.split(",") if name.strip()]
+    repeat = max(1, args.repeat)
+
+    results = run_parity(images, detectors, classifiers, repeat, load_reference(images))
+
+    print(f"{'detector':<10} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in results["detectors"]:
+        if "error" in row:
+            print(f"{row['detector']:<10} {row['error']}")
+            continue
+        recall = "-" if row["face_recall"] is None else f"{row['face_recall']:.3f}"
+        print(f"{row['detector']:<10} {recall:>7} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+
+    print(f"\n{'classifier':<10} {'max diff':>9} {'top-1':>6} {'b1 p50':>8} {'bN p50/face':>12}")
+    for row in results["classifiers"]:
+        if "error" in row or not row.get("faces"):
+            print(f"{row['classifier']:<10} {row.get('error', 'no reference faces')}")
+            continue
+        print(
+            f"{row['classifier']:<10} {row['max_score_diff']:>9.5f} {row['top1_agreement']:>6.3f} "
+            f"{row['single']['p50_ms']:>8.2f} {row['batch']['p50_ms']:>12.3f}"
+        )
+
+    print(f"\n{'pipeline':<18} {'agree':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in results["pipelines"]:
+        if "error" in row:
+            print(f"{row['pipeline']:<18} {row['error']}")
+            continue
+        agreement = "-" if row["emotion_agreement"] is None else f"{row['emotion_agreement']:.3f}"
+        print(f"{row['pipeline']:<18} {agreement:>6} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.check:
+        problems = failures(results, args.max_score_diff, args.min_agreement)
+        for problem in problems:
+            print(f"FAIL {problem}", file=sys.stderr)
+        if problems:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Fixed benchmark corpus: JPEG frames at several resolutions and face counts.
+
+Frames are generated deterministically from a seed: a smooth background with
+``faces`` face photos pasted on a grid. Without face photos the frames hold
+no faces and only measure decode + detection. A corpus can be written to a
+folder (JPEGs plus ``manifest.json``) and loaded back so different commits
+are measured on byte-identical input.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "720p": (1280, 720),
+    "480p": (854, 480),
+}
+FACE_COUNTS = (0, 1, 4)
+JPEG_QUALITY = 90
+MANIFEST = "manifest.json"
+
+
+@dataclass(slots=True)
+class CorpusFrame:
+    name: str
+    resolution: str
+    faces: int
+    data: bytes
+
+    @property
+    def group(self) -> tuple[str, int]:
+        return self.resolution, self.faces
+
+
+def build_corpus(
+    face_images: list[np.ndarray],
+    resolutions: dict[str, tuple[int, int]] = RESOLUTIONS,
+    face_counts: tuple[int, ...] = FACE_COUNTS,
+    variants: int = 4,
+    seed: int = 0,
+) -> list[CorpusFrame]:
+    rng = np.random.default_rng(seed)
+    counts = face_counts if face_images else (0,)
+    frames = []
+    for resolution, (width, height) in resolutions.items():
+        for faces in counts:
+            for variant in range(variants):
+                image = _background(rng, width, height)
+                picks = rng.integers(0, len(face_images), size=faces) if face_images else []
+                _paste_faces(image, [face_images[index] for index in picks], rng)
+                data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])[1].tobytes()
+                frames.append(CorpusFrame(f"{resolution}_{faces}f_{variant}.jpg", resolution, faces, data))
+    return frames
+
+
+def save_corpus(frames: list[CorpusFrame], directory: Path) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = []
+    for frame in frames:
+        (directory / frame.name).write_bytes(frame.data)
+        entry = asdict(frame)
+        del entry["data"]
+        manifest.append(entry)
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+
+def load_corpus(directory: Path) -> list[CorpusFrame]:
+    manifest = json.loads((directory / MANIFEST).read_text())
+    return [
+        CorpusFrame(entry["name"], entry["resolution"], entry["faces"], (directory / entry["name"]).read_bytes())
+        for entry in manifest
+    ]
+
+
+def _background(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    # Upscaled low-resolution noise: textured like a room, but compresses
+    # and decodes like a camera frame rather than like white noise.
+    small = rng.integers(40, 200, size=(max(2, height // 40), max(2, width // 40), 3), dtype=np.uint8)
+    return cv2.GaussianBlur(cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC), (0, 0), 3)
+
+
+def _paste_faces(image: np.ndarray, faces: list[np.ndarray], rng: np.random.Generator) -> None:
+    if not faces:
+        return
+    height, width = image.shape[:2]
+    columns = math.ceil(math.sqrt(len(faces)))
+    rows = math.ceil(len(faces) / columns)
+    cell_w, cell_h = width // columns, height // rows
+    for index, face in enumerate(faces):
+        side = int(min(cell_w, cell_h) * rng.uniform(0.5, 0.8))
+        scale = side / max(face.shape[:2])
+        face = cv2.resize(face, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        row, column = divmod(index, columns)
+        top = row * cell_h + (cell_h - face.shape[0]) // 2
+        left = column * cell_w + (cell_w - face.shape[1]) // 2
+        image[top:top + face.shape[0], left:left + face.shape[1]] = face
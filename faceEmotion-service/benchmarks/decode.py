@@ -0,0 +1,124 @@
+"""Decode cost of JPEG frames against raw camera buffers.
+
+For each corpus resolution (1080p/720p/480p) the same frame is turned into
+what the detector and tracker need, five ways:
+
+- ``jpeg``: full-size ``IMREAD_COLOR`` decode plus grayscale;
+- ``jpeg/2``, ``jpeg/4``: ``IMREAD_REDUCED_COLOR_2`` / ``_4`` plus grayscale;
+- ``nv21``: ``wrap_pixels`` on an NV21 buffer (one YUV -> BGR conversion,
+  gray is the Y plane);
+- ``rgb``: ``wrap_pixels`` on packed RGB (gray only, the frame is a view).
+
+Each path reports p50/p95 latency and the peak bytes allocated while it runs
+(``tracemalloc`` sees numpy and OpenCV output arrays), next to the size of
+the payload a client would upload.
+
+Run from the service folder:
+    python -m benchmarks.decode --repeat 50 --json decode.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import cv2
+import numpy as np
+
+from benchmarks._stats import summarize
+from benchmarks.corpus import JPEG_QUALITY, RESOLUTIONS, build_corpus
+from preprocessing import decode_frame, wrap_pixels
+
+
+def bgr_to_nv21(frame: np.ndarray) -> bytes:
+    """Pack a BGR frame as NV21 (Y plane, then interleaved V/U at half resolution)."""
+    height, width = frame.shape[:2]
+    i420 = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420).ravel()
+    y_size, chroma = width * height, width * height // 4
+    u, v = i420[y_size:y_size + chroma], i420[y_size + chroma:]
+    vu = np.empty(chroma * 2, np.uint8)
+    vu[0::2], vu[1::2] = v, u
+    return i420[:y_size].tobytes() + vu.tobytes()
+
+
+def decode_paths(data: bytes, frame: np.ndarray) -> dict[str, tuple[int, Callable[[], Any]]]:
+    height, width = frame.shape[:2]
+    nv21 = bgr_to_nv21(frame)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB).tobytes()
+
+    def jpeg(reduce: int) -> Callable[[], Any]:
+        def run() -> Any:
+            decoded = decode_frame(data, reduce)
+            return decoded, cv2.cvtColor(decoded, cv2.COLOR_BGR2GRAY)
+
+        return run
+
+    return {
+        "jpeg": (len(data), jpeg(1)),
+        "jpeg/2": (len(data), jpeg(2)),
+        "jpeg/4": (len(data), jpeg(4)),
+        "nv21": (len(nv21), lambda: wrap_pixels(nv21, width, height, "nv21")),
+        "rgb": (len(rgb), lambda: wrap_pixels(rgb, width, height, "rgb")),
+    }
+
+
+def measure(run: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    run()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - started) * 1000.0)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = run()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    frame = result[0]
+    return {
+        **summarize(latencies),
+        "alloc_peak_kb": round(peak / 1024, 1),
+        "output_shape": list(frame.shape),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per resolution and path")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated frames")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for machine-readable results")
+    args = parser.parse_args()
+    repeat = max(1, args.repeat)
+
+    corpus = {frame.resolution: frame for frame in build_corpus([], variants=1, seed=args.seed)}
+    rows = []
+    print(f"{'res':<6} {'path':<7} {'upload KiB':>10} {'p50 ms':>8} {'p95 ms':>8} {'alloc KiB':>10} {'output':>14}")
+    for resolution in RESOLUTIONS:
+        data = corpus[resolution].data
+        frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        for path, (upload_bytes, run) in decode_paths(data, frame).items():
+            stats = measure(run, repeat)
+            rows.append({"resolution": resolution, "path": path, "upload_kb": round(upload_bytes / 1024, 1), **stats})
+            shape = "x".join(str(v) for v in stats["output_shape"][:2][::-1])
+            print(
+                f"{resolution:<6} {path:<7} {upload_bytes / 1024:>10.0f} {stats['p50_ms']:>8.2f} "
+                f"{stats['p95_ms']:>8.2f} {stats['alloc_peak_kb']:>10.0f} {shape:>14}",
+                flush=True,
+            )
+
+    if args.json:
+        args.json.write_text(
+            json.dumps({"jpeg_quality": JPEG_QUALITY, "repeat": repeat, "results": rows}, indent=2)
+        )
+
+
+if __name__ == "__main__":
+    main()
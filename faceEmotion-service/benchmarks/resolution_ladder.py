@@ -0,0 +1,122 @@
+"""Accuracy vs latency of detection resolutions at common camera inputs.
+
+Every image in ``--images`` is resized (cover + centre crop) to 1080p, 720p,
+480p and 360p, JPEG encoded, and run through ``EmotionModelService`` with the
+detector at native resolution and at each ladder rung below it. Accuracy is
+measured against the native 1080p run of the same image: whether a face was
+still found and whether the dominant emotion matched.
+
+Run from the service folder:
+    python -m benchmarks.resolution_ladder --images path/to/faces --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from benchmarks._stats import summarize
+from emotion_service import DETECT_LADDER, EmotionModelService
+
+
+INPUT_RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "720p": (1280, 720),
+    "480p": (854, 480),
+    "360p": (640, 360),
+}
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def fit_resolution(image: np.ndarray, size: tuple[int, int]) -> np.ndarray:
+    width, height = size
+    scale = max(width / image.shape[1], height / image.shape[0])
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    resized = cv2.resize(image, None, fx=scale, fy=scale, interpolation=interpolation)
+    top = (resized.shape[0] - height) // 2
+    left = (resized.shape[1] - width) // 2
+    return resized[top:top + height, left:left + width]
+
+
+def load_images(directory: Path) -> list[np.ndarray]:
+    images = []
+    for path in sorted(directory.iterdir()):
+        if path.suffix.lower() in IMAGE_SUFFIXES:
+            image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if image is not None:
+                images.append(image)
+    return images
+
+
+def run(images: list[np.ndarray], repeat: int) -> list[dict]:
+    service = EmotionModelService(Path(__file__).resolve().parents[1], batch_max_wait_ms=0, workers=0, cache_mb=0)
+    service.warm_up()
+    encoded = {
+        name: [
+            cv2.imencode(".jpg", fit_resolution(image, size), [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+            for image in images
+        ]
+        for name, size in INPUT_RESOLUTIONS.items()
+    }
+    references = [service.predict_from_bytes(frame, detect_side=0) for frame in encoded["1080p"]]
+
+    rows = []
+    for name, (width, _) in INPUT_RESOLUTIONS.items():
+        sides = [0] + [rung for rung in sorted(DETECT_LADDER, reverse=True) if rung < width]
+        for side in sides:
+            latencies: list[float] = []
+            found = agreed = 0
+            for frame, reference in zip(encoded[name], references):
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    prediction = service.predict_from_bytes(frame, detect_side=side)
+                    latencies.append((time.perf_counter() - started) * 1000.0)
+                if reference["faces_detected"]:
+                    found += bool(prediction["faces_detected"])
+                    agreed += prediction["emotion"] == reference["emotion"]
+
+            with_faces = sum(1 for reference in references if reference["faces_detected"]) or 1
+            rows.append(
+                {
+                    "input": name,
+                    "detect_side": side or width,
+                    "detect_scale": prediction["detect_scale"],
+                    **summarize(latencies),
+                    "face_recall": round(found / with_faces, 3),
+                    "emotion_agreement": round(agreed / with_faces, 3),
+                }
+            )
+    service.close()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=Path, required=True, help="Folder of face photos (jpg/png)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per image and setting")
+    parser.add_argument("--json", type=Path, default=None, help="Optional path for machine-readable results")
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    if not images:
+        raise SystemExit(f"No images found in {args.images}")
+
+    rows = run(images, max(1, args.repeat))
+    print(f"{'input':<6} {'detect':>6} {'scale':>6} {'p50 ms':>8} {'p95 ms':>8} {'recall':>7} {'agree':>7}")
+    for row in rows:
+        print(
+            f"{row['input']:<6} {row['detect_side']:>6} {row['detect_scale']:>6.3f} {row['p50_ms']:>8.2f} "
+            f"{row['p95_ms']:>8.2f} {row['face_recall']:>7.3f} {row['emotion_agreement']:>7.3f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps({"images": len(images), "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
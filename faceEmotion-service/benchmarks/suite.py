@@ -0,0 +1,341 @@
+"""Latency, throughput and memory of face emotion inference.
+
+Runs a fixed corpus (see ``benchmarks.corpus``) through
+``EmotionModelService.predict_from_bytes`` in-process and/or through the HTTP
+``predict/`` endpoint, at each requested concurrency. Every resolution and
+face-count group reports p50/p95/p99 latency, throughput, errors and the
+peak RSS of the process doing inference. Results are written as JSON tagged
+with the git commit and ``FER_*`` settings; ``--baseline`` prints the change
+against an earlier results file.
+
+HTTP requests each use a fresh session, so per-session frame dedup and face
+tracking never short-circuit inference; latency covers only the ``predict/``
+call, throughput includes the session setup around it. The prediction cache
+is disabled in-process and in a ``--spawn-server`` server; start a ``--url``
+server with ``FER_PREDICTION_CACHE_MB=0`` as well.
+
+Run from the service folder:
+    python -m benchmarks.suite --faces path/to/faces --write-corpus bench_corpus --json results.json
+    python -m benchmarks.suite --corpus bench_corpus --mode http --spawn-server --json results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import requests
+
+from benchmarks._stats import summarize
+from benchmarks.corpus import CorpusFrame, build_corpus, load_corpus, save_corpus
+from benchmarks.resolution_ladder import load_images
+
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+READY_TIMEOUT_SEC = 300
+
+
+def peak_rss_mb(pid: int | None = None) -> float | None:
+    """High-water resident memory of ``pid`` (default: this process)."""
+    try:
+        import psutil
+
+        peak = getattr(psutil.Process(pid).memory_info(), "peak_wset", None)
+        if peak is not None:
+            return round(peak / 2**20, 1)
+    except ImportError:
+        pass
+
+    status = Path(f"/proc/{pid or 'self'}/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    if pid is None:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (2**20 if sys.platform == "darwin" else 1024), 1)
+    return None
+
+
+def run_load(call: Callable[[CorpusFrame], float | None], frames: list[CorpusFrame], concurrency: int, requests_total: int) -> dict[str, Any]:
+    latencies: list[float] = []
+    errors: defaultdict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+
+    def one(index: int) -> None:
+        frame = frames[index % len(frames)]
+        started = time.perf_counter()
+        try:
+            # A call may time itself (e.g. to leave out session setup).
+            measured = call(frame)
+        except Exception as exc:
+            with lock:
+                errors[type(exc).__name__] += 1
+            return
+        elapsed = measured if measured is not None else (time.perf_counter() - started) * 1000.0
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests_total)))
+    wall = time.perf_counter() - started
+
+    return {
+        "requests": requests_total,
+        "ok": len(latencies),
+        "errors": dict(errors),
+        **summarize(latencies, (50, 95, 99)),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+    }
+
+
+class HttpTarget:
+    """``predict/`` over HTTP with one keep-alive connection per client thread."""
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._local = threading.local()
+
+    def predict(self, frame: CorpusFrame) -> float:
+        client = self._client()
+        session = client.post(f"{self.base_url}/emotions/sessions/start/", timeout=30)
+        session.raise_for_status()
+        session_id = session.json()["session"]["id"]
+        try:
+            started = time.perf_counter()
+            response = client.post(
+                f"{self.base_url}/emotions/sessions/{session_id}/predict/",
+                files={"image": (frame.name, frame.data, "image/jpeg")},
+                timeout=60,
+            )
+            elapsed = (time.perf_counter() - started) * 1000.0
+            if response.status_code == 503:
+                raise QueueFull()
+            response.raise_for_status()
+            return elapsed
+        finally:
+            client.post(f"{self.base_url}/emotions/sessions/{session_id}/end/", timeout=30)
+
+    def _client(self) -> requests.Session:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = requests.Session()
+        return client
+
+
+class QueueFull(RuntimeError):
+    """The service answered 503 (inference queue full or not ready)."""
+
+
+def spawn_server(port: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=SERVICE_ROOT,
+        env={**os.environ, "FER_PREDICTION_CACHE_MB": "0"},
+    )
+    deadline = time.monotonic() + READY_TIMEOUT_SEC
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode} before becoming ready")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/api/ready", timeout=2).status_code == 200:
+                return process
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit(f"Server not ready after {READY_TIMEOUT_SEC}s")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_mode(
+    mode: str,
+    call: Callable[[CorpusFrame], float | None],
+    frames: list[CorpusFrame],
+    concurrencies: list[int],
+    requests_per_run: int,
+    rss_pid: int | None,
+    rss_available: bool,
+) -> list[dict[str, Any]]:
+    groups: defaultdict[tuple[str, int], list[CorpusFrame]] = defaultdict(list)
+    for frame in frames:
+        groups[frame.group].append(frame)
+
+    rows = []
+    for (resolution, faces), group in groups.items():
+        for concurrency in concurrencies:
+            stats = run_load(call, group, concurrency, requests_per_run)
+            rows.append(
+                {
+                    "mode": mode,
+                    "resolution": resolution,
+                    "faces": faces,
+                    "concurrency": concurrency,
+                    **stats,
+                    "peak_rss_mb": peak_rss_mb(rss_pid) if rss_available else None,
+                }
+            )
+            print(
+                f"{mode:<9} {resolution:<6} {faces:>5} {concurrency:>4} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                f"{stats['p99_ms']:>9.2f} {stats['throughput_rps']:>8.2f} {sum(stats['errors'].values()):>6}",
+                flush=True,
+            )
+    return rows
+
+
+def environment() -> dict[str, Any]:
+    def git(*args: str) -> str | None:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=SERVICE_ROOT, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--", ".")),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {key: value for key, value in sorted(os.environ.items()) if key.startswith("FER_")},
+    }
+
+
+def compare(rows: list[dict[str, Any]], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text())
+    key = lambda row: (row["mode"], row["resolution"], row["faces"], row["concurrency"])  # noqa: E731
+    previous = {key(row): row for row in baseline["results"]}
+    print(f"\nagainst {baseline['environment'].get('commit') or baseline_path}")
+    for row in rows:
+        old = previous.get(key(row))
+        if old is None:
+            continue
+        changes = []
+        for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+            if old[metric]:
+                changes.append(f"{metric} {100.0 * (row[metric] - old[metric]) / old[metric]:+.1f}%")
+        print(f"{row['mode']:<9} {row['resolution']:<6} {row['faces']:>2}f c{row['concurrency']:<3} " + "  ".join(changes))
+
+
+def face_scaling(rows: list[dict[str, Any]]) -> None:
+    """p50 of multi-face frames relative to one-face frames; below N means sub-linear."""
+    single = {(row["mode"], row["resolution"], row["concurrency"]): row for row in rows if row["faces"] == 1}
+    lines = []
+    for row in rows:
+        base = single.get((row["mode"], row["resolution"], row["concurrency"]))
+        if row["faces"] > 1 and base is not None and base["p50_ms"]:
+            lines.append(
+                f"{row['mode']:<9} {row['resolution']:<6} {row['faces']:>2}f c{row['concurrency']:<3} "
+                f"p50 x{row['p50_ms'] / base['p50_ms']:.2f} of 1 face"
+            )
+    if lines:
+        print("\nface scaling")
+        print("\n".join(lines))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=Path, default=None, help="Face photos pasted into generated frames")
+    parser.add_argument("--corpus", type=Path, default=None, help="Load a corpus written by --write-corpus")
+    parser.add_argument("--write-corpus", type=Path, default=None, help="Save the generated corpus here")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated corpus")
+    parser.add_argument("--mode", default="inprocess", help="Comma-separated: inprocess, http")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated client concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per group and concurrency level")
+    parser.add_argument("--url", default="http://127.0.0.1:8010", help="Service URL for --mode http")
+    parser.add_argument("--spawn-server", action="store_true", help="Start uvicorn on a free port for --mode http")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID of the server, for its peak RSS")
+    parser.add_argument("--json", type=Path, default=None, help="Path for machine-readable results")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier --json output to compare against")
+    args = parser.parse_args()
+
+    if args.corpus:
+        frames = load_corpus(args.corpus)
+    else:
+        frames = build_corpus(load_images(args.faces) if args.faces else [], seed=args.seed)
+        if args.write_corpus:
+            save_corpus(frames, args.write_corpus)
+    modes = [mode.strip() for mode in args.mode.split(",") if mode.strip()]
+    concurrencies = [int(value) for value in args.concurrency.split(",") if value.strip()]
+    requests_per_run = max(1, args.requests)
+
+    print(f"{'mode':<9} {'res':<6} {'faces':>5} {'conc':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'errors':>6}")
+    rows: list[dict[str, Any]] = []
+    if "inprocess" in modes:
+        from emotion_service import EmotionModelService
+
+        # The corpus repeats frames; the prediction cache would answer them.
+        service = EmotionModelService(SERVICE_ROOT, cache_mb=0)
+
+        def predict(frame: CorpusFrame) -> None:
+            service.predict_from_bytes(frame.data)
+
+        try:
+            service.warm_up()
+            rows += run_mode(
+                "inprocess",
+                predict,
+                frames,
+                concurrencies,
+                requests_per_run,
+                None,
+                True,
+            )
+        finally:
+            service.close()
+
+    if "http" in modes:
+        server = None
+        url, server_pid = args.url, args.server_pid
+        if args.spawn_server:
+            port = free_port()
+            server = spawn_server(port)
+            url, server_pid = f"http://127.0.0.1:{port}", server.pid
+        try:
+            rows += run_mode(
+                "http",
+                HttpTarget(url).predict,
+                frames,
+                concurrencies,
+                requests_per_run,
+                server_pid,
+                server_pid is not None,
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    face_scaling(rows)
+    if args.json:
+        args.json.write_text(json.dumps({"environment": environment(), "args": vars(args), "results": rows}, indent=2, default=str))
+    if args.baseline:
+        compare(rows, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
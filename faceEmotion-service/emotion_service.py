@@ -0,0 +1,522 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Sequence
+
+import cv2
+import numpy as np
+
+from backends import CLASSIFIERS, DETECTORS, HaarDetector, import_runtimes, resolve
+from batching import MicroBatcher
+from face_tracking import FaceTrack, FaceTracker
+from metrics import observe_stage
+from prediction_cache import PredictionCache, content_key
+from preprocessing import (
+    decode_frame,
+    jpeg_size,
+    prepare_crops,
+    prepare_faces,
+    reduced_decode_factor,
+    wrap_pixels,
+)
+from resolution import ResolutionLadder
+from worker_pool import DetectorWorkerPool
+
+
+DETECTOR_BACKEND = os.getenv("FER_DETECTOR", "mtcnn")
+CLASSIFIER_BACKEND = os.getenv("FER_CLASSIFIER", "keras")
+MODEL_DIR = os.getenv("FER_MODEL_DIR", "")
+BATCH_MAX_SIZE = int(os.getenv("FER_BATCH_MAX_SIZE", "16"))
+BATCH_MAX_WAIT_MS = float(os.getenv("FER_BATCH_MAX_WAIT_MS", "10"))
+WORKER_PROCESSES = int(os.getenv("FER_WORKERS", "0"))
+WORKER_SLOTS = int(os.getenv("FER_WORKER_SLOTS", "4"))
+WORKER_SLOT_MB = int(os.getenv("FER_WORKER_SLOT_MB", "16"))
+WORKER_MAX_RESTARTS = int(os.getenv("FER_WORKER_MAX_RESTARTS", "5"))
+WORKER_RESTART_BACKOFF_SEC = float(os.getenv("FER_WORKER_RESTART_BACKOFF_SEC", "0.5"))
+TRACK_MAX_FRAMES = int(os.getenv("FER_TRACK_MAX_FRAMES", "5"))
+TRACK_MARGIN = float(os.getenv("FER_TRACK_MARGIN", "0.25"))
+TRACK_MIN_SCORE = float(os.getenv("FER_TRACK_MIN_SCORE", "0.6"))
+DETECT_LADDER = tuple(int(v) for v in os.getenv("FER_DETECT_LADDER", "320,480,640,960,1280").split(",") if v.strip())
+DETECT_START_SIDE = int(os.getenv("FER_DETECT_START_SIDE", "640"))
+DETECT_MIN_FACE_PX = int(os.getenv("FER_DETECT_MIN_FACE_PX", "80"))
+REDUCED_DECODE = os.getenv("FER_REDUCED_DECODE", "1").strip().lower() not in {"0", "false", "no"}
+DOMINANT_FACE = os.getenv("FER_DOMINANT_FACE", "confidence").strip().lower()
+PREDICTION_CACHE_MB = float(os.getenv("FER_PREDICTION_CACHE_MB", "32"))
+PREDICTION_CACHE_TTL_SEC = float(os.getenv("FER_PREDICTION_CACHE_TTL_SEC", "60"))
+DOMINANT_FACE_RULES = ("confidence", "area")
+WARMUP_TIMEOUT_SEC = float(os.getenv("FER_WARMUP_TIMEOUT_SEC", "300"))
+WARMUP_RESOLUTIONS = tuple(
+    tuple(int(part) for part in value.lower().split("x"))
+    for value in os.getenv("FER_WARMUP_RESOLUTIONS", "640x480,1280x720").split(",")
+    if value.strip()
+)
+
+
+def build_warm_service(model_root: Path, detector: str, classifier: str) -> EmotionModelService:
+    """Worker-process factory: a single-process service that is already warm.
+
+    Workers skip the prediction cache; the dispatching process has one.
+    """
+    service = EmotionModelService(
+        model_root,
+        batch_max_size=1,
+        batch_max_wait_ms=0,
+        workers=0,
+        detector=detector,
+        classifier=classifier,
+        cache_mb=0,
+    )
+    service.warm_up()
+    return service
+
+
+class EmotionModelService:
+    def __init__(
+        self,
+        model_root: Path,
+        batch_max_size: int = BATCH_MAX_SIZE,
+        batch_max_wait_ms: float = BATCH_MAX_WAIT_MS,
+        workers: int = WORKER_PROCESSES,
+        detector: str = DETECTOR_BACKEND,
+        classifier: str = CLASSIFIER_BACKEND,
+        cache_mb: float = PREDICTION_CACHE_MB,
+        cache_ttl_sec: float = PREDICTION_CACHE_TTL_SEC,
+        dominant_face: str = DOMINANT_FACE,
+    ) -> None:
+        if dominant_face not in DOMINANT_FACE_RULES:
+            raise ValueError(f"Unknown dominant face rule {dominant_face!r}; choose one of: {', '.join(DOMINANT_FACE_RULES)}")
+        self.model_root = model_root
+        self.dominant_face = dominant_face
+        self.model_dir = Path(MODEL_DIR) if MODEL_DIR else model_root / "models"
+        self.tracker = FaceTracker(TRACK_MAX_FRAMES, TRACK_MARGIN, TRACK_MIN_SCORE)
+        self.ladder = ResolutionLadder(DETECT_LADDER, DETECT_START_SIDE, DETECT_MIN_FACE_PX)
+        self.pool: DetectorWorkerPool | None = None
+        self.detector = None
+        self.classifier = None
+        self.batcher: MicroBatcher | None = None
+        self.timings: dict[str, Any] = {}
+        # Byte-identical frames (client retries, re-sent frames) across all
+        # sessions are answered from here without decoding; 0 MB disables it.
+        self.cache = PredictionCache(int(cache_mb * 1024 * 1024), cache_ttl_sec) if cache_mb > 0 else None
+        if workers > 0:
+            # Each worker process builds and warms its own single-process
+            # service (and model backends); this process only dispatches frames.
+            started = time.perf_counter()
+            self.pool = DetectorWorkerPool(
+                workers,
+                partial(build_warm_service, model_root, detector, classifier),
+                slots_per_worker=WORKER_SLOTS,
+                slot_bytes=WORKER_SLOT_MB * 1024 * 1024,
+                max_restarts=WORKER_MAX_RESTARTS,
+                restart_backoff_sec=WORKER_RESTART_BACKOFF_SEC,
+            )
+            self.timings["construct_ms"] = _elapsed_ms(started)
+            return
+
+        self._detector_lock = threading.Lock()
+        self._timing_lock = threading.Lock()
+        self._detector_runs = 0
+        self._detector_sec = 0.0
+        self._tracked_frames = 0
+        self._tracker_sec = 0.0
+
+        detector_cls = resolve(DETECTORS, detector, "detector")
+        classifier_cls = resolve(CLASSIFIERS, classifier, "classifier")
+
+        # The runtimes (TensorFlow, PyTorch, ONNX Runtime) are imported here
+        # so their cost is a measurable startup phase instead of a side
+        # effect of importing this module.
+        started = time.perf_counter()
+        try:
+            import_runtimes(detector_cls)
+        except ImportError:
+            if detector_cls is not DETECTORS["mtcnn"]:
+                raise
+            # Same fallback fer.FER had: no facenet-pytorch means Haar.
+            detector_cls = HaarDetector
+        import_runtimes(classifier_cls)
+        self.timings["import_ms"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        self.detector = detector_cls(self.model_dir)
+        self.classifier = classifier_cls(self.model_dir)
+        self.timings["construct_ms"] = _elapsed_ms(started)
+
+        self._detector_name = f"{self.detector.name}+{self.classifier.name}"
+        self.emotion_labels = self.classifier.labels
+        self.face_size = self.classifier.input_size
+        # Only face detection stays behind the lock; classification of the
+        # crops is coalesced across concurrent requests by the batcher thread.
+        self.batcher = MicroBatcher(
+            self.classifier.classify,
+            max_batch_size=batch_max_size,
+            max_wait_ms=batch_max_wait_ms,
+            observe=observe_stage,
+        )
+
+    @property
+    def detector_name(self) -> str:
+        if self.pool is not None:
+            return f"{self.pool.size} x {self.pool.detector_name}"
+        return self._detector_name
+
+    def stats(self) -> dict[str, Any]:
+        cache = {"prediction_cache": self.cache.stats()} if self.cache is not None else {}
+        if self.pool is not None:
+            return {"workers": self.pool.stats(), **cache}
+        with self._timing_lock:
+            tracking = {
+                "detector_runs": self._detector_runs,
+                "avg_detector_ms": (
+                    round(self._detector_sec * 1000.0 / self._detector_runs, 3) if self._detector_runs else 0.0
+                ),
+                "tracked_frames": self._tracked_frames,
+                "avg_tracker_ms": (
+                    round(self._tracker_sec * 1000.0 / self._tracked_frames, 3) if self._tracked_frames else 0.0
+                ),
+            }
+        return {"batching": self.batcher.stats(), "tracking": tracking, **cache}
+
+    def warm_up(
+        self,
+        resolutions: tuple[tuple[int, int], ...] = WARMUP_RESOLUTIONS,
+        timeout_sec: float = WARMUP_TIMEOUT_SEC,
+    ) -> None:
+        """Pay classifier graph building and detector first-call allocation up front.
+
+        Decodes, detects and classifies synthetic frames at each configured
+        ``(width, height)``, then runs the classifier at batch size 1 and at
+        the batcher's maximum. In worker-pool mode this waits up to
+        ``timeout_sec`` for every worker to report that it finished its own
+        warm-up and raises ``TimeoutError`` (or ``WorkerPoolFailed``) otherwise.
+        """
+        started = time.perf_counter()
+        if self.pool is not None:
+            if not self.pool.wait_ready(timeout_sec):
+                raise TimeoutError(f"Detector workers were not ready after {timeout_sec:g} s")
+            self.timings["workers"] = self.pool.worker_timings
+        else:
+            rng = np.random.default_rng(0)
+            for width, height in resolutions:
+                frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+                encoded = cv2.imencode(".jpg", frame)[1].tobytes()
+                self._predict_bytes(encoded, None, 0)
+                self._predict_bytes(encoded, None, self._resolve_side(None, None))
+            for batch_size in sorted({1, self.batcher.max_batch_size}):
+                faces = np.zeros((batch_size, self.face_size[1], self.face_size[0]), dtype=np.float32)
+                self.batcher.classify_faces(faces)
+        self.timings["warmup_ms"] = _elapsed_ms(started)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def predict_from_bytes(
+        self,
+        image_bytes: bytes | memoryview,
+        track: FaceTrack | None = None,
+        detect_side: int | None = None,
+        cache_key: bytes | None = None,
+    ) -> dict[str, Any]:
+        """Predict the emotion of every face in one frame.
+
+        ``faces`` holds each face's box and scores; the dominant face (largest
+        or most confident, see ``dominant_face``) fills the top-level fields.
+        With a session ``track`` the face boxes from earlier frames are
+        followed and only the crops are classified; the detector runs again
+        for all faces as soon as the tracker loses any one of them. ``face_source`` in the result says which happened.
+        The detector sees the frame downscaled to ``detect_side`` (long side,
+        ``0`` for native) or, by default, to the session's ladder rung. When
+        that rung is at most 1/2 or 1/4 of a JPEG's long side the frame is
+        decoded straight at that scale. Returned boxes are always in original
+        frame coordinates.
+
+        Frames already seen at the same detection side are answered from the
+        prediction cache (``"cache_hit": True``) before any decoding; pass the
+        ``cache_key`` from a missed ``cached_prediction`` to avoid hashing
+        the frame twice.
+        """
+        detect_side = self._resolve_side(track, detect_side)
+        if self.cache is not None and cache_key is None:
+            cache_key, cached = self.cached_prediction(image_bytes, detect_side=detect_side)
+            if cached is not None:
+                return cached
+
+        if self.pool is not None:
+            prediction = self._predict_in_pool("predict_from_bytes", image_bytes, track, detect_side)
+        else:
+            prediction = self._predict_bytes(image_bytes, track, detect_side)
+        # Tracked boxes depend on the session's earlier frames, not only on
+        # these bytes, so only detector results are shared.
+        if cache_key is not None and prediction["face_source"] != "tracked":
+            self.cache.put(cache_key, prediction)
+        return prediction
+
+    def cached_prediction(
+        self,
+        image_bytes: bytes | memoryview,
+        track: FaceTrack | None = None,
+        detect_side: int | None = None,
+    ) -> tuple[bytes | None, dict[str, Any] | None]:
+        """Look a frame up in the prediction cache without decoding it.
+
+        Returns ``(cache_key, prediction)``; the prediction is ``None`` on a
+        miss and the key is ``None`` when the cache is disabled.
+        """
+        if self.cache is None:
+            return None, None
+        detect_side = self._resolve_side(track, detect_side)
+        cache_key = content_key(image_bytes, self.detector_name, detect_side, REDUCED_DECODE, self.dominant_face)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            # Only the response carries the flag; the stored entry never does.
+            cached = {**cached, "cache_hit": True}
+        return cache_key, cached
+
+    def _predict_bytes(
+        self, image_bytes: bytes | memoryview, track: FaceTrack | None, detect_side: int | None
+    ) -> dict[str, Any]:
+        started = time.perf_counter()
+        size = jpeg_size(image_bytes) if REDUCED_DECODE else None
+        reduce = reduced_decode_factor(size, detect_side)
+        frame = decode_frame(image_bytes, reduce)
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        observe_stage("decode", time.perf_counter() - started)
+
+        if reduce > 1:
+            # imdecode applies the EXIF orientation, the SOF size does not:
+            # a quarter turn swaps the header's width and height.
+            width, height = size
+            if (frame.shape[1] > frame.shape[0]) != (width > height):
+                width, height = height, width
+            original_shape = (height, width)
+            decode_scale = frame.shape[1] / width
+        else:
+            original_shape, decode_scale = frame.shape[:2], 1.0
+        return self._predict_frame(frame, gray, track, detect_side, original_shape, decode_scale)
+
+    def predict_from_pixels(
+        self,
+        buffer: bytes | memoryview,
+        width: int,
+        height: int,
+        pixel_format: str = "nv21",
+        track: FaceTrack | None = None,
+        detect_side: int | None = None,
+    ) -> dict[str, Any]:
+        """Predict from an uncompressed camera buffer (NV21/NV12/I420, RGB or BGR).
+
+        The buffer is wrapped with ``np.frombuffer``, never copied; see
+        ``preprocessing.wrap_pixels``. Otherwise behaves like
+        ``predict_from_bytes``.
+        """
+        if self.pool is not None:
+            return self._predict_in_pool(
+                "predict_from_pixels",
+                buffer,
+                track,
+                detect_side,
+                width=width,
+                height=height,
+                pixel_format=pixel_format,
+            )
+
+        started = time.perf_counter()
+        frame, gray, is_rgb = wrap_pixels(buffer, width, height, pixel_format)
+        observe_stage("decode", time.perf_counter() - started)
+        detect_side = self._resolve_side(track, detect_side)
+        return self._predict_frame(frame, gray, track, detect_side, gray.shape[:2], 1.0, is_rgb)
+
+    def _predict_in_pool(
+        self,
+        method: str,
+        payload: bytes | memoryview,
+        track: FaceTrack | None,
+        detect_side: int | None,
+        **options: Any,
+    ) -> dict[str, Any]:
+        # Stages inside the worker processes are not visible here; the
+        # round trip (queueing, shared-memory copy, inference) is.
+        started = time.perf_counter()
+        if track is None:
+            prediction, _ = self.pool.predict(payload, method, track=None, detect_side=detect_side, **options)
+        else:
+            # The worker updates a copy of the track that is written back
+            # here, so frames of one session take turns.
+            with track.lock:
+                prediction, options = self.pool.predict(
+                    payload, method, track=track, detect_side=detect_side, **options
+                )
+                track.assign(options["track"])
+        observe_stage("worker", time.perf_counter() - started)
+        return prediction
+
+    def _resolve_side(self, track: FaceTrack | None, detect_side: int | None) -> int | None:
+        if detect_side is None:
+            return self.ladder.side_for(track.detect_side if track is not None else None)
+        return detect_side
+
+    def _predict_frame(
+        self,
+        frame: np.ndarray,
+        gray: np.ndarray,
+        track: FaceTrack | None,
+        detect_side: int | None,
+        original_shape: tuple[int, int],
+        decode_scale: float,
+        is_rgb: bool = False,
+    ) -> dict[str, Any]:
+        boxes = None
+        face_source = "detected"
+        scale = 1.0
+        if track is not None:
+            if track.decode_scale != decode_scale:
+                # Box and template are in pixels of the previous decode scale.
+                track.reset()
+                track.decode_scale = decode_scale
+            started = time.perf_counter()
+            tracked_boxes = self.tracker.follow(track, gray)
+            if tracked_boxes is not None:
+                boxes = tracked_boxes
+                face_source = "tracked"
+                elapsed = time.perf_counter() - started
+                observe_stage("track", elapsed)
+                with self._timing_lock:
+                    self._tracked_frames += 1
+                    self._tracker_sec += elapsed
+
+        if boxes is None:
+            boxes, scale = self._detect(frame, detect_side, is_rgb)
+
+        faces, boxes = prepare_faces(gray, boxes, self.face_size)
+        if not boxes:
+            if track is not None:
+                self._observe(track, gray, [], None, face_source, detect_side, original_shape, decode_scale)
+            return {
+                "emotion": "neutral",
+                "confidence": 0.0,
+                "faces_detected": 0,
+                "all_emotions": {},
+                "face_source": "none",
+                "face_box": None,
+                "detect_scale": round(scale * decode_scale, 4),
+                "faces": [],
+            }
+
+        # All crops of the frame go through the classifier as one stacked batch.
+        predictions = self.batcher.classify_faces(faces)
+        results = [
+            {"box": list(box), **self._face_result(row)}
+            for box, row in zip(self.ladder.to_original(boxes, decode_scale), predictions)
+        ]
+        best_index = self._dominant_index(results)
+        best = results[best_index]
+        if track is not None:
+            self._observe(
+                track, gray, boxes, boxes[best_index], face_source, detect_side, original_shape, decode_scale
+            )
+
+        return {
+            "emotion": best["emotion"],
+            "confidence": best["confidence"],
+            "faces_detected": len(boxes),
+            "all_emotions": best["all_emotions"],
+            "face_source": face_source,
+            "face_box": best["box"],
+            "detect_scale": round(scale * decode_scale, 4),
+            "faces": results,
+        }
+
+    def predict_from_faces(self, crops: Sequence[np.ndarray]) -> list[dict[str, Any]]:
+        """Classify faces the client already cropped; no decode, no detection.
+
+        ``crops`` are grayscale uint8 arrays of any size; they are resized to
+        the classifier input and go through the batcher as one request.
+        """
+        if self.pool is not None:
+            payload = b"".join(np.ascontiguousarray(crop, dtype=np.uint8).tobytes() for crop in crops)
+            results, _ = self.pool.predict(
+                payload, method="predict_from_face_buffer", shapes=[crop.shape[:2] for crop in crops]
+            )
+            return results
+
+        predictions = self.batcher.classify_faces(prepare_crops(crops, self.face_size))
+        return [self._face_result(row) for row in predictions]
+
+    def predict_from_face_buffer(
+        self, payload: bytes | memoryview, shapes: Sequence[tuple[int, int]]
+    ) -> list[dict[str, Any]]:
+        """Worker-pool entry point: ``predict_from_faces`` on crops packed back to back."""
+        data = bytes(payload)
+        crops, offset = [], 0
+        for height, width in shapes:
+            size = height * width
+            crops.append(np.frombuffer(data, np.uint8, count=size, offset=offset).reshape(height, width))
+            offset += size
+        return self.predict_from_faces(crops)
+
+    def _label_scores(self, row: np.ndarray) -> dict[str, float]:
+        return {self.emotion_labels[idx]: round(float(score), 2) for idx, score in enumerate(row)}
+
+    def _face_result(self, row: np.ndarray) -> dict[str, Any]:
+        emotions = self._label_scores(row)
+        dominant_emotion = max(emotions, key=emotions.get)
+        return {
+            "emotion": dominant_emotion,
+            "confidence": round(float(emotions[dominant_emotion]), 4),
+            "all_emotions": {k: round(float(v), 4) for k, v in emotions.items()},
+        }
+
+    def _dominant_index(self, faces: list[dict[str, Any]]) -> int:
+        """Index of the face that drives ``emotion``: the largest box or the most confident one."""
+        if self.dominant_face == "area":
+            return max(range(len(faces)), key=lambda idx: faces[idx]["box"][2] * faces[idx]["box"][3])
+        return max(range(len(faces)), key=lambda idx: faces[idx]["confidence"])
+
+    def _detect(
+        self, frame: np.ndarray, detect_side: int | None, is_rgb: bool = False
+    ) -> tuple[list[tuple[int, int, int, int]], float]:
+        small, scale = self.ladder.downscale(frame, detect_side)
+        if is_rgb:
+            small = cv2.cvtColor(small, cv2.COLOR_RGB2BGR)
+        started = time.perf_counter()
+        with self._detector_lock:
+            acquired = time.perf_counter()
+            boxes = self.detector.detect(small)
+        detect_sec = time.perf_counter() - acquired
+        observe_stage("lock_wait", acquired - started)
+        observe_stage("detect", detect_sec)
+        with self._timing_lock:
+            self._detector_runs += 1
+            self._detector_sec += detect_sec
+        return self.ladder.to_original(boxes, scale), scale
+
+    def _observe(
+        self,
+        track: FaceTrack,
+        gray: np.ndarray,
+        boxes: list[tuple[int, int, int, int]],
+        box: tuple[int, int, int, int] | None,
+        face_source: str,
+        detect_side: int | None,
+        original_shape: tuple[int, ...],
+        decode_scale: float,
+    ) -> None:
+        # Every face is tracked; the dominant ``box`` alone steers the ladder.
+        detected = face_source == "detected"
+        self.tracker.observe(track, gray, boxes, detected=detected)
+        if detected:
+            # The ladder reasons in original pixels so a reduced decode never
+            # caps how far it can step up.
+            original_box = self.ladder.to_original([box], decode_scale)[0] if box is not None else None
+            track.detect_side = self.ladder.next_side(detect_side, original_shape, original_box)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 1)
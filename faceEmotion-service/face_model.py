@@ -1,3 +1,11 @@
+import argparse
+import csv
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
 from fer.fer import FER
 import cv2
 
@@ -13,6 +21,26 @@ EMOTION_COLORS = {
 }
 
 CONFIDENCE_THRESHOLD = 0.25
+EMOTIONS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+VIDEO_SUFFIXES = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v"}
+RESULT_COLUMNS = ("source", "frame", "timestamp_sec", "face", "x", "y", "w", "h") + EMOTIONS
+PARQUET_ROW_GROUP = 2048
+
+
+def build_detector(verbose=True):
+    try:
+        detector = FER(mtcnn=True)
+        if verbose:
+            print("[INFO] Using MTCNN face detector (higher accuracy)", flush=True)
+    except Exception as exc:
+        detector = FER(mtcnn=False)
+        if verbose:
+            print(f"[INFO] MTCNN unavailable ({exc}), using default detector", flush=True)
+    return detector
+
+
+def enhance(frame):
+    return cv2.convertScaleAbs(frame, alpha=1.1, beta=15)
 
 
 def open_camera():
@@ -98,13 +126,416 @@ def draw_emotion(frame, face):
             )
 
 
-def main():
+class LatestSlot:
+    """Holds only the newest value; readers wait for something newer than they saw."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._value = None
+        self._version = 0
+
+    def put(self, value):
+        with self._cond:
+            self._value = value
+            self._version += 1
+            self._cond.notify_all()
+
+    def get(self):
+        with self._cond:
+            return self._version, self._value
+
+    def wait_newer(self, version, timeout):
+        with self._cond:
+            self._cond.wait_for(lambda: self._version > version, timeout)
+            return self._version, self._value
+
+
+class RateMeter:
+    def __init__(self, window_sec=1.0):
+        self.window_sec = window_sec
+        self._ticks = deque()
+
+    def tick(self, now):
+        self._ticks.append(now)
+        while now - self._ticks[0] > self.window_sec:
+            self._ticks.popleft()
+
+    def rate(self, now):
+        while self._ticks and now - self._ticks[0] > self.window_sec:
+            self._ticks.popleft()
+        return len(self._ticks) / self.window_sec
+
+
+class LiveView:
+    """Camera capture, inference and rendering on separate threads.
+
+    The capture thread keeps only the newest frame, the inference thread
+    always analyses the newest frame it has not seen, and the render loop
+    (on the calling thread, as HighGUI requires) draws the latest overlays on
+    every captured frame. Lag is the age of the frame the shown overlays
+    were computed from.
+    """
+
+    def __init__(self, cap, detector, window_name):
+        self.cap = cap
+        self.detector = detector
+        self.window_name = window_name
+        self.frames = LatestSlot()
+        self.overlays = LatestSlot()
+        self.capture_rate = RateMeter()
+        self.inference_rate = RateMeter()
+        self._rates_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def run(self):
+        threads = [
+            threading.Thread(target=self._capture, name="fer-capture", daemon=True),
+            threading.Thread(target=self._infer, name="fer-infer", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            self._render()
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=2)
+
+    def _capture(self):
+        while not self._stop.is_set():
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                print("[WARN] Camera read failed, retrying...", flush=True)
+                time.sleep(0.05)
+                continue
+            now = time.perf_counter()
+            with self._rates_lock:
+                self.capture_rate.tick(now)
+            self.frames.put((frame, now))
+
+    def _infer(self):
+        seen = 0
+        while not self._stop.is_set():
+            version, latest = self.frames.wait_newer(seen, timeout=0.1)
+            if version == seen or latest is None:
+                continue
+            seen = version
+            frame, captured_at = latest
+            try:
+                results, error = self.detector.detect_emotions(enhance(frame)), None
+            except Exception as exc:
+                results, error = [], exc
+            with self._rates_lock:
+                self.inference_rate.tick(time.perf_counter())
+            self.overlays.put((results, captured_at, error))
+
+    def _render(self):
+        shown = 0
+        while True:
+            version, latest = self.frames.wait_newer(shown, timeout=0.1)
+            if version != shown and latest is not None:
+                shown = version
+                frame = latest[0].copy()
+                _, overlay = self.overlays.get()
+                results, captured_at, error = overlay if overlay is not None else ([], None, None)
+                now = time.perf_counter()
+                with self._rates_lock:
+                    capture_fps, inference_fps = self.capture_rate.rate(now), self.inference_rate.rate(now)
+                lag_ms = (now - captured_at) * 1000.0 if captured_at is not None else 0.0
+
+                if error is not None:
+                    cv2.putText(
+                        frame,
+                        f"Detection error: {str(error)[:70]}",
+                        (10, 90),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        0.6,
+                        (0, 0, 255),
+                        2,
+                    )
+                for face in results:
+                    draw_emotion(frame, face)
+
+                cv2.putText(
+                    frame,
+                    f"Faces: {len(results)}",
+                    (10, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.8,
+                    (255, 255, 0),
+                    2,
+                )
+                cv2.putText(
+                    frame,
+                    f"Capture {capture_fps:.1f} fps | Inference {inference_fps:.1f} fps | Lag {lag_ms:.0f} ms",
+                    (10, 60),
+                    cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6,
+                    (255, 255, 0),
+                    2,
+                )
+                cv2.imshow(self.window_name, frame)
+
+            if (cv2.waitKey(1) & 0xFF) in (ord("q"), ord("Q"), 27):
+                return
+
+
+def find_videos(path):
+    path = Path(path)
+    if path.is_dir():
+        return [p for p in sorted(path.rglob("*")) if p.suffix.lower() in VIDEO_SUFFIXES]
+    return [path]
+
+
+class CsvSink:
+    def __init__(self, path):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(RESULT_COLUMNS)
+
+    def write(self, rows):
+        self._writer.writerows([row[column] for column in RESULT_COLUMNS] for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """Streams rows into Parquet row groups so only one group is ever buffered."""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema(
+            [("source", pa.string()), ("frame", pa.int64()), ("timestamp_sec", pa.float64()), ("face", pa.int32())]
+            + [(column, pa.int32()) for column in ("x", "y", "w", "h")]
+            + [(emotion, pa.float32()) for emotion in EMOTIONS]
+        )
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+        self._rows = []
+
+    def write(self, rows):
+        self._rows.extend(rows)
+        if len(self._rows) >= PARQUET_ROW_GROUP:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+
+def open_sink(path):
+    path = Path(path)
+    if path.suffix.lower() == ".parquet":
+        return ParquetSink(path)
+    return CsvSink(path)
+
+
+def result_rows(source, frame_index, timestamp, faces):
+    base = {"source": source, "frame": frame_index, "timestamp_sec": round(timestamp, 3)}
+    if not faces:
+        # Frames without a face still get a row so gaps are visible downstream.
+        return [dict(base, face=None, x=None, y=None, w=None, h=None, **{emotion: None for emotion in EMOTIONS})]
+    rows = []
+    for index, face in enumerate(faces):
+        x, y, w, h = (int(v) for v in face["box"])
+        emotions = face["emotions"]
+        rows.append(
+            dict(base, face=index, x=x, y=y, w=w, h=h, **{emotion: emotions.get(emotion, 0.0) for emotion in EMOTIONS})
+        )
+    return rows
+
+
+class VideoAnalysisPipeline:
+    """Decode -> detect -> write, with bounded memory for any video length.
+
+    One decoder thread reads frames (``every`` Nth frame, from ``start_sec``
+    to ``end_sec``) into a bounded queue, ``workers`` threads each run their
+    own FER detector, and the calling thread writes results in frame order.
+    At most ``max_in_flight`` frames exist between decoding and writing, so a
+    slow worker stalls the decoder instead of growing the reorder buffer.
+    """
+
+    def __init__(self, workers=2, every=1, start_sec=0.0, end_sec=None, max_in_flight=None, progress_sec=2.0):
+        self.workers = max(1, int(workers))
+        self.every = max(1, int(every))
+        self.start_sec = max(0.0, float(start_sec))
+        self.end_sec = end_sec
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self.progress_sec = progress_sec
+        self.errors = 0
+        # The semaphore, not the queue size, bounds memory: a slot is taken
+        # before a frame is queued and only freed once it has been written.
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._stop = threading.Event()
+
+    def run(self, videos, sink):
+        detectors = [build_detector(verbose=index == 0) for index in range(self.workers)]
+        decoder = threading.Thread(target=self._decode, args=(videos,), name="fer-decoder", daemon=True)
+        workers = [
+            threading.Thread(target=self._infer, args=(detector,), name=f"fer-infer-{index}", daemon=True)
+            for index, detector in enumerate(detectors)
+        ]
+        decoder.start()
+        for worker in workers:
+            worker.start()
+        try:
+            return self._write(sink)
+        finally:
+            self._stop.set()
+            decoder.join()
+            for worker in workers:
+                worker.join()
+
+    def _decode(self, videos):
+        seq = 0
+        try:
+            for video in videos:
+                cap = cv2.VideoCapture(str(video))
+                if not cap.isOpened():
+                    print(f"[WARN] Cannot open {video}, skipping", flush=True)
+                    continue
+                fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+                total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+                if self.start_sec:
+                    cap.set(cv2.CAP_PROP_POS_MSEC, self.start_sec * 1000.0)
+                frame_index = first_index = int(cap.get(cv2.CAP_PROP_POS_FRAMES) or 0)
+                self._results.put(("source", str(video), total, first_index))
+                while not self._stop.is_set():
+                    # Skipped frames are only grabbed, never decoded.
+                    if not cap.grab():
+                        break
+                    timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 or (frame_index / fps if fps else 0.0)
+                    if self.end_sec is not None and timestamp > self.end_sec:
+                        break
+                    if (frame_index - first_index) % self.every == 0:
+                        ok, frame = cap.retrieve()
+                        if ok and frame is not None:
+                            while not self._slots.acquire(timeout=0.1):
+                                if self._stop.is_set():
+                                    return
+                            self._jobs.put((seq, str(video), frame_index, timestamp, frame))
+                            seq += 1
+                    frame_index += 1
+                cap.release()
+                if self._stop.is_set():
+                    break
+        finally:
+            self._results.put(("decoded", seq))
+            for _ in range(self.workers):
+                self._jobs.put(None)
+
+    def _infer(self, detector):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            seq, source, frame_index, timestamp, frame = job
+            try:
+                faces = detector.detect_emotions(enhance(frame))
+                error = None
+            except Exception as exc:
+                faces, error = [], exc
+            self._results.put(("frame", seq, result_rows(source, frame_index, timestamp, faces), error))
+
+    def _write(self, sink):
+        pending = {}
+        next_seq = 0
+        total_frames = None
+        started = last_report = time.perf_counter()
+        sources = {}
+        last_row = None
+        while total_frames is None or next_seq < total_frames:
+            message = self._results.get()
+            kind = message[0]
+            if kind == "source":
+                _, source, source_total, source_first = message
+                sources[source] = (source_total, source_first)
+                print(f"[INFO] Analysing {source}", flush=True)
+                continue
+            if kind == "decoded":
+                total_frames = message[1]
+                continue
+
+            _, seq, rows, error = message
+            if error is not None:
+                self.errors += 1
+                print(f"[WARN] Frame {rows[0]['frame']} of {rows[0]['source']}: {error}", flush=True)
+            pending[seq] = rows
+            while next_seq in pending:
+                rows = pending.pop(next_seq)
+                sink.write(rows)
+                last_row = rows[0]
+                next_seq += 1
+                self._slots.release()
+
+            now = time.perf_counter()
+            if self.progress_sec and now - last_report >= self.progress_sec:
+                last_report = now
+                done = ""
+                if last_row is not None:
+                    source_total, source_first = sources[last_row["source"]]
+                    if source_total > source_first:
+                        done = f" ({(last_row['frame'] - source_first) / (source_total - source_first):.0%} of {last_row['source']})"
+                print(f"[INFO] {next_seq} frames, {next_seq / (now - started):.1f} fps{done}", flush=True)
+
+        elapsed = time.perf_counter() - started
+        print(f"[INFO] Done: {next_seq} frames in {elapsed:.1f}s ({next_seq / elapsed if elapsed else 0.0:.1f} fps)", flush=True)
+        return next_seq
+
+
+def analyse(args):
+    videos = find_videos(args.input)
+    if not videos:
+        print(f"[ERROR] No videos found in {args.input}", flush=True)
+        return
     try:
-        detector = FER(mtcnn=True)
-        print("[INFO] Using MTCNN face detector (higher accuracy)", flush=True)
-    except Exception as exc:
-        detector = FER(mtcnn=False)
-        print(f"[INFO] MTCNN unavailable ({exc}), using default detector", flush=True)
+        sink = open_sink(args.output)
+    except ImportError:
+        print("[ERROR] Parquet output needs pyarrow: pip install pyarrow", flush=True)
+        return
+    pipeline = VideoAnalysisPipeline(
+        workers=args.workers,
+        every=args.every,
+        start_sec=args.start,
+        end_sec=args.end,
+        max_in_flight=args.max_in_flight,
+    )
+    try:
+        pipeline.run(videos, sink)
+    finally:
+        sink.close()
+    print(f"[INFO] Results written to {args.output}", flush=True)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Facial emotion detection from a camera or recorded videos")
+    parser.add_argument("--input", help="Video file or folder of videos to analyse instead of the live camera")
+    parser.add_argument("--output", default="emotions.csv", help="Per-frame results (.csv or .parquet)")
+    parser.add_argument("--every", type=int, default=1, help="Analyse every Nth frame")
+    parser.add_argument("--start", type=float, default=0.0, help="Seek to this many seconds into each video")
+    parser.add_argument("--end", type=float, default=None, help="Stop at this many seconds into each video")
+    parser.add_argument("--workers", type=int, default=2, help="Inference threads, each with its own detector")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Frames buffered between decoder and writer")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.input:
+        analyse(args)
+        return
+
+    detector = build_detector()
 
     cap = open_camera()
     if cap is None:
@@ -118,44 +549,7 @@ def main():
     cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
     print("[INFO] Press 'Q' to quit", flush=True)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret or frame is None:
-            print("[WARN] Camera read failed, retrying...", flush=True)
-            continue
-
-        enhanced = cv2.convertScaleAbs(frame, alpha=1.1, beta=15)
-        try:
-            results = detector.detect_emotions(enhanced)
-        except Exception as exc:
-            results = []
-            cv2.putText(
-                frame,
-                f"Detection error: {str(exc)[:70]}",
-                (10, 60),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (0, 0, 255),
-                2,
-            )
-
-        for face in results:
-            draw_emotion(frame, face)
-
-        cv2.putText(
-            frame,
-            f"Faces: {len(results)}",
-            (10, 30),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.8,
-            (255, 255, 0),
-            2,
-        )
-
-        cv2.imshow(window_name, frame)
-        if cv2.waitKey(1) & 0xFF in (ord("q"), ord("Q"), 27):
-            break
-
+    LiveView(cap, detector, window_name).run()
     cap.release()
     cv2.destroyAllWindows()
 
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Sequence
+
+import cv2
+import numpy as np
+
+
+TEMPLATE_SIZE = 32
+
+
+Box = tuple[int, int, int, int]
+
+
+@dataclass(slots=True)
+class FaceTrack:
+    """Per-session memory of where the faces were on the last frames.
+
+    ``boxes`` and ``templates`` hold one entry per face of the last
+    detection, in detection order.
+    """
+
+    boxes: list[Box] = field(default_factory=list)
+    templates: list[np.ndarray] = field(default_factory=list, repr=False)
+    frames_since_detection: int = 0
+    score: float = 0.0
+    detector_runs: int = 0
+    tracked_frames: int = 0
+    # Long-side resolution the next detector run should use (see
+    # resolution.ResolutionLadder); survives reset() on purpose.
+    detect_side: int | None = None
+    # Scale of the decoded frames the box and template refer to (reduced
+    # JPEG decoding); a different scale invalidates the track.
+    decode_scale: float = 1.0
+    # Serializes worker-pool round trips of this track: each one ships a
+    # copy and writes it back, so overlapping frames would drop updates.
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def __getstate__(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__ if name != "lock"}
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        self.lock = threading.Lock()
+
+    def reset(self) -> None:
+        self.boxes = []
+        self.templates = []
+        self.frames_since_detection = 0
+        self.score = 0.0
+
+    def assign(self, other: FaceTrack) -> None:
+        self.boxes = other.boxes
+        self.templates = other.templates
+        self.frames_since_detection = other.frames_since_detection
+        self.score = other.score
+        self.detector_runs = other.detector_runs
+        self.tracked_frames = other.tracked_frames
+        self.detect_side = other.detect_side
+        self.decode_scale = other.decode_scale
+
+
+class FaceTracker:
+    """Follow the faces between detector runs with template matching.
+
+    Each face patch from the last detection is matched (normalised
+    cross-correlation) inside its previous box grown by ``margin``. The
+    matches are accepted for at most ``max_tracked_frames`` frames in a row
+    and only while every face scores above ``min_score``; as soon as one face
+    is lost the caller runs the full detector again for all of them.
+    """
+
+    def __init__(self, max_tracked_frames: int = 5, margin: float = 0.25, min_score: float = 0.6) -> None:
+        self.max_tracked_frames = max(0, int(max_tracked_frames))
+        self.margin = max(0.0, float(margin))
+        self.min_score = float(min_score)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_tracked_frames > 0
+
+    def follow(self, track: FaceTrack, gray: np.ndarray) -> list[Box] | None:
+        if not self.enabled or not track.boxes or len(track.templates) != len(track.boxes):
+            return None
+        if track.frames_since_detection >= self.max_tracked_frames:
+            return None
+
+        boxes, scores = [], []
+        for box, template in zip(track.boxes, track.templates):
+            match = self._match(box, template, gray)
+            if match is None:
+                return None
+            boxes.append(match[0])
+            scores.append(match[1])
+        track.score = min(scores)
+        return boxes
+
+    def _match(self, box: Box, template: np.ndarray, gray: np.ndarray) -> tuple[Box, float] | None:
+        x, y, w, h = box
+        if w <= 0 or h <= 0:
+            return None
+        pad_x, pad_y = int(w * self.margin), int(h * self.margin)
+        x1, y1 = max(0, x - pad_x), max(0, y - pad_y)
+        x2, y2 = min(gray.shape[1], x + w + pad_x), min(gray.shape[0], y + h + pad_y)
+        if x2 - x1 < w or y2 - y1 < h:
+            return None
+
+        # Match at template resolution: the search window is scaled by the
+        # same factor that took the face box down to TEMPLATE_SIZE.
+        scale_x, scale_y = TEMPLATE_SIZE / w, TEMPLATE_SIZE / h
+        window = cv2.resize(
+            gray[y1:y2, x1:x2],
+            (max(TEMPLATE_SIZE, round((x2 - x1) * scale_x)), max(TEMPLATE_SIZE, round((y2 - y1) * scale_y))),
+            interpolation=cv2.INTER_AREA,
+        )
+        scores = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (loc_x, loc_y) = cv2.minMaxLoc(scores)
+        if not np.isfinite(score) or score < self.min_score:
+            return None
+        return (x1 + round(loc_x / scale_x), y1 + round(loc_y / scale_y), w, h), float(score)
+
+    def observe(
+        self,
+        track: FaceTrack,
+        gray: np.ndarray,
+        boxes: Sequence[Sequence[int]],
+        detected: bool,
+    ) -> None:
+        if detected:
+            track.detector_runs += 1
+        else:
+            track.tracked_frames += 1
+
+        if not boxes:
+            track.reset()
+            return
+
+        track.boxes = [tuple(int(v) for v in box) for box in boxes]
+        if not detected:
+            track.frames_since_detection += 1
+            return
+
+        templates = []
+        for x, y, w, h in track.boxes:
+            inside = x >= 0 and y >= 0 and x + w <= gray.shape[1] and y + h <= gray.shape[0]
+            if not self.enabled or not inside or w <= 0 or h <= 0:
+                # A face that cannot be followed means the next frame needs
+                # the detector anyway.
+                track.reset()
+                return
+            templates.append(
+                cv2.resize(gray[y:y + h, x:x + w], (TEMPLATE_SIZE, TEMPLATE_SIZE), interpolation=cv2.INTER_AREA)
+            )
+        track.templates = templates
+        track.frames_since_detection = 0
+        track.score = 1.0
@@ -1,27 +1,65 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import os
 import threading
+import time
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
-import cv2
-import numpy as np
-from fastapi import Body, FastAPI, File, Form, HTTPException, UploadFile
+from fastapi import (
+    Body,
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from fer.fer import FER
 from pydantic import BaseModel
 
+from admission import BoundedInferenceExecutor, InferenceQueueFull
+from emotion_service import EmotionModelService
+from face_tracking import FaceTrack
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, METRICS, RequestMetricsMiddleware, observe_stage
+from preprocessing import RAW_FACE_SIDE, decode_face, frame_dhash, hamming_distance, split_raw_faces
+from session_store import SessionRegistry
+from timeline import EmotionTimeline
+
 
 DEFAULT_MODEL_ROOT = Path(r"D:\Projects\AI-Companion\faceEmotion-service")
 STATIC_DIR = Path(__file__).resolve().parent / "static"
-
-
-@dataclass
+# Frames whose dHash is within this Hamming distance of the last inferred
+# frame reuse its prediction; a negative value disables the short-circuit.
+DEDUP_MAX_DISTANCE = int(os.getenv("FER_DEDUP_MAX_DISTANCE", "3"))
+DEDUP_MAX_REUSE = int(os.getenv("FER_DEDUP_MAX_REUSE", "10"))
+TIMELINE_CAPACITY = int(os.getenv("FER_TIMELINE_CAPACITY", "120"))
+TIMELINE_ALPHA = float(os.getenv("FER_TIMELINE_ALPHA", "0.3"))
+SESSION_MAX = int(os.getenv("FER_SESSION_MAX", "1000"))
+SESSION_IDLE_TTL_SEC = float(os.getenv("FER_SESSION_IDLE_TTL_SEC", "900"))
+SESSION_ENDED_TTL_SEC = float(os.getenv("FER_SESSION_ENDED_TTL_SEC", "60"))
+SESSION_SWEEP_SEC = float(os.getenv("FER_SESSION_SWEEP_SEC", "30"))
+INFER_THREADS = int(os.getenv("FER_INFER_THREADS", "8"))
+INFER_MAX_QUEUE = int(os.getenv("FER_INFER_MAX_QUEUE", "32"))
+FACE_CROPS_MAX = int(os.getenv("FER_FACE_CROPS_MAX", "64"))
+FACE_CROPS_MAX_BYTES = int(os.getenv("FER_FACE_CROPS_MAX_BYTES", str(4 * 1024 * 1024)))
+BATCH_IMAGES_MAX = int(os.getenv("FER_BATCH_IMAGES_MAX", "64"))
+# Spacing of batch frames on the timeline when the client sends no timestamps.
+BATCH_FRAME_INTERVAL_MS = float(os.getenv("FER_BATCH_FRAME_INTERVAL_MS", "33"))
+
+
+@dataclass(slots=True)
 class EmotionSession:
     id: str
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
@@ -29,57 +67,40 @@ class EmotionSession:
     prediction_count: int = 0
     last_emotion: str | None = None
     last_confidence: float | None = None
+    face_track: FaceTrack = field(default_factory=FaceTrack, repr=False)
+    frame_hash: int | None = None
+    cached_prediction: dict[str, Any] | None = field(default=None, repr=False)
+    cached_reuse: int = 0
+    cache_hits: int = 0
+    timeline: EmotionTimeline = field(
+        default_factory=lambda: EmotionTimeline(TIMELINE_CAPACITY, TIMELINE_ALPHA),
+        repr=False,
+    )
+
+    def release_frame_state(self) -> None:
+        self.frame_hash = None
+        self.cached_prediction = None
+        self.cached_reuse = 0
+        self.face_track.reset()
 
 
 class StartSessionRequest(BaseModel):
     session_id: str | None = None
 
 
-class EmotionModelService:
-    def __init__(self, model_root: Path) -> None:
-        self.model_root = model_root
-        self._detector_lock = threading.Lock()
-        try:
-            self.detector = FER(mtcnn=True)
-            self.detector_name = "FER(mtcnn=True)"
-        except Exception:
-            self.detector = FER(mtcnn=False)
-            self.detector_name = "FER(mtcnn=False)"
-
-    def predict_from_bytes(self, image_bytes: bytes) -> dict[str, Any]:
-        np_arr = np.frombuffer(image_bytes, np.uint8)
-        frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        if frame is None:
-            raise ValueError("Unable to decode image bytes. Please send a valid JPEG/PNG frame.")
-
-        with self._detector_lock:
-            faces = self.detector.detect_emotions(frame)
-
-        if not faces:
-            return {
-                "emotion": "neutral",
-                "confidence": 0.0,
-                "faces_detected": 0,
-                "all_emotions": {},
-            }
-
-        best_face = max(
-            faces,
-            key=lambda face: max(face.get("emotions", {}).values() or [0.0]),
-        )
-        emotions = best_face.get("emotions", {})
-        dominant_emotion = max(emotions, key=emotions.get)
-        confidence = float(emotions[dominant_emotion])
-
-        return {
-            "emotion": dominant_emotion,
-            "confidence": round(confidence, 4),
-            "faces_detected": len(faces),
-            "all_emotions": {k: round(float(v), 4) for k, v in emotions.items()},
-        }
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # Load and warm the model in the background so the server answers
+    # /api/health right away while /api/ready reports not-ready.
+    threading.Thread(target=_load_model_service, name="fer-model-loader", daemon=True).start()
+    yield
+    sessions.close()
+    inference_executor.shutdown()
+    if model_service is not None:
+        model_service.close()
 
 
-app = FastAPI(title="Face Emotion Test Service", version="1.0.0")
+app = FastAPI(title="Face Emotion Test Service", version="1.0.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -87,25 +108,227 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(RequestMetricsMiddleware, registry=METRICS)
 
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
 model_root = DEFAULT_MODEL_ROOT if DEFAULT_MODEL_ROOT.exists() else Path(__file__).resolve().parent
-model_service = EmotionModelService(model_root=model_root)
-sessions: dict[str, EmotionSession] = {}
+model_service: EmotionModelService | None = None
+model_ready = threading.Event()
+startup_state: dict[str, Any] = {"phase": "starting", "error": None}
+inference_executor = BoundedInferenceExecutor(INFER_THREADS, INFER_MAX_QUEUE)
+sessions: SessionRegistry[EmotionSession] = SessionRegistry(
+    SESSION_MAX,
+    SESSION_IDLE_TTL_SEC,
+    SESSION_ENDED_TTL_SEC,
+    SESSION_SWEEP_SEC,
+)
+# Guards mutable fields of individual sessions; the registry has its own lock.
 sessions_lock = threading.Lock()
 
+METRICS.gauge("fer_model_ready", "1 once the model is loaded and warmed up", lambda: model_ready.is_set())
+METRICS.gauge("fer_active_sessions", "Live (not ended) sessions", lambda: sessions.stats()["live"])
+METRICS.gauge("fer_inference_running", "Inference calls currently running", lambda: inference_executor.stats()["running"])
+METRICS.gauge("fer_inference_queued", "Inference calls waiting for a thread", lambda: inference_executor.stats()["queued"])
+METRICS.gauge(
+    "fer_inference_rejected_total",
+    "Inference calls rejected with 503",
+    lambda: inference_executor.stats()["rejected"],
+    kind="counter",
+)
+METRICS.gauge(
+    "fer_prediction_cache_hits_total",
+    "Frames answered from the content-addressed prediction cache",
+    lambda: model_service.cache.stats()["hits"],
+    kind="counter",
+)
+METRICS.gauge(
+    "fer_prediction_cache_misses_total",
+    "Prediction cache lookups that had to run inference",
+    lambda: model_service.cache.stats()["misses"],
+    kind="counter",
+)
+METRICS.gauge("fer_prediction_cache_bytes", "Estimated size of the prediction cache", lambda: model_service.cache.stats()["bytes"])
+
+
+def _load_model_service() -> None:
+    global model_service
+    try:
+        startup_state["phase"] = "loading"
+        model_service = EmotionModelService(model_root=model_root)
+        startup_state["phase"] = "warming_up"
+        model_service.warm_up()
+        startup_state["phase"] = "ready"
+        model_ready.set()
+    except Exception as exc:
+        startup_state["phase"] = "failed"
+        startup_state["error"] = f"{type(exc).__name__}: {exc}"
+        if model_service is not None:
+            # Stops worker processes that are still restarting.
+            model_service.close()
+
+
+def _ready_model_service() -> EmotionModelService:
+    if not model_ready.is_set():
+        raise HTTPException(
+            status_code=503,
+            detail="Emotion model is not ready yet",
+            headers={"Retry-After": "5"},
+        )
+    return model_service
+
 
 def _session_or_404(session_id: str) -> EmotionSession:
-    with sessions_lock:
-        session = sessions.get(session_id)
+    session = sessions.get(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return session
 
 
+def _predict_session_frame(session: EmotionSession, image_bytes: bytes) -> dict[str, Any]:
+    # Byte-identical frames are answered before the dHash decode below.
+    cache_key, cached = model_service.cached_prediction(image_bytes, track=session.face_track)
+    if cached is not None:
+        with sessions_lock:
+            session.cache_hits += 1
+        return {**cached, "cached": True}
+
+    frame_hash = frame_dhash(image_bytes) if DEDUP_MAX_DISTANCE >= 0 else None
+
+    with sessions_lock:
+        cached = session.cached_prediction
+        if (
+            cached is not None
+            and frame_hash is not None
+            and session.frame_hash is not None
+            and session.cached_reuse < DEDUP_MAX_REUSE
+            and hamming_distance(frame_hash, session.frame_hash) <= DEDUP_MAX_DISTANCE
+        ):
+            session.cached_reuse += 1
+            session.cache_hits += 1
+            return {**cached, "cached": True}
+
+    prediction = model_service.predict_from_bytes(image_bytes, track=session.face_track, cache_key=cache_key)
+
+    with sessions_lock:
+        if session.ended_at is None:
+            session.frame_hash = frame_hash
+            session.cached_prediction = prediction if frame_hash is not None else None
+            session.cached_reuse = 0
+    return {**prediction, "cached": False}
+
+
+def _predict_session_pixels(
+    session: EmotionSession, buffer: bytes, width: int, height: int, pixel_format: str
+) -> dict[str, Any]:
+    prediction = model_service.predict_from_pixels(
+        buffer, width, height, pixel_format, track=session.face_track
+    )
+    return {**prediction, "cached": False}
+
+
+def _gate_faces(faces: list[dict[str, Any]], min_confidence: float) -> list[dict[str, Any]]:
+    return [
+        {**face, "emotion": face["emotion"] if face["confidence"] >= min_confidence else "neutral"}
+        for face in faces
+    ]
+
+
+def _record_prediction(session: EmotionSession, prediction: dict[str, Any], min_confidence: float) -> dict[str, Any]:
+    confidence = float(prediction["confidence"])
+    emotion = prediction["emotion"] if confidence >= min_confidence else "neutral"
+
+    with sessions_lock:
+        session.prediction_count += 1
+        session.last_emotion = emotion
+        session.last_confidence = confidence
+        if prediction["all_emotions"]:
+            session.timeline.append(prediction["all_emotions"], time.time())
+        smoothed_emotion, smoothed_confidence = session.timeline.smoothed()
+
+    return {
+        "session_id": session.id,
+        "emotion": emotion,
+        "confidence": confidence,
+        "faces_detected": prediction["faces_detected"],
+        "all_emotions": prediction["all_emotions"],
+        "smoothed_emotion": smoothed_emotion,
+        "smoothed_confidence": smoothed_confidence,
+        "face_source": prediction["face_source"],
+        "face_box": prediction["face_box"],
+        "detect_scale": prediction["detect_scale"],
+        "faces": _gate_faces(prediction["faces"], min_confidence),
+        "cached": prediction["cached"],
+        "prediction_count": session.prediction_count,
+        "cache_hits": session.cache_hits,
+        "detector_runs": session.face_track.detector_runs,
+        "tracked_frames": session.face_track.tracked_frames,
+    }
+
+
+def _observe_upload(request: Request) -> None:
+    """Record the time from request arrival until the upload was read."""
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        observe_stage("parse", time.perf_counter() - received_at)
+
+
+def _batch_frame_times(timestamps: str | None, count: int) -> list[float]:
+    """Timeline time of each batch frame: the client's capture times, else
+    ``BATCH_FRAME_INTERVAL_MS`` apart with the last frame at arrival."""
+    if timestamps is None:
+        received_at = time.time()
+        interval = BATCH_FRAME_INTERVAL_MS / 1000.0
+        return [received_at - (count - 1 - index) * interval for index in range(count)]
+    try:
+        values = [float(value) for value in json.loads(timestamps)]
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="timestamps must be a JSON array of numbers") from exc
+    if len(values) != count:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expected {count} timestamps, one per image, got {len(values)}",
+        )
+    return values
+
+
+def _predict_face_crops(parts: list[tuple[str, bytes]], face_size: int) -> dict[str, Any]:
+    # Counted from the part sizes so an oversized request is refused before any decoding.
+    raw_face_bytes = max(1, face_size * face_size)
+    count = sum(
+        1 if content_type.startswith("image/") else len(payload) // raw_face_bytes
+        for content_type, payload in parts
+    )
+    if count > FACE_CROPS_MAX:
+        raise ValueError(f"At most {FACE_CROPS_MAX} face crops are accepted per request, got {count}")
+
+    crops = []
+    for index, (content_type, payload) in enumerate(parts):
+        try:
+            if content_type.startswith("image/"):
+                crops.append(decode_face(payload))
+            else:
+                crops.extend(split_raw_faces(payload, face_size))
+        except ValueError as exc:
+            raise ValueError(f"Part {index}: {exc}") from exc
+    if not crops:
+        raise ValueError("No face crops in request")
+
+    faces = model_service.predict_from_faces(crops)
+    best = max(faces, key=lambda face: face["confidence"])
+    return {
+        **best,
+        "faces": faces,
+        "faces_detected": len(faces),
+        "face_source": "client",
+        "face_box": None,
+        "detect_scale": None,
+        "cached": False,
+    }
+
+
 @app.get("/", response_model=None)
 def root():
     index_path = STATIC_DIR / "index.html"
@@ -115,19 +338,44 @@ def root():
     return {
         "service": "face-emotion-test",
         "status": "ok",
-        "model_root": str(model_service.model_root),
-        "detector": model_service.detector_name,
+        "model_root": str(model_root),
+        "detector": model_service.detector_name if model_service is not None else "loading",
     }
 
 
 @app.get("/api/health")
 def health() -> dict[str, Any]:
+    """Liveness only: answers while the model is still loading."""
     return {
         "ok": True,
-        "model_root": str(model_service.model_root),
-        "detector": model_service.detector_name,
+        "ready": model_ready.is_set(),
+        "phase": startup_state["phase"],
+        "startup_error": startup_state["error"],
+        "model_root": str(model_root),
+        "detector": model_service.detector_name if model_service is not None else "loading",
         "active_sessions": len(sessions),
+        "sessions": sessions.stats(),
+        "inference_queue": inference_executor.stats(),
+        **(model_service.stats() if model_ready.is_set() else {}),
+    }
+
+
+@app.get("/metrics", response_model=None)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/ready", response_model=None)
+def ready() -> dict[str, Any] | JSONResponse:
+    body = {
+        "ready": model_ready.is_set(),
+        "phase": startup_state["phase"],
+        "error": startup_state["error"],
+        "startup_ms": dict(model_service.timings) if model_service is not None else {},
     }
+    if not body["ready"]:
+        return JSONResponse(status_code=503, content=body, headers={"Retry-After": "5"})
+    return body
 
 
 @app.post("/emotions/sessions/start/")
@@ -135,8 +383,7 @@ def start_session(payload: StartSessionRequest | None = Body(default=None)) -> d
     session_id = (payload.session_id.strip() if payload and payload.session_id else str(uuid4()))
     session = EmotionSession(id=session_id)
 
-    with sessions_lock:
-        sessions[session_id] = session
+    sessions.add(session_id, session)
 
     return {
         "session": {
@@ -151,41 +398,318 @@ def start_session(payload: StartSessionRequest | None = Body(default=None)) -> d
 @app.post("/emotions/sessions/{session_id}/predict/")
 async def predict_emotion(
     session_id: str,
+    request: Request,
     image: UploadFile = File(...),
     min_confidence: float = Form(0.0),
 ) -> dict[str, Any]:
     session = _session_or_404(session_id)
+    _ready_model_service()
 
     content_type = (image.content_type or "").lower()
     if not content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Uploaded file must be an image")
 
     image_bytes = await image.read()
+    _observe_upload(request)
     if not image_bytes:
         raise HTTPException(status_code=400, detail="Image payload is empty")
 
     try:
-        prediction = model_service.predict_from_bytes(image_bytes)
+        # Off the event loop so concurrent frames can meet in the batcher.
+        prediction = await inference_executor.run(_predict_session_frame, session, image_bytes)
+    except InferenceQueueFull as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {exc}") from exc
 
-    confidence = float(prediction["confidence"])
-    emotion = prediction["emotion"] if confidence >= min_confidence else "neutral"
+    return _record_prediction(session, prediction, min_confidence)
+
+
+@app.post("/emotions/sessions/{session_id}/predict/raw")
+async def predict_emotion_raw(
+    session_id: str,
+    request: Request,
+    width: int = Header(..., alias="X-Frame-Width"),
+    height: int = Header(..., alias="X-Frame-Height"),
+    pixel_format: str = Header("nv21", alias="X-Frame-Format"),
+    min_confidence: float = 0.0,
+) -> dict[str, Any]:
+    """Predict from an uncompressed camera frame sent as the raw request body.
+
+    Skips both multipart parsing and image decoding: the body is wrapped as
+    NV21/NV12/I420 (YUV 4:2:0), RGB or BGR pixels of the given size.
+    """
+    session = _session_or_404(session_id)
+    _ready_model_service()
 
+    buffer = await request.body()
+    _observe_upload(request)
+    if not buffer:
+        raise HTTPException(status_code=400, detail="Frame payload is empty")
+
+    try:
+        prediction = await inference_executor.run(
+            _predict_session_pixels, session, buffer, width, height, pixel_format
+        )
+    except InferenceQueueFull as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {exc}") from exc
+
+    return _record_prediction(session, prediction, min_confidence)
+
+
+@app.post("/emotions/sessions/{session_id}/predict/batch")
+async def predict_emotion_batch(
+    session_id: str,
+    request: Request,
+    images: list[UploadFile] = File(...),
+    min_confidence: float = Form(0.0),
+    timestamps: str | None = Form(None),
+) -> StreamingResponse:
+    """Predict many frames from one multipart request, streamed back as NDJSON.
+
+    Frames are decoded and classified concurrently (crops meet in the
+    batcher), each line is written as soon as its frame is done, and the
+    session counters are updated once when the batch is complete. At most
+    one frame per inference thread is in flight, so a large batch queues
+    behind itself instead of being rejected by the admission limit.
+    """
+    session = _session_or_404(session_id)
+    service = _ready_model_service()
+    if len(images) > BATCH_IMAGES_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BATCH_IMAGES_MAX} images are accepted per batch request, got {len(images)}",
+        )
+    frame_times = _batch_frame_times(timestamps, len(images))
+    frames: list[tuple[int, str, bytes | None]] = []
+    for index, image in enumerate(images):
+        content_type = (image.content_type or "").lower()
+        image_bytes = await image.read() if content_type.startswith("image/") else None
+        frames.append((index, image.filename or "", image_bytes))
+    _observe_upload(request)
+
+    detect_side = service.ladder.side_for(session.face_track.detect_side)
+    in_flight = asyncio.Semaphore(inference_executor.workers)
+
+    async def predict_frame(index: int, filename: str, image_bytes: bytes | None) -> dict[str, Any]:
+        line: dict[str, Any] = {"index": index, "filename": filename}
+        if not image_bytes:
+            return {**line, "error": "Uploaded file must be a non-empty image"}
+        try:
+            async with in_flight:
+                prediction = await inference_executor.run(
+                    service.predict_from_bytes,
+                    image_bytes,
+                    detect_side=detect_side,
+                )
+        except InferenceQueueFull as exc:
+            return {**line, "error": str(exc), "retry_after": exc.retry_after}
+        except ValueError as exc:
+            return {**line, "error": str(exc)}
+        except Exception as exc:
+            return {**line, "error": f"Prediction failed: {exc}"}
+
+        confidence = float(prediction["confidence"])
+        return {
+            **line,
+            "emotion": prediction["emotion"] if confidence >= min_confidence else "neutral",
+            "confidence": confidence,
+            "faces_detected": prediction["faces_detected"],
+            "all_emotions": prediction["all_emotions"],
+            "face_box": prediction["face_box"],
+            "detect_scale": prediction["detect_scale"],
+            "faces": _gate_faces(prediction["faces"], min_confidence),
+        }
+
+    async def stream_lines():
+        results: list[dict[str, Any]] = []
+        for next_done in asyncio.as_completed([predict_frame(*frame) for frame in frames]):
+            line = await next_done
+            results.append(line)
+            yield json.dumps(line) + "\n"
+
+        succeeded = sorted((line for line in results if "error" not in line), key=lambda line: line["index"])
+        with sessions_lock:
+            session.prediction_count += len(succeeded)
+            if succeeded:
+                session.last_emotion = succeeded[-1]["emotion"]
+                session.last_confidence = succeeded[-1]["confidence"]
+            for line in succeeded:
+                if line["all_emotions"]:
+                    session.timeline.append(line["all_emotions"], frame_times[line["index"]])
+            smoothed_emotion, smoothed_confidence = session.timeline.smoothed()
+            summary = {
+                "session_id": session.id,
+                "summary": True,
+                "frames": len(frames),
+                "succeeded": len(succeeded),
+                "emotion": session.last_emotion,
+                "confidence": session.last_confidence,
+                "smoothed_emotion": smoothed_emotion,
+                "smoothed_confidence": smoothed_confidence,
+                "prediction_count": session.prediction_count,
+            }
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(stream_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/emotions/sessions/{session_id}/predict/faces")
+async def predict_emotion_faces(
+    session_id: str,
+    request: Request,
+    faces: list[UploadFile] = File(...),
+    face_size: int = Form(RAW_FACE_SIDE),
+    min_confidence: float = Form(0.0),
+) -> dict[str, Any]:
+    """Classify faces the client already detected and cropped.
+
+    Each part is either a small grayscale JPEG/PNG of one face or an
+    ``application/octet-stream`` buffer of back-to-back ``face_size`` x
+    ``face_size`` uint8 faces. Only the classifier runs, on all crops as one
+    batch; the most confident face feeds the session like a full frame does.
+    """
+    session = _session_or_404(session_id)
+    _ready_model_service()
+    if len(faces) > FACE_CROPS_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {FACE_CROPS_MAX} face parts are accepted per request, got {len(faces)}",
+        )
+    upload_bytes = sum(face.size or 0 for face in faces)
+    if upload_bytes > FACE_CROPS_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {FACE_CROPS_MAX_BYTES} bytes of faces are accepted per request, got {upload_bytes}",
+        )
+
+    parts = [((face.content_type or "").lower(), await face.read()) for face in faces]
+    _observe_upload(request)
+    try:
+        prediction = await inference_executor.run(_predict_face_crops, parts, face_size)
+    except InferenceQueueFull as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {exc}") from exc
+
+    return _record_prediction(session, prediction, min_confidence)
+
+
+@app.websocket("/emotions/sessions/{session_id}/stream")
+async def stream_emotions(websocket: WebSocket, session_id: str, min_confidence: float = 0.0) -> None:
+    """Binary JPEG/PNG frames in, one prediction message out per processed frame.
+
+    Only the newest unprocessed frame is kept: frames that arrive while
+    inference is busy replace the pending one and are counted as dropped, so
+    a fast client never builds up a backlog on the server.
+    """
+    await websocket.accept()
+    session = sessions.get(session_id)
+    if not session or session.ended_at is not None:
+        await websocket.send_json({"error": "Session not found"})
+        await websocket.close(code=4404)
+        return
+    if not model_ready.is_set():
+        await websocket.send_json({"error": "Emotion model is not ready yet", "retry_after": 5})
+        await websocket.close(code=1013)
+        return
+
+    pending: bytes | None = None
+    frame_ready = asyncio.Event()
+    dropped = 0
+    closed = False
+
+    async def receive_frames() -> None:
+        nonlocal pending, dropped, closed
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                frame = message.get("bytes")
+                if not frame:
+                    continue
+                if pending is not None:
+                    dropped += 1
+                pending = frame
+                frame_ready.set()
+        finally:
+            closed = True
+            frame_ready.set()
+
+    receiver = asyncio.create_task(receive_frames())
+    try:
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+            if closed:
+                break
+            if pending is None:
+                continue
+            image_bytes, pending = pending, None
+
+            if session.ended_at is not None:
+                await websocket.close(code=1000)
+                break
+            # The socket bypasses the HTTP lookups, so keep the idle sweeper away.
+            if not sessions.touch(session_id):
+                await websocket.send_json({"error": "Session not found"})
+                await websocket.close(code=4404)
+                break
+            try:
+                prediction = await inference_executor.run(_predict_session_frame, session, image_bytes)
+            except InferenceQueueFull as exc:
+                await websocket.send_json({"error": str(exc), "retry_after": exc.retry_after})
+                continue
+            except ValueError as exc:
+                await websocket.send_json({"error": str(exc)})
+                continue
+            except Exception as exc:
+                await websocket.send_json({"error": f"Prediction failed: {exc}"})
+                continue
+
+            result = _record_prediction(session, prediction, min_confidence)
+            await websocket.send_json({**result, "frames_dropped": dropped})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+
+
+@app.get("/emotions/sessions/{session_id}/timeline")
+def session_timeline(session_id: str) -> dict[str, Any]:
+    session = _session_or_404(session_id)
     with sessions_lock:
-        session.prediction_count += 1
-        session.last_emotion = emotion
-        session.last_confidence = confidence
+        series = session.timeline.series()
+        smoothed_emotion, smoothed_confidence = session.timeline.smoothed()
 
     return {
         "session_id": session.id,
-        "emotion": emotion,
-        "confidence": confidence,
-        "faces_detected": prediction["faces_detected"],
-        "all_emotions": prediction["all_emotions"],
-        "prediction_count": session.prediction_count,
+        "capacity": session.timeline.capacity,
+        "alpha": session.timeline.alpha,
+        "smoothed_emotion": smoothed_emotion,
+        "smoothed_confidence": smoothed_confidence,
+        **series,
     }
 
 
@@ -197,6 +721,7 @@ def end_session(session_id: str) -> dict[str, Any]:
             raise HTTPException(status_code=404, detail="Session not found")
 
         session.ended_at = datetime.now(timezone.utc)
+        sessions.mark_ended(session_id)
         session_data = {
             "id": session.id,
             "created_at": session.created_at.isoformat(),
@@ -204,7 +729,12 @@ def end_session(session_id: str) -> dict[str, Any]:
             "prediction_count": session.prediction_count,
             "last_emotion": session.last_emotion,
             "last_confidence": session.last_confidence,
+            "detector_runs": session.face_track.detector_runs,
+            "tracked_frames": session.face_track.tracked_frames,
+            "cache_hits": session.cache_hits,
+            "smoothed_emotion": session.timeline.smoothed()[0],
         }
+        session.release_frame_state()
 
     return {
         "session": session_data,
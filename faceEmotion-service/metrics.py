@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any, Callable
+
+
+# Upper bounds in seconds; tuned for stages between ~100us and a few seconds.
+STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Fixed-bucket histogram, optionally split by one label.
+
+    ``observe`` is a bisect plus three additions under a lock, so it can sit
+    on every request path.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...], label: str | None = None) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label = label
+        self._lock = threading.Lock()
+        # label value -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: dict[str, list[Any]] = {}
+
+    def observe(self, value: float, label_value: str = "") -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        for label_value, (counts, total, count) in sorted(snapshot.items()):
+            prefix = f'{self.label}="{label_value}",' if self.label else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            labels = f"{{{prefix.rstrip(',')}}}" if prefix else ""
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Histograms plus gauges/counters that are read from callbacks at scrape time."""
+
+    def __init__(self) -> None:
+        self._histograms: list[Histogram] = []
+        self._gauges: list[tuple[str, str, str, Callable[[], float]]] = []
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self.stages = self.histogram(
+            "fer_stage_duration_seconds",
+            "Time spent in each stage of a prediction",
+            STAGE_BUCKETS,
+            label="stage",
+        )
+        self.requests = self.histogram(
+            "fer_http_request_duration_seconds",
+            "Wall time of HTTP requests, from first byte to response end",
+            REQUEST_BUCKETS,
+        )
+        self.gauge("fer_http_requests_in_flight", "HTTP requests currently being handled", lambda: self._in_flight)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...], label: str | None = None) -> Histogram:
+        histogram = Histogram(name, help_text, buckets, label)
+        self._histograms.append(histogram)
+        return histogram
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float], kind: str = "gauge") -> None:
+        """Register a value read at scrape time; ``kind="counter"`` for monotonic totals."""
+        self._gauges.append((name, help_text, kind, read))
+
+    def observe_stage(self, stage: str, seconds: float) -> None:
+        self.stages.observe(seconds, stage)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for histogram in self._histograms:
+            lines.extend(histogram.render())
+        for name, help_text, kind, read in self._gauges:
+            try:
+                value = float(read())
+            except Exception:
+                continue
+            lines.extend((f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value:g}"))
+        return "\n".join(lines) + "\n"
+
+    def request_started(self) -> None:
+        with self._in_flight_lock:
+            self._in_flight += 1
+
+    def request_finished(self, seconds: float) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+        self.requests.observe(seconds)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware: in-flight count, request duration and arrival time.
+
+    The arrival time is stored in the request state as ``received_at`` so an
+    endpoint can attribute the gap until it runs to body/multipart parsing.
+    """
+
+    def __init__(self, app: Any, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        scope.setdefault("state", {})["received_at"] = started
+        self.registry.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.registry.request_finished(time.perf_counter() - started)
+
+
+# Process-wide registry; modules record stages into it without importing the app.
+METRICS = MetricsRegistry()
+observe_stage = METRICS.observe_stage
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: dict[str, Any]
+    size: int
+    expires_at: float
+
+
+def content_key(payload: bytes | memoryview, *config: Any) -> bytes:
+    """128-bit BLAKE2b digest of the payload, salted with the settings that shape the result."""
+    digest = hashlib.blake2b(repr(config).encode(), digest_size=16)
+    digest.update(payload)
+    return digest.digest()
+
+
+def approx_size(value: Any) -> int:
+    """Rough deep ``sys.getsizeof`` of a prediction (dicts, lists, scalars)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(key) + approx_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(approx_size(item) for item in value)
+    return size
+
+
+class PredictionCache:
+    """Thread-safe LRU of predictions keyed by image content, with TTL and a byte budget.
+
+    Entries expire ``ttl_sec`` after they were stored; past ``max_bytes``
+    (estimated with ``approx_size``) the least recently used entries are
+    evicted. Entries are deep-copied on the way in and out, so nothing a
+    caller does to a prediction (nested ``faces`` included) reaches the cache.
+    """
+
+    def __init__(self, max_bytes: int, ttl_sec: float) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_sec = float(ttl_sec)
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evicted = {"expired": 0, "lru": 0}
+
+    def get(self, key: bytes) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key, "expired")
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            value = entry.value
+        return copy.deepcopy(value)
+
+    def put(self, key: bytes, value: dict[str, Any]) -> None:
+        size = approx_size(value) + sys.getsizeof(key)
+        if size > self.max_bytes:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, None)
+            self._entries[key] = _Entry(value, size, time.monotonic() + self.ttl_sec)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)), "lru")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_sec": self.ttl_sec,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evicted": dict(self._evicted),
+            }
+
+    def _remove(self, key: bytes, reason: str | None) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        if reason is not None:
+            self._evicted[reason] += 1
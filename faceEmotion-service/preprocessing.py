@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import cv2
+import numpy as np
+
+
+# Mirrors the crop geometry used by fer.FER.detect_emotions so classifier
+# inputs stay identical to what FER produced before detection and
+# classification were split apart.
+FER_PADDING = 40
+FER_OFFSETS = (10, 10)
+FER_TARGET_SIZE = (64, 64)
+# FER2013 crop size; the default edge length of raw face buffers.
+RAW_FACE_SIDE = 48
+# libjpeg can decode straight to 1/2, 1/4 or 1/8 scale; only 1/2 and 1/4 are
+# used so classifier crops keep enough pixels.
+REDUCED_DECODE_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4}
+YUV_TO_BGR = {
+    "nv21": cv2.COLOR_YUV2BGR_NV21,
+    "nv12": cv2.COLOR_YUV2BGR_NV12,
+    "i420": cv2.COLOR_YUV2BGR_I420,
+}
+RAW_PIXEL_FORMATS = (*YUV_TO_BGR, "rgb", "bgr")
+
+
+def decode_frame(image_bytes: bytes, reduce: int = 1) -> np.ndarray:
+    np_arr = np.frombuffer(image_bytes, np.uint8)
+    frame = cv2.imdecode(np_arr, REDUCED_DECODE_FLAGS[reduce])
+    if frame is None:
+        raise ValueError("Unable to decode image bytes. Please send a valid JPEG/PNG frame.")
+    return frame
+
+
+def jpeg_size(image_bytes: bytes | memoryview) -> tuple[int, int] | None:
+    """``(width, height)`` from a JPEG's frame header, or ``None`` for other data."""
+    view = memoryview(image_bytes)
+    if len(view) < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+    pos = 2
+    while pos + 9 < len(view):
+        if view[pos] != 0xFF:
+            return None
+        marker = view[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            pos += 2
+            continue
+        # SOF0..SOF15, except DHT (C4), JPG (C8) and DAC (CC).
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = (view[pos + 5] << 8) | view[pos + 6]
+            width = (view[pos + 7] << 8) | view[pos + 8]
+            return width, height
+        pos += 2 + ((view[pos + 2] << 8) | view[pos + 3])
+    return None
+
+
+def reduced_decode_factor(size: tuple[int, int] | None, detect_side: int | None) -> int:
+    """Largest JPEG scale-down that still leaves ``detect_side`` pixels on the long side."""
+    if size is None or not detect_side:
+        return 1
+    long_side = max(size)
+    for factor in (4, 2):
+        if long_side // factor >= detect_side:
+            return factor
+    return 1
+
+
+def wrap_pixels(
+    buffer: bytes | memoryview, width: int, height: int, pixel_format: str
+) -> tuple[np.ndarray, np.ndarray, bool]:
+    """View an uncompressed camera buffer as ``(frame, gray, is_rgb)`` without copying it.
+
+    YUV formats are converted to BGR once for the detector; their gray image
+    is the Y plane itself. RGB frames stay RGB (``is_rgb``) so only the
+    downscaled detector input needs its channels swapped.
+    """
+    pixel_format = pixel_format.lower()
+    if pixel_format == "yuv420":
+        pixel_format = "i420"
+    if pixel_format not in RAW_PIXEL_FORMATS:
+        raise ValueError(f"Unsupported pixel format {pixel_format!r}; use one of: {', '.join(RAW_PIXEL_FORMATS)}")
+    if width <= 0 or height <= 0:
+        raise ValueError("Frame width and height must be positive")
+
+    pixels = np.frombuffer(buffer, np.uint8)
+    if pixel_format in YUV_TO_BGR:
+        if width % 2 or height % 2:
+            raise ValueError("YUV 4:2:0 frames need an even width and height")
+        expected = width * height * 3 // 2
+    else:
+        expected = width * height * 3
+    if pixels.size != expected:
+        raise ValueError(
+            f"Raw {pixel_format} frame of {width}x{height} must be {expected} bytes, got {pixels.size}"
+        )
+
+    if pixel_format in YUV_TO_BGR:
+        yuv = pixels.reshape(height * 3 // 2, width)
+        return cv2.cvtColor(yuv, YUV_TO_BGR[pixel_format]), yuv[:height], False
+    frame = pixels.reshape(height, width, 3)
+    if pixel_format == "rgb":
+        return frame, cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY), True
+    return frame, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), False
+
+
+def decode_face(image_bytes: bytes) -> np.ndarray:
+    face = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if face is None:
+        raise ValueError("Unable to decode face crop. Please send a grayscale JPEG/PNG face.")
+    return face
+
+
+def split_raw_faces(buffer: bytes, side: int = RAW_FACE_SIDE) -> np.ndarray:
+    """View a buffer of back-to-back ``side`` x ``side`` uint8 faces as ``(n, side, side)``."""
+    face_bytes = side * side
+    if side <= 0 or not buffer or len(buffer) % face_bytes:
+        raise ValueError(f"Raw face buffer must hold a whole number of {side}x{side} uint8 faces ({face_bytes} bytes each).")
+    return np.frombuffer(buffer, np.uint8).reshape(-1, side, side)
+
+
+def frame_dhash(image_bytes: bytes | memoryview, hash_size: int = 8) -> int | None:
+    """Difference hash of a frame, decoded at 1/8 scale in grayscale.
+
+    Returns ``None`` when the bytes cannot be decoded so callers can fall
+    through to the full decode path and its error message.
+    """
+    thumb = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if thumb is None:
+        return None
+    thumb = cv2.resize(thumb, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (thumb[:, 1:] > thumb[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return (left ^ right).bit_count()
+
+
+def square_box(box: Sequence[int]) -> tuple[int, int, int, int]:
+    x, y, w, h = (int(v) for v in box)
+    if h > w:
+        diff = h - w
+        x -= diff // 2
+        w += diff
+    elif w > h:
+        diff = w - h
+        y -= diff // 2
+        h += diff
+    return x, y, w, h
+
+
+def face_crop(
+    gray: np.ndarray,
+    box: Sequence[int],
+    pad_value: float,
+    offsets: tuple[int, int] = FER_OFFSETS,
+) -> np.ndarray | None:
+    """Cut one face out of a grayscale frame the way FER does.
+
+    FER pads the whole frame by ``FER_PADDING`` pixels before slicing; only the
+    crop is padded here so large frames are never copied.
+    """
+    x, y, w, h = square_box(box)
+    x1 = max(x - offsets[0], -FER_PADDING)
+    y1 = max(y - offsets[1], -FER_PADDING)
+    x2 = min(x + w + offsets[0], gray.shape[1] + FER_PADDING)
+    y2 = min(y + h + offsets[1], gray.shape[0] + FER_PADDING)
+    if x2 <= x1 or y2 <= y1:
+        return None
+
+    inner = gray[max(y1, 0):max(y2, 0), max(x1, 0):max(x2, 0)]
+    if inner.size == 0:
+        return None
+
+    top, left = max(0, -y1), max(0, -x1)
+    bottom = max(0, y2 - gray.shape[0])
+    right = max(0, x2 - gray.shape[1])
+    if top or left or bottom or right:
+        inner = cv2.copyMakeBorder(
+            inner, top, bottom, left, right, cv2.BORDER_CONSTANT, value=pad_value
+        )
+    return inner
+
+
+def prepare_faces(
+    frame: np.ndarray,
+    boxes: Sequence[Sequence[int]],
+    target_size: tuple[int, int] = FER_TARGET_SIZE,
+) -> tuple[np.ndarray, list[tuple[int, int, int, int]]]:
+    """Return a ``(n, h, w)`` float32 classifier batch and the boxes it covers."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    pad_value = cv2.mean(gray[-2:])[0]
+
+    faces = np.empty((len(boxes), target_size[1], target_size[0]), dtype=np.float32)
+    kept: list[tuple[int, int, int, int]] = []
+    for box in boxes:
+        crop = face_crop(gray, box, pad_value)
+        if crop is None:
+            continue
+        faces[len(kept)] = cv2.resize(crop, target_size)
+        kept.append(tuple(int(v) for v in box))
+
+    return normalize_faces(faces[: len(kept)]), kept
+
+
+def prepare_crops(crops: Sequence[np.ndarray], target_size: tuple[int, int] = FER_TARGET_SIZE) -> np.ndarray:
+    """Classifier batch from faces the client already cropped (grayscale uint8)."""
+    faces = np.empty((len(crops), target_size[1], target_size[0]), dtype=np.float32)
+    for index, crop in enumerate(crops):
+        faces[index] = crop if crop.shape[::-1] == target_size else cv2.resize(crop, target_size)
+    return normalize_faces(faces)
+
+
+def normalize_faces(faces: np.ndarray) -> np.ndarray:
+    """Scale float32 pixel values to [-1, 1] in place, as FER's preprocessing does."""
+    faces /= 255.0
+    faces -= 0.5
+    faces *= 2.0
+    return faces
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import cv2
+import numpy as np
+
+
+class ResolutionLadder:
+    """Pick the detection resolution for a session from the faces it has shown.
+
+    Rungs are long-side pixel sizes. After a detection the smallest rung that
+    still keeps the face at ``min_face_px`` is chosen for the next frame; a
+    frame without a face moves one rung up so small or distant faces are not
+    lost for good.
+    """
+
+    def __init__(self, rungs: Sequence[int], start_side: int, min_face_px: int = 80) -> None:
+        self.rungs = tuple(sorted({int(r) for r in rungs if int(r) > 0}))
+        self.start_side = int(start_side)
+        self.min_face_px = max(1, int(min_face_px))
+
+    @property
+    def enabled(self) -> bool:
+        return self.start_side > 0 and bool(self.rungs)
+
+    def side_for(self, detect_side: int | None) -> int | None:
+        if not self.enabled:
+            return None
+        return detect_side or self.start_side
+
+    def downscale(self, frame: np.ndarray, detect_side: int | None) -> tuple[np.ndarray, float]:
+        """Return the detector input and the scale applied to ``frame``."""
+        long_side = max(frame.shape[:2])
+        if not detect_side or detect_side >= long_side:
+            return frame, 1.0
+        scale = detect_side / long_side
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return small, scale
+
+    @staticmethod
+    def to_original(boxes: Sequence[Sequence[int]], scale: float) -> list[tuple[int, int, int, int]]:
+        if scale == 1.0:
+            return [tuple(int(v) for v in box) for box in boxes]
+        return [tuple(int(round(v / scale)) for v in box) for box in boxes]
+
+    def next_side(
+        self,
+        detect_side: int | None,
+        frame_shape: tuple[int, ...],
+        face_box: Sequence[int] | None,
+    ) -> int | None:
+        if not self.enabled:
+            return None
+        long_side = max(frame_shape[:2])
+        current = detect_side or self.start_side
+
+        if face_box is None:
+            if current >= long_side:
+                return current
+            larger = [rung for rung in self.rungs if rung > current]
+            return min(larger[0], long_side) if larger else long_side
+
+        face_px = min(int(face_box[2]), int(face_box[3]))
+        if face_px <= 0:
+            return current
+        needed = long_side * self.min_face_px / face_px
+        for rung in self.rungs:
+            if rung >= needed:
+                return min(rung, long_side)
+        # Face too small for any rung: detect at the native resolution.
+        return long_side
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+
+S = TypeVar("S")
+
+
+@dataclass(slots=True)
+class _Entry(Generic[S]):
+    session: S
+    last_seen: float
+    ended: bool = False
+
+
+class SessionRegistry(Generic[S]):
+    """Bounded, LRU-ordered session map with idle expiry.
+
+    Live sessions expire after ``idle_ttl_sec`` without a lookup; ended
+    sessions are kept for ``ended_ttl_sec`` so late reads (timeline, end
+    retries) still work. Past ``max_sessions`` the least recently used entry
+    is evicted. A daemon thread sweeps expired entries every
+    ``sweep_interval_sec``.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl_sec: float = 900.0,
+        ended_ttl_sec: float = 60.0,
+        sweep_interval_sec: float = 30.0,
+    ) -> None:
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_ttl_sec = float(idle_ttl_sec)
+        self.ended_ttl_sec = float(ended_ttl_sec)
+        self.sweep_interval_sec = max(0.1, float(sweep_interval_sec))
+        self._entries: OrderedDict[str, _Entry[S]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._ended = 0
+        self._evicted = {"idle": 0, "ended": 0, "lru": 0}
+        self._stop = threading.Event()
+        self._sweeper = threading.Thread(target=self._sweep_forever, name="fer-session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, session_id: str, session: S) -> None:
+        with self._lock:
+            previous = self._entries.pop(session_id, None)
+            if previous is not None and previous.ended:
+                self._ended -= 1
+            self._entries[session_id] = _Entry(session, time.monotonic())
+            while len(self._entries) > self.max_sessions:
+                _, evicted = self._entries.popitem(last=False)
+                self._forget(evicted, "lru")
+
+    def get(self, session_id: str) -> S | None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            entry.last_seen = time.monotonic()
+            self._entries.move_to_end(session_id)
+            return entry.session
+
+    def touch(self, session_id: str) -> bool:
+        """Refresh a session's idle clock; False if it has already been evicted."""
+        return self.get(session_id) is not None
+
+    def mark_ended(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and not entry.ended:
+                entry.ended = True
+                entry.last_seen = time.monotonic()
+                self._ended += 1
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        removed = 0
+        with self._lock:
+            # Entries are in LRU order, but ended sessions have a shorter TTL,
+            # so the whole map is checked rather than stopping at the first
+            # fresh entry.
+            for session_id in list(self._entries):
+                entry = self._entries[session_id]
+                ttl = self.ended_ttl_sec if entry.ended else self.idle_ttl_sec
+                if now - entry.last_seen >= ttl:
+                    del self._entries[session_id]
+                    self._forget(entry, "ended" if entry.ended else "idle")
+                    removed += 1
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "live": len(self._entries) - self._ended,
+                "ended": self._ended,
+                "evicted": dict(self._evicted),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_sec": self.idle_ttl_sec,
+                "ended_ttl_sec": self.ended_ttl_sec,
+            }
+
+    def close(self) -> None:
+        self._stop.set()
+        self._sweeper.join(timeout=5)
+
+    def _forget(self, entry: _Entry[S], reason: str) -> None:
+        if entry.ended:
+            self._ended -= 1
+        self._evicted[reason] += 1
+
+    def _sweep_forever(self) -> None:
+        while not self._stop.wait(self.sweep_interval_sec):
+            self.sweep()
@@ -0,0 +1,90 @@
+"""Shared fixtures: tiny detector/classifier backends so tests run without fer or TensorFlow.
+
+``fake`` finds one fixed face per dark 60x60 block, ``fake`` classification
+picks an emotion from the crop's mean brightness. Both are registered before
+``emotion_service`` or ``main`` read ``FER_DETECTOR`` / ``FER_CLASSIFIER``.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SERVICE_DIR))
+
+os.environ.setdefault("FER_DETECTOR", "fake")
+os.environ.setdefault("FER_CLASSIFIER", "fake")
+os.environ.setdefault("FER_WARMUP_RESOLUTIONS", "64x48")
+os.environ.setdefault("FER_DETECT_START_SIDE", "0")
+os.environ.setdefault("FER_REDUCED_DECODE", "0")
+os.environ.setdefault("FER_DEDUP_MAX_DISTANCE", "-1")
+
+import backends  # noqa: E402
+
+FACE_SIDE = 60
+
+
+class FakeDetector:
+    """One box per dark ``FACE_SIDE`` block on a light background."""
+
+    name = "fake"
+    requires: tuple[str, ...] = ()
+
+    def __init__(self, model_dir: Path) -> None:
+        pass
+
+    def detect(self, frame: np.ndarray) -> list[tuple[int, int, int, int]]:
+        dark = frame.mean(axis=2) < 128
+        boxes = []
+        for y in range(0, frame.shape[0] - FACE_SIDE + 1, 10):
+            for x in range(0, frame.shape[1] - FACE_SIDE + 1, 10):
+                if dark[y:y + FACE_SIDE, x:x + FACE_SIDE].all() and not any(
+                    abs(x - bx) < FACE_SIDE and abs(y - by) < FACE_SIDE for bx, by, _, _ in boxes
+                ):
+                    boxes.append((x, y, FACE_SIDE, FACE_SIDE))
+        return boxes
+
+
+class FakeClassifier:
+    name = "fake"
+    requires: tuple[str, ...] = ()
+
+    def __init__(self, model_dir: Path) -> None:
+        self.input_size = (64, 64)
+        self.labels = dict(enumerate(backends.EMOTION_LABELS))
+
+    def classify(self, faces: np.ndarray) -> np.ndarray:
+        scores = np.full((len(faces), len(self.labels)), 0.05, np.float32)
+        means = faces.reshape(len(faces), -1).mean(axis=1)
+        scores[np.arange(len(faces)), ((means + 1) * 3).astype(int) % len(self.labels)] = 0.7
+        return scores
+
+
+backends.DETECTORS.setdefault("fake", FakeDetector)
+backends.CLASSIFIERS.setdefault("fake", FakeClassifier)
+
+
+def face_frame(positions: list[tuple[int, int]], size: tuple[int, int] = (240, 320), shade: int = 40) -> np.ndarray:
+    """Light BGR frame with a dark ``FACE_SIDE`` "face" (eyes and mouth drawn in) at each ``(x, y)``."""
+    frame = np.full((*size, 3), 230, np.uint8)
+    for x, y in positions:
+        frame[y:y + FACE_SIDE, x:x + FACE_SIDE] = shade
+        for eye_x in (x + 18, x + 42):
+            cv2.circle(frame, (eye_x, y + 22), 6, (110, 110, 110), -1)
+        cv2.rectangle(frame, (x + 16, y + 40), (x + 44, y + 46), (90, 90, 90), -1)
+    return frame
+
+
+@pytest.fixture
+def service():
+    from emotion_service import EmotionModelService
+
+    model_service = EmotionModelService(SERVICE_DIR, batch_max_wait_ms=0, workers=0, cache_mb=0)
+    yield model_service
+    model_service.close()
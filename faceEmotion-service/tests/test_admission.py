@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from admission import BoundedInferenceExecutor, InferenceQueueFull
+
+
+def test_cancelled_queued_call_releases_its_slot():
+    executor = BoundedInferenceExecutor(workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(executor.run(gate.wait, 5))
+        queued = asyncio.create_task(executor.run(lambda: "never"))
+        await asyncio.sleep(0.05)
+        assert executor.stats()["queued"] == 1
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(lambda: "rejected")
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert executor.stats()["queued"] == 0
+
+        gate.set()
+        await running
+        # Full capacity is back: one running and one queued call fit again.
+        assert await asyncio.gather(executor.run(lambda: 1), executor.run(lambda: 2)) == [1, 2]
+
+    try:
+        asyncio.run(scenario())
+        stats = executor.stats()
+        assert (stats["running"], stats["queued"]) == (0, 0)
+    finally:
+        executor.shutdown()
+
+
+def test_shutdown_releases_queued_slots():
+    executor = BoundedInferenceExecutor(workers=1, max_queue=2)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(executor.run(gate.wait, 5))
+        queued = [asyncio.create_task(executor.run(lambda: None)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        executor.shutdown()
+        results = await asyncio.gather(*queued, return_exceptions=True)
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        gate.set()
+        await running
+
+    asyncio.run(scenario())
+    assert executor.stats()["queued"] == 0
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from batching import MicroBatcher
+
+
+def crops(count: int, value: float) -> np.ndarray:
+    return np.full((count, 4, 4), value, np.float32)
+
+
+def row_means(faces: np.ndarray) -> np.ndarray:
+    return faces.reshape(len(faces), -1).mean(axis=1, keepdims=True)
+
+
+def test_flushes_as_soon_as_the_batch_is_full():
+    batches = []
+
+    def classify(faces):
+        batches.append(len(faces))
+        return row_means(faces)
+
+    batcher = MicroBatcher(classify, max_batch_size=4, max_wait_ms=10_000)
+    try:
+        started = time.perf_counter()
+        first, second = batcher.submit(crops(2, 1.0)), batcher.submit(crops(2, 2.0))
+        # Each caller gets back its own rows of the shared forward pass.
+        assert first.result(timeout=2).ravel().tolist() == [1.0, 1.0]
+        assert second.result(timeout=2).ravel().tolist() == [2.0, 2.0]
+        assert time.perf_counter() - started < 2
+        assert batches == [4]
+    finally:
+        batcher.close()
+
+
+def test_flushes_a_partial_batch_after_the_wait():
+    batcher = MicroBatcher(row_means, max_batch_size=64, max_wait_ms=50)
+    try:
+        started = time.perf_counter()
+        assert batcher.classify_faces(crops(1, 3.0)).ravel().tolist() == [3.0]
+        assert time.perf_counter() - started >= 0.045
+        stats = batcher.stats()
+        assert (stats["batches"], stats["max_batch_seen"]) == (1, 1)
+    finally:
+        batcher.close()
+
+
+def test_classifier_error_reaches_every_waiter():
+    def classify(faces):
+        raise RuntimeError("graph failed")
+
+    batcher = MicroBatcher(classify, max_batch_size=6, max_wait_ms=10_000)
+    try:
+        futures = [batcher.submit(crops(2, float(index))) for index in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="graph failed"):
+                future.result(timeout=2)
+        assert batcher.stats()["batches"] == 1
+    finally:
+        batcher.close()
+
+
+def test_empty_request_does_not_reach_the_classifier():
+    batcher = MicroBatcher(lambda faces: pytest.fail("classifier called"), max_wait_ms=0)
+    try:
+        assert len(batcher.classify_faces(crops(0, 0.0))) == 0
+    finally:
+        batcher.close()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import backends
+from benchmarks.backends import backend_reference, failures, load_reference, run_parity
+from benchmarks.resolution_ladder import load_images
+from conftest import FakeClassifier, face_frame
+
+
+class DriftingClassifier(FakeClassifier):
+    """The reference scores with the top emotion moved to the next label."""
+
+    name = "drifting"
+
+    def classify(self, faces: np.ndarray) -> np.ndarray:
+        return np.roll(super().classify(faces), 1, axis=1)
+
+
+def test_backend_parity_on_synthetic_frame(monkeypatch):
+    monkeypatch.setitem(backends.CLASSIFIERS, "drifting", DriftingClassifier)
+    images = [face_frame([(40, 40), (200, 120)])]
+    reference = backend_reference(images, "fake", "fake")
+    assert len(reference["faces"]) == 2
+
+    results = run_parity(images, ["fake"], ["fake", "drifting"], 1, reference)
+
+    assert results["detectors"][0]["face_recall"] == 1.0
+    matching, drifting = results["classifiers"]
+    assert (matching["max_score_diff"], matching["top1_agreement"]) == (0.0, 1.0)
+    assert results["pipelines"][0]["emotion_agreement"] == 1.0
+    problems = failures(results, max_score_diff=1e-3, min_agreement=0.95)
+    assert problems and all(problem.startswith("drifting:") for problem in problems)
+    assert drifting["top1_agreement"] == 0.0
+
+
+def test_default_backends_match_fer():
+    """The ``mtcnn`` + ``keras`` backends against real ``fer.FER`` output.
+
+    Synthetic frames only prove the backends load; set ``FER_PARITY_IMAGES``
+    to a folder of face photos to compare detections and scores.
+    """
+    pytest.importorskip("fer")
+    folder = os.getenv("FER_PARITY_IMAGES")
+    images = load_images(Path(folder)) if folder else [face_frame([(40, 40), (200, 120)])]
+
+    results = run_parity(images, ["mtcnn"], ["keras"], 1, load_reference(images))
+
+    assert failures(results, max_score_diff=1e-3, min_agreement=0.95) == []
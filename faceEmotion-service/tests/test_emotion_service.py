@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import struct
+
+import cv2
+
+import emotion_service
+from conftest import face_frame
+
+
+def exif_oriented(jpeg: bytes, orientation: int) -> bytes:
+    """``jpeg`` with an EXIF APP1 segment holding only the Orientation tag."""
+    ifd = struct.pack(">HHHIHH", 1, 0x0112, 3, 1, orientation, 0) + b"\x00\x00\x00\x00"
+    payload = b"Exif\x00\x00MM\x00*\x00\x00\x00\x08" + ifd
+    return jpeg[:2] + b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload + jpeg[2:]
+
+
+def test_reduced_decode_maps_exif_rotated_frames_back_to_full_size(service, monkeypatch):
+    monkeypatch.setattr(emotion_service, "REDUCED_DECODE", True)
+    seen = {}
+
+    def capture(frame, gray, track, detect_side, original_shape, decode_scale):
+        seen.update(decoded=frame.shape[:2], original_shape=original_shape, decode_scale=decode_scale)
+        return {}
+
+    monkeypatch.setattr(service, "_predict_frame", capture)
+    jpeg = cv2.imencode(".jpg", face_frame([(40, 40)]))[1].tobytes()
+
+    # Orientation 6 (rotate 90°): the 320x240 header decodes as a 240x320 portrait frame.
+    service._predict_bytes(exif_oriented(jpeg, 6), None, detect_side=100)
+    assert seen == {"decoded": (160, 120), "original_shape": (320, 240), "decode_scale": 0.5}
+
+    service._predict_bytes(jpeg, None, detect_side=100)
+    assert seen == {"decoded": (120, 160), "original_shape": (240, 320), "decode_scale": 0.5}
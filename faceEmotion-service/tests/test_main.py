@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import cv2
+import pytest
+
+# Small admission limits so a modest batch is larger than workers + max_queue.
+os.environ.setdefault("FER_INFER_THREADS", "2")
+os.environ.setdefault("FER_INFER_MAX_QUEUE", "2")
+os.environ.setdefault("FER_BATCH_IMAGES_MAX", "16")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from conftest import face_frame  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as test_client:
+        deadline = time.monotonic() + 30
+        while test_client.get("/api/ready").status_code != 200:
+            assert time.monotonic() < deadline, test_client.get("/api/ready").json()
+            time.sleep(0.05)
+        yield test_client
+
+
+def start_session(client: TestClient) -> str:
+    return client.post("/emotions/sessions/start/", json={}).json()["session"]["id"]
+
+
+def jpeg(frame) -> bytes:
+    return cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 95])[1].tobytes()
+
+
+def test_batch_larger_than_admission_limit_is_not_rejected(client):
+    executor = main.inference_executor
+    count = executor.workers + executor.max_queue + 8
+    frame = jpeg(face_frame([(40, 40)]))
+    files = [("images", (f"frame{index}.jpg", frame, "image/jpeg")) for index in range(count)]
+    rejected_before = executor.stats()["rejected"]
+
+    response = client.post(f"/emotions/sessions/{start_session(client)}/predict/batch", files=files)
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    frames, summary = lines[:-1], lines[-1]
+    assert [line for line in frames if "error" in line] == []
+    assert sorted(line["index"] for line in frames) == list(range(count))
+    assert summary["succeeded"] == count
+    assert executor.stats()["rejected"] == rejected_before
+
+
+def test_batch_over_image_limit_is_413(client):
+    files = [("images", ("frame.jpg", b"x", "image/jpeg"))] * (main.BATCH_IMAGES_MAX + 1)
+    response = client.post(f"/emotions/sessions/{start_session(client)}/predict/batch", files=files)
+    assert response.status_code == 413
+
+
+def test_tracked_frames_keep_every_face(client):
+    session_id = start_session(client)
+    responses = []
+    for shift in (0, 3, 6):
+        frame = jpeg(face_frame([(40 + shift, 40), (200 - shift, 120 + shift)]))
+        response = client.post(
+            f"/emotions/sessions/{session_id}/predict/",
+            files={"image": ("frame.jpg", frame, "image/jpeg")},
+        )
+        assert response.status_code == 200, response.text
+        responses.append(response.json())
+
+    assert [body["face_source"] for body in responses] == ["detected", "tracked", "tracked"]
+    assert [body["faces_detected"] for body in responses] == [2, 2, 2]
+    first, last = ([face["box"][:2] for face in body["faces"]] for body in (responses[0], responses[-1]))
+    assert last == [[first[0][0] + 6, first[0][1]], [first[1][0] - 6, first[1][1] + 6]]
+
+
+def test_near_duplicate_frames_reuse_the_session_prediction(client, monkeypatch):
+    monkeypatch.setattr(main, "DEDUP_MAX_DISTANCE", 3)
+    monkeypatch.setattr(main, "DEDUP_MAX_REUSE", 1)
+    session_id = start_session(client)
+    base = face_frame([(60, 30), (180, 140)])
+
+    def predict(frame, quality):
+        encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+        response = client.post(
+            f"/emotions/sessions/{session_id}/predict/",
+            files={"image": ("frame.jpg", encoded, "image/jpeg")},
+        )
+        return response.json()["cached"]
+
+    # Different JPEG bytes each time, so the content cache cannot answer.
+    assert predict(base, 95) is False
+    assert predict(base, 90) is True
+    # DEDUP_MAX_REUSE reached: the next look-alike runs inference again.
+    assert predict(base, 85) is False
+    assert predict(face_frame([(150, 20)]), 80) is False
+
+
+def test_streaming_keeps_the_session_alive_past_the_idle_ttl(client, monkeypatch):
+    monkeypatch.setattr(main.sessions, "idle_ttl_sec", 0.3)
+    session_id = start_session(client)
+    frame = jpeg(face_frame([(100, 60)]))
+
+    with client.websocket_connect(f"/emotions/sessions/{session_id}/stream") as websocket:
+        for _ in range(6):
+            websocket.send_bytes(frame)
+            assert "error" not in websocket.receive_json()
+            time.sleep(0.1)
+            main.sessions.sweep()
+
+    assert main.sessions.get(session_id) is not None
+
+
+def test_batch_frames_get_their_own_timeline_timestamps(client):
+    files = [
+        ("images", (f"frame{index}.jpg", jpeg(face_frame([(60 + 20 * index, 50)])), "image/jpeg"))
+        for index in range(3)
+    ]
+
+    session_id = start_session(client)
+    response = client.post(
+        f"/emotions/sessions/{session_id}/predict/batch",
+        files=files,
+        data={"timestamps": json.dumps([100.0, 100.5, 101.0])},
+    )
+    assert json.loads(response.text.splitlines()[-1])["succeeded"] == 3
+    assert client.get(f"/emotions/sessions/{session_id}/timeline").json()["timestamps"] == [100.0, 100.5, 101.0]
+
+    session_id = start_session(client)
+    client.post(f"/emotions/sessions/{session_id}/predict/batch", files=files)
+    timestamps = client.get(f"/emotions/sessions/{session_id}/timeline").json()["timestamps"]
+    assert timestamps == sorted(set(timestamps)) and len(timestamps) == 3
+
+
+def test_batch_timestamps_must_match_the_images(client):
+    files = [("images", ("frame.jpg", jpeg(face_frame([(40, 40)])), "image/jpeg"))] * 2
+    url = f"/emotions/sessions/{start_session(client)}/predict/batch"
+
+    assert client.post(url, files=files, data={"timestamps": "[1.0]"}).status_code == 400
+    assert client.post(url, files=files, data={"timestamps": "soon"}).status_code == 400
+
+
+def test_face_crop_limits_are_checked_before_decoding(client, monkeypatch):
+    def no_decode(*args, **kwargs):
+        raise AssertionError("decoded an oversized request")
+
+    monkeypatch.setattr(main, "decode_face", no_decode)
+    monkeypatch.setattr(main, "split_raw_faces", no_decode)
+    url = f"/emotions/sessions/{start_session(client)}/predict/faces"
+    raw = bytes(48 * 48 * (main.FACE_CROPS_MAX + 1))
+
+    response = client.post(url, files=[("faces", ("faces.raw", raw, "application/octet-stream"))])
+    assert response.status_code == 400
+    assert "At most" in response.json()["detail"]
+
+    parts = [("faces", ("face.jpg", b"x", "image/jpeg"))] * (main.FACE_CROPS_MAX + 1)
+    assert client.post(url, files=parts).status_code == 413
+
+    monkeypatch.setattr(main, "FACE_CROPS_MAX_BYTES", 1024)
+    response = client.post(url, files=[("faces", ("faces.raw", bytes(48 * 48), "application/octet-stream"))])
+    assert response.status_code == 413
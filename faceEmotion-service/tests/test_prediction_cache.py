@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import cv2
+
+from conftest import SERVICE_DIR, face_frame
+from emotion_service import EmotionModelService
+from prediction_cache import PredictionCache
+
+
+def test_cache_returns_independent_copies():
+    cache = PredictionCache(max_bytes=1 << 20, ttl_sec=60)
+    stored = {"emotion": "happy", "faces": [{"emotion": "happy", "all_emotions": {"happy": 0.9}}]}
+    cache.put(b"key", stored)
+    stored["faces"][0]["emotion"] = "changed by the producer"
+
+    first = cache.get(b"key")
+    first["cache_hit"] = True
+    first["faces"][0]["all_emotions"]["happy"] = 0.0
+
+    assert cache.get(b"key") == {"emotion": "happy", "faces": [{"emotion": "happy", "all_emotions": {"happy": 0.9}}]}
+
+
+def test_miss_then_hit_only_flags_the_hit():
+    service = EmotionModelService(SERVICE_DIR, batch_max_wait_ms=0, workers=0, cache_mb=1)
+    try:
+        frame = cv2.imencode(".jpg", face_frame([(40, 40), (200, 120)]))[1].tobytes()
+
+        miss = service.predict_from_bytes(frame)
+        assert "cache_hit" not in miss
+        miss["faces"].clear()
+
+        hit = service.predict_from_bytes(frame)
+        assert hit["cache_hit"] is True
+        assert len(hit["faces"]) == 2
+        hit["faces"][0]["emotion"] = "mutated"
+
+        _, again = service.cached_prediction(frame)
+        assert again["faces"][0]["emotion"] != "mutated"
+        assert service.cache.stats()["hits"] == 2
+        # The stored entry itself never carries the response flag.
+        assert all("cache_hit" not in entry.value for entry in service.cache._entries.values())
+    finally:
+        service.close()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+from benchmarks.decode import bgr_to_nv21
+from conftest import face_frame
+from preprocessing import frame_dhash, hamming_distance, jpeg_size, reduced_decode_factor, wrap_pixels
+
+
+def jpeg(frame, quality: int = 95) -> bytes:
+    return cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def test_dhash_matches_a_re_encoded_frame_and_separates_a_different_one():
+    frame = face_frame([(40, 40), (200, 120)])
+    reference = frame_dhash(jpeg(frame))
+
+    assert hamming_distance(reference, frame_dhash(jpeg(frame, quality=70))) <= 3
+    assert hamming_distance(reference, frame_dhash(jpeg(face_frame([(150, 20)])))) > 3
+
+
+def test_dhash_of_undecodable_bytes_is_none():
+    assert frame_dhash(b"not an image") is None
+
+
+def test_hamming_distance_counts_differing_bits():
+    assert hamming_distance(0b1011, 0b1011) == 0
+    assert hamming_distance(0b1011, 0b0010) == 2
+    assert hamming_distance(0, (1 << 64) - 1) == 64
+
+
+def test_jpeg_size_reads_the_frame_header():
+    frame = face_frame([(40, 40)], size=(120, 200))
+
+    assert jpeg_size(jpeg(frame)) == (200, 120)
+    assert jpeg_size(memoryview(jpeg(frame))) == (200, 120)
+    assert jpeg_size(cv2.imencode(".png", frame)[1].tobytes()) is None
+    assert jpeg_size(jpeg(frame)[:20]) is None
+
+
+@pytest.mark.parametrize(
+    ("size", "detect_side", "factor"),
+    [
+        ((1920, 1080), 480, 4),
+        ((1280, 720), 480, 2),
+        ((640, 480), 480, 1),
+        ((1080, 1920), 320, 4),
+        ((1920, 1080), 0, 1),
+        (None, 480, 1),
+    ],
+)
+def test_reduced_decode_factor_keeps_the_detection_side(size, detect_side, factor):
+    assert reduced_decode_factor(size, detect_side) == factor
+
+
+def test_wrap_pixels_converts_nv21_and_uses_the_y_plane_as_gray():
+    frame = face_frame([(40, 40)], size=(120, 160))
+    buffer = bgr_to_nv21(frame)
+
+    bgr, gray, is_rgb = wrap_pixels(buffer, 160, 120, "NV21")
+
+    assert bgr.shape == frame.shape and not is_rgb
+    assert np.abs(bgr.astype(int) - frame).mean() < 3
+    pixels = np.frombuffer(buffer, np.uint8)
+    assert np.shares_memory(gray, pixels)
+    assert np.array_equal(gray, pixels[: 160 * 120].reshape(120, 160))
+
+
+def test_wrap_pixels_keeps_rgb_without_swapping_channels():
+    frame = face_frame([(40, 40)], size=(48, 64))[:, :, ::-1].copy()
+
+    rgb, gray, is_rgb = wrap_pixels(frame.tobytes(), 64, 48, "rgb")
+
+    assert is_rgb and np.array_equal(rgb, frame)
+    assert np.array_equal(gray, cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY))
+
+
+@pytest.mark.parametrize(
+    ("size", "width", "height", "pixel_format", "message"),
+    [
+        (160 * 120 * 3 // 2, 160, 120, "yuyv", "Unsupported pixel format"),
+        (0, 0, 120, "nv21", "positive"),
+        (161 * 120 * 3 // 2, 161, 120, "nv21", "even width and height"),
+        (160 * 120, 160, 120, "nv21", "must be 28800 bytes"),
+        (160 * 120 * 3 - 1, 160, 120, "bgr", "must be 57600 bytes"),
+    ],
+)
+def test_wrap_pixels_rejects_malformed_buffers(size, width, height, pixel_format, message):
+    with pytest.raises(ValueError, match=message):
+        wrap_pixels(bytes(size), width, height, pixel_format)
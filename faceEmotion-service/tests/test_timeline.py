@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import pytest
+
+from timeline import EMOTION_LABELS, EmotionTimeline
+
+
+def test_empty_timeline_has_no_smoothed_emotion():
+    timeline = EmotionTimeline(capacity=3)
+
+    assert len(timeline) == 0
+    assert timeline.smoothed() == (None, 0.0)
+    assert timeline.series()["timestamps"] == []
+
+
+def test_ema_seeds_from_the_first_frame_and_blends_later_ones():
+    timeline = EmotionTimeline(capacity=4, alpha=0.25)
+    timeline.append({"happy": 1.0}, timestamp=1.0)
+    timeline.append({"sad": 1.0}, timestamp=2.0)
+    timeline.append({"sad": 1.0}, timestamp=3.0)
+
+    happy, sad = EMOTION_LABELS.index("happy"), EMOTION_LABELS.index("sad")
+    smoothed = timeline.series()["smoothed"]
+    assert smoothed[0][happy] == 1.0
+    assert smoothed[1][happy] == pytest.approx(0.75)
+    assert smoothed[1][sad] == pytest.approx(0.25)
+    assert smoothed[2][happy] == pytest.approx(0.5625)
+    assert smoothed[2][sad] == pytest.approx(0.4375)
+    assert timeline.smoothed() == ("happy", 0.5625)
+
+
+def test_ring_keeps_the_newest_frames_in_order_after_wrapping():
+    timeline = EmotionTimeline(capacity=3, alpha=1.0)
+    for step in range(5):
+        timeline.append({EMOTION_LABELS[step]: 1.0}, timestamp=float(step))
+
+    series = timeline.series()
+    assert len(timeline) == 3
+    assert series["timestamps"] == [2.0, 3.0, 4.0]
+    assert [row.index(1.0) for row in series["raw"]] == [2, 3, 4]
+    # alpha=1 makes the EMA track the latest frame exactly.
+    assert series["smoothed"] == series["raw"]
+    assert timeline.smoothed() == (EMOTION_LABELS[4], 1.0)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+import pytest
+
+from emotion_service import EmotionModelService
+from face_tracking import FaceTrack
+from worker_pool import DetectorWorkerPool, WorkerCrashedError, WorkerPoolFailed
+
+
+class EchoService:
+    """Stand-in worker service; importable so spawned workers can build it."""
+
+    detector_name = "echo"
+
+    def echo(self, frame, **options):
+        return {"payload": bytes(frame), "pid": os.getpid()}
+
+    def slow(self, frame, delay: float = 0.3):
+        time.sleep(delay)
+        return os.getpid()
+
+    def crash(self, frame):
+        os._exit(3)
+
+    def predict_from_bytes(self, frame, track=None, detect_side=None):
+        time.sleep(0.2)
+        track.detector_runs += 1
+        return {"face_source": "detected"}
+
+
+def echo_factory():
+    return EchoService()
+
+
+def broken_factory():
+    raise RuntimeError("model file missing")
+
+
+@pytest.fixture
+def pool():
+    echo_pool = DetectorWorkerPool(2, echo_factory, slots_per_worker=2, slot_bytes=2 * 1024 * 1024, restart_backoff_sec=0.05)
+    assert echo_pool.wait_ready(timeout=30)
+    yield echo_pool
+    echo_pool.close()
+
+
+def test_payloads_round_trip_through_shared_memory(pool):
+    for payload in (b"x", os.urandom(1024 * 1024), bytes(range(256)) * 8):
+        result, options = pool.predict(payload, "echo", tag="frame")
+        assert result["payload"] == payload
+        assert options == {"tag": "frame"}
+    with pytest.raises(ValueError, match="accepts frames up to"):
+        pool.submit(b"\0" * (2 * 1024 * 1024 + 1), "echo")
+
+
+def test_requests_go_to_the_least_busy_worker(pool):
+    first, second = pool.submit(b"a", "slow"), pool.submit(b"b", "slow")
+    assert sorted(worker["in_flight"] for worker in pool.stats()["workers"]) == [1, 1]
+    assert first.result(timeout=10)[0] != second.result(timeout=10)[0]
+
+
+def test_worker_crash_fails_its_request_and_is_restarted(pool):
+    with pytest.raises(WorkerCrashedError, match="exited with code 3"):
+        pool.predict(b"boom", "crash")
+    deadline = time.monotonic() + 10
+    while not all(worker["alive"] for worker in pool.stats()["workers"]):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert sum(worker["restarts"] for worker in pool.stats()["workers"]) == 1
+    assert pool.predict(b"again", "echo")[0]["payload"] == b"again"
+
+
+def test_concurrent_frames_of_one_track_do_not_lose_updates(pool):
+    # Only the pool plumbing of the service is needed here.
+    service = object.__new__(EmotionModelService)
+    service.pool = pool
+    track = FaceTrack()
+    threads = [
+        threading.Thread(target=service._predict_in_pool, args=("predict_from_bytes", b"frame", track, None))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert track.detector_runs == 3
+
+
+def test_failing_factory_marks_pool_failed_after_backoff():
+    pool = DetectorWorkerPool(1, broken_factory, slots_per_worker=1, slot_bytes=1024, max_restarts=2, restart_backoff_sec=0.2)
+    try:
+        started = time.monotonic()
+        with pytest.raises(WorkerPoolFailed, match="model file missing"):
+            pool.wait_ready(timeout=30)
+        # Two restarts, waiting 0.2 s and then 0.4 s, instead of respawning in a tight loop.
+        assert time.monotonic() - started >= 0.6
+        stats = pool.stats()
+        assert stats["workers"][0]["restarts"] == 2
+        assert "model file missing" in stats["error"]
+        with pytest.raises(WorkerPoolFailed):
+            pool.submit(b"frame")
+    finally:
+        pool.close()
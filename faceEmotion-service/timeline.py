@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import Any, Mapping
+
+import numpy as np
+
+
+EMOTION_LABELS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+
+
+class EmotionTimeline:
+    """Fixed-size ring buffer of per-frame emotion vectors for one session.
+
+    Raw probabilities, timestamps and the exponential moving average after
+    each frame live in preallocated arrays, so appending is O(1) and reading
+    the series never recomputes the smoothing.
+    """
+
+    def __init__(self, capacity: int = 120, alpha: float = 0.3) -> None:
+        self.capacity = max(1, int(capacity))
+        self.alpha = min(1.0, max(0.0, float(alpha)))
+        self._timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self._raw = np.zeros((self.capacity, len(EMOTION_LABELS)), dtype=np.float32)
+        self._smoothed = np.zeros((self.capacity, len(EMOTION_LABELS)), dtype=np.float32)
+        self._ema = np.zeros(len(EMOTION_LABELS), dtype=np.float32)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def append(self, emotions: Mapping[str, float], timestamp: float) -> None:
+        index = self._count % self.capacity
+        raw = self._raw[index]
+        for column, label in enumerate(EMOTION_LABELS):
+            raw[column] = emotions.get(label, 0.0)
+
+        if self._count == 0:
+            self._ema[:] = raw
+        else:
+            self._ema *= 1.0 - self.alpha
+            self._ema += self.alpha * raw
+        self._smoothed[index] = self._ema
+        self._timestamps[index] = timestamp
+        self._count += 1
+
+    def smoothed(self) -> tuple[str | None, float]:
+        if not self._count:
+            return None, 0.0
+        column = int(np.argmax(self._ema))
+        return EMOTION_LABELS[column], round(float(self._ema[column]), 4)
+
+    def series(self) -> dict[str, Any]:
+        size = len(self)
+        if self._count <= self.capacity:
+            order = slice(0, size)
+            timestamps, raw, smoothed = self._timestamps[order], self._raw[order], self._smoothed[order]
+        else:
+            head = self._count % self.capacity
+            timestamps = np.concatenate((self._timestamps[head:], self._timestamps[:head]))
+            raw = np.concatenate((self._raw[head:], self._raw[:head]))
+            smoothed = np.concatenate((self._smoothed[head:], self._smoothed[:head]))
+
+        return {
+            "labels": list(EMOTION_LABELS),
+            "timestamps": timestamps.round(3).tolist(),
+            "raw": raw.astype(np.float64).round(4).tolist(),
+            "smoothed": smoothed.astype(np.float64).round(4).tolist(),
+        }
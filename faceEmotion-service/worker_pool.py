@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing as mp
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable
+
+
+class WorkerCrashedError(RuntimeError):
+    """Raised for requests that were in flight on a worker process that died."""
+
+
+class WorkerPoolFailed(RuntimeError):
+    """Raised once a worker kept dying and the pool stopped restarting it."""
+
+
+def _worker_main(
+    factory: Callable[[], Any],
+    slot_names: list[str],
+    jobs: Connection,
+    results: Connection,
+) -> None:
+    slots = [SharedMemory(name=name) for name in slot_names]
+    try:
+        try:
+            service = factory()
+        except Exception:
+            # Tell the parent why before exiting, otherwise it only sees an
+            # exit code and cannot tell a bad config from a one-off crash.
+            results.send(("startup_error", traceback.format_exc(limit=5)))
+            return
+        results.send(("ready", service.detector_name, getattr(service, "timings", {})))
+
+        while True:
+            try:
+                message = jobs.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+
+            job_id, slot_index, length, method, options = message
+            frame_view = slots[slot_index].buf[:length]
+            try:
+                # Options go back with the result so per-session state the
+                # service mutated (e.g. a face track) reaches the caller.
+                reply = ("ok", job_id, (getattr(service, method)(frame_view, **options), options))
+            except ValueError as exc:
+                reply = ("value_error", job_id, str(exc))
+            except Exception:
+                reply = ("error", job_id, traceback.format_exc(limit=5))
+            finally:
+                frame_view.release()
+            results.send(reply)
+    finally:
+        for slot in slots:
+            slot.close()
+
+
+@dataclass
+class _Worker:
+    index: int
+    slots: list[SharedMemory]
+    free_slots: list[int]
+    process: mp.process.BaseProcess | None = None
+    jobs: Connection | None = None
+    results: Connection | None = None
+    send_lock: threading.Lock = field(default_factory=threading.Lock)
+    in_flight: dict[int, tuple[Future, int]] = field(default_factory=dict)
+    restarts: int = 0
+    completed: int = 0
+    # Exits since the worker last reported ready; drives the backoff.
+    failures: int = 0
+    respawn_at: float | None = None
+    last_error: str | None = None
+
+
+class DetectorWorkerPool:
+    """Fan frames out to N processes, each owning its own detector.
+
+    Frame bytes travel through per-worker shared-memory slots; only the slot
+    index, length and small option dicts go over the pipe. Each request goes
+    to the worker with the fewest requests in flight, and a worker that dies
+    is restarted while its in-flight requests fail with ``WorkerCrashedError``.
+
+    Restarts back off exponentially from ``restart_backoff_sec`` (capped at
+    ``max_backoff_sec``). A worker that dies more than ``max_restarts`` times
+    without ever becoming ready marks the whole pool failed: ``submit`` and
+    ``wait_ready`` raise ``WorkerPoolFailed`` with the worker's last error.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        factory: Callable[[], Any],
+        slots_per_worker: int = 4,
+        slot_bytes: int = 16 * 1024 * 1024,
+        max_restarts: int = 5,
+        restart_backoff_sec: float = 0.5,
+        max_backoff_sec: float = 30.0,
+    ) -> None:
+        self.size = max(1, int(size))
+        self.factory = factory
+        self.slot_bytes = int(slot_bytes)
+        self.max_restarts = max(0, int(max_restarts))
+        self.restart_backoff_sec = max(0.0, float(restart_backoff_sec))
+        self.max_backoff_sec = max(self.restart_backoff_sec, float(max_backoff_sec))
+        self.detector_name = "starting"
+        self.error: str | None = None
+        self.worker_timings: dict[str, Any] = {}
+        self._ready_workers: set[int] = set()
+        self._all_ready = threading.Event()
+        # Set once the pool is either fully ready or failed.
+        self._settled = threading.Event()
+        self._ctx = mp.get_context("spawn")
+        self._lock = threading.Condition()
+        self._job_ids = itertools.count(1)
+        self._closing = False
+        self._workers = [
+            _Worker(
+                index=index,
+                slots=[SharedMemory(create=True, size=self.slot_bytes) for _ in range(slots_per_worker)],
+                free_slots=list(range(slots_per_worker)),
+            )
+            for index in range(self.size)
+        ]
+        for worker in self._workers:
+            self._spawn(worker)
+
+        self._collector = threading.Thread(target=self._collect, name="fer-pool-collector", daemon=True)
+        self._collector.start()
+
+    def predict(
+        self, image_bytes: bytes, method: str = "predict_from_bytes", **options: Any
+    ) -> tuple[Any, dict[str, Any]]:
+        return self.submit(image_bytes, method, **options).result()
+
+    def submit(self, image_bytes: bytes, method: str = "predict_from_bytes", **options: Any) -> Future:
+        """Run ``service.<method>(payload, **options)`` on the least busy worker."""
+        length = len(image_bytes)
+        if length > self.slot_bytes:
+            raise ValueError(
+                f"Image payload is {length} bytes; the worker pool accepts frames up to {self.slot_bytes} bytes."
+            )
+
+        future: Future = Future()
+        with self._lock:
+            while True:
+                if self.error is not None:
+                    raise WorkerPoolFailed(self.error)
+                if self._closing:
+                    raise RuntimeError("Detector worker pool is shut down")
+                candidates = [w for w in self._workers if w.free_slots and w.process is not None]
+                if candidates:
+                    break
+                self._lock.wait()
+
+            worker = min(candidates, key=lambda w: len(w.in_flight))
+            slot_index = worker.free_slots.pop()
+            job_id = next(self._job_ids)
+            worker.in_flight[job_id] = (future, slot_index)
+            jobs = worker.jobs
+            # Copied while the slot is still reserved so a concurrent restart
+            # cannot hand it to another request mid-write.
+            worker.slots[slot_index].buf[:length] = image_bytes
+
+        try:
+            with worker.send_lock:
+                jobs.send((job_id, slot_index, length, method, options))
+        except (OSError, ValueError) as exc:
+            # The worker died between dispatch and send; the collector will
+            # restart it, this request is reported as lost.
+            self._finish(
+                worker,
+                job_id,
+                exception=WorkerCrashedError(f"Detector worker {worker.index} unavailable: {exc}"),
+            )
+        return future
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Block until every worker has built its service once.
+
+        Returns ``False`` on timeout and raises ``WorkerPoolFailed`` when the
+        pool gave up on a worker.
+        """
+        self._settled.wait(timeout)
+        if self.error is not None:
+            raise WorkerPoolFailed(self.error)
+        return self._all_ready.is_set()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "ready": self._all_ready.is_set(),
+                "error": self.error,
+                "detector": self.detector_name,
+                "workers": [
+                    {
+                        "index": worker.index,
+                        "pid": worker.process.pid if worker.process else None,
+                        "alive": bool(worker.process and worker.process.is_alive()),
+                        "in_flight": len(worker.in_flight),
+                        "completed": worker.completed,
+                        "restarts": worker.restarts,
+                        "restarting": worker.respawn_at is not None,
+                        "last_error": worker.last_error,
+                    }
+                    for worker in self._workers
+                ],
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+            self._lock.notify_all()
+
+        for worker in self._workers:
+            if worker.process is None:
+                continue
+            try:
+                with worker.send_lock:
+                    worker.jobs.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in self._workers:
+            if worker.process is not None:
+                worker.process.join(timeout=5)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+            self._fail_in_flight(worker, RuntimeError("Detector worker pool is shut down"))
+            for slot in worker.slots:
+                slot.close()
+                slot.unlink()
+
+    def _spawn(self, worker: _Worker) -> None:
+        jobs_reader, jobs_writer = self._ctx.Pipe(duplex=False)
+        results_reader, results_writer = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.factory, [slot.name for slot in worker.slots], jobs_reader, results_writer),
+            name=f"fer-worker-{worker.index}",
+            daemon=True,
+        )
+        process.start()
+        jobs_reader.close()
+        results_writer.close()
+        worker.process = process
+        worker.jobs = jobs_writer
+        worker.results = results_reader
+
+    def _collect(self) -> None:
+        while True:
+            timeout = 0.5
+            with self._lock:
+                if self._closing:
+                    return
+                now = time.monotonic()
+                waitables: dict[Any, _Worker] = {}
+                for worker in self._workers:
+                    if worker.respawn_at is not None and worker.respawn_at <= now and self.error is None:
+                        worker.respawn_at = None
+                        self._spawn(worker)
+                        self._lock.notify_all()
+                    if worker.process is None:
+                        if worker.respawn_at is not None:
+                            timeout = min(timeout, worker.respawn_at - now)
+                        continue
+                    waitables[worker.results] = worker
+                    waitables[worker.process.sentinel] = worker
+
+            if not waitables:
+                time.sleep(max(0.0, timeout))
+                continue
+            for ready in wait(list(waitables), timeout=max(0.0, timeout)):
+                worker = waitables[ready]
+                if ready is worker.results:
+                    self._drain(worker)
+                elif not self._closing:
+                    self._restart(worker)
+
+    def _drain(self, worker: _Worker) -> None:
+        try:
+            while worker.results.poll():
+                kind, *payload = worker.results.recv()
+                if kind == "ready":
+                    self.detector_name, self.worker_timings = payload
+                    worker.failures = 0
+                    worker.last_error = None
+                    self._ready_workers.add(worker.index)
+                    if len(self._ready_workers) == self.size:
+                        self._all_ready.set()
+                        self._settled.set()
+                elif kind == "startup_error":
+                    worker.last_error = payload[0]
+                elif kind == "ok":
+                    self._finish(worker, payload[0], result=payload[1])
+                elif kind == "value_error":
+                    self._finish(worker, payload[0], exception=ValueError(payload[1]))
+                else:
+                    self._finish(worker, payload[0], exception=RuntimeError(payload[1]))
+        except (EOFError, OSError):
+            # Pipe closed under us; the process sentinel drives the restart.
+            pass
+
+    def _restart(self, worker: _Worker) -> None:
+        self._drain(worker)
+        worker.process.join(timeout=1)
+        exitcode = worker.process.exitcode
+        for conn in (worker.jobs, worker.results):
+            conn.close()
+        self._fail_in_flight(
+            worker,
+            WorkerCrashedError(f"Detector worker {worker.index} exited with code {exitcode}"),
+        )
+        with self._lock:
+            worker.process = worker.jobs = worker.results = None
+            worker.failures += 1
+            if worker.last_error is None:
+                worker.last_error = f"exited with code {exitcode}"
+            if worker.failures > self.max_restarts:
+                self.error = (
+                    f"Detector worker {worker.index} failed {worker.failures} times in a row, "
+                    f"giving up: {worker.last_error}"
+                )
+                self._settled.set()
+                # Wake submitters blocked on a free slot so they see the failure.
+                self._lock.notify_all()
+                return
+            worker.restarts += 1
+            delay = min(self.max_backoff_sec, self.restart_backoff_sec * 2 ** (worker.failures - 1))
+            worker.respawn_at = time.monotonic() + delay
+
+    def _fail_in_flight(self, worker: _Worker, exc: Exception) -> None:
+        with self._lock:
+            job_ids = list(worker.in_flight)
+        for job_id in job_ids:
+            self._finish(worker, job_id, exception=exc)
+
+    def _finish(
+        self,
+        worker: _Worker,
+        job_id: int,
+        result: Any = None,
+        exception: Exception | None = None,
+    ) -> None:
+        with self._lock:
+            entry = worker.in_flight.pop(job_id, None)
+            if entry is None:
+                return
+            future, slot_index = entry
+            worker.free_slots.append(slot_index)
+            worker.completed += 1
+            self._lock.notify()
+
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
@@ -1,30 +1,52 @@
 from __future__ import annotations
 
+import json
 import uuid
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.main import get_conversation_service, get_whisper_service, get_ollama_client
 from app.schemas import ChatResponse, ChatTextRequest
+from app.services.conversation import AudioSegment, ConversationResult
 from app.services.llm_ollama import LLMServiceError
 
 
 router = APIRouter(prefix="/api", tags=["api"])
 
 
+def _audio_url(path: Path) -> str:
+    return f"/static/generated/{path.name}"
+
+
+def _chat_response(result: ConversationResult) -> ChatResponse:
+    return ChatResponse(
+        user_text=result.user_text,
+        ai_text=result.ai_text,
+        ai_audio_url=_audio_url(result.ai_audio_path) if result.ai_audio_path else None,
+        ai_audio_segment_urls=[_audio_url(segment.audio_path) for segment in result.audio_segments] or None,
+        detected_emotion=result.detected_emotion,
+        response_tone=result.response_tone,
+        tone_reason=result.tone_reason,
+        response_source=result.response_source,
+    )
+
+
 @router.get("/health")
-def health(ollama=Depends(get_ollama_client)) -> dict:
+async def health(ollama=Depends(get_ollama_client)) -> dict:
     return {
         "ok": True,
-        "ollama_reachable": ollama.health(),
+        "ollama_reachable": await ollama.health(),
+        "ollama_discovery": ollama.discovery_info(),
+        "ollama_transport": ollama.transport_stats(),
     }
 
 
 @router.post("/chat/text", response_model=ChatResponse)
-def chat_text(payload: ChatTextRequest, conversation=Depends(get_conversation_service)) -> ChatResponse:
+async def chat_text(payload: ChatTextRequest, conversation=Depends(get_conversation_service)) -> ChatResponse:
     try:
-        result = conversation.respond(
+        result = await conversation.respond(
             payload.message,
             payload.with_voice,
             tone_hint=payload.tone_hint,
@@ -43,20 +65,71 @@ def chat_text(payload: ChatTextRequest, conversation=Depends(get_conversation_se
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Text chat failed: {exc}") from exc
 
-    audio_url = f"/static/generated/{result.ai_audio_path.name}" if result.ai_audio_path else None
-    return ChatResponse(
-        user_text=result.user_text,
-        ai_text=result.ai_text,
-        ai_audio_url=audio_url,
-        detected_emotion=result.detected_emotion,
-        response_tone=result.response_tone,
-        tone_reason=result.tone_reason,
-        response_source=result.response_source,
+    return _chat_response(result)
+
+
+@router.post("/chat/text/stream")
+async def chat_text_stream(payload: ChatTextRequest, conversation=Depends(get_conversation_service)) -> StreamingResponse:
+    """Stream the reply as NDJSON while the LLM generates it.
+
+    One ``{"type": "token", "text": ...}`` line per chunk, then a ``done``
+    line with the ``ChatResponse`` fields and ``timings`` (``ttft_ms``
+    separate from ``total_ms``). With ``with_voice`` the reply is spoken
+    sentence by sentence: an ``{"type": "audio", "index", "text",
+    "audio_url"}`` line arrives, in order, as soon as each sentence is
+    synthesized, and ``done`` lists them again in ``ai_audio_segment_urls``.
+    An LLM failure before the first chunk is a 503 like ``/chat/text``;
+    later failures end the stream with an ``error`` line.
+    """
+    events = conversation.respond_stream(
+        payload.message,
+        payload.with_voice,
+        tone_hint=payload.tone_hint,
+        tone_reason=payload.tone_reason,
+        facial_emotion=payload.facial_emotion,
+        audio_emotion=payload.audio_emotion,
     )
+    try:
+        first_event = await anext(events)
+    except LLMServiceError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=(
+                "Text chat failed: local LLM backend unavailable or incompatible. "
+                f"{exc}"
+            ),
+        ) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"Text chat failed: {exc}") from exc
+
+    def encode(event: str | AudioSegment | ConversationResult) -> str:
+        if isinstance(event, ConversationResult):
+            line = {"type": "done", **_chat_response(event).model_dump(), "timings": event.timings}
+        elif isinstance(event, AudioSegment):
+            line = {
+                "type": "audio",
+                "index": event.index,
+                "text": event.text,
+                "audio_url": _audio_url(event.audio_path),
+                "ready_ms": event.ready_ms,
+            }
+        else:
+            line = {"type": "token", "text": event}
+        return json.dumps(line) + "\n"
+
+    async def stream_lines():
+        try:
+            yield encode(first_event)
+            async for event in events:
+                yield encode(event)
+        except Exception as exc:
+            yield json.dumps({"type": "error", "detail": f"Text chat failed: {exc}"}) + "\n"
+
+    return StreamingResponse(stream_lines(), media_type="application/x-ndjson")
 
 
 @router.post("/chat/speech", response_model=ChatResponse)
-def chat_speech(
+async def chat_speech(
     audio: UploadFile = File(...),
     with_voice: bool = Form(False),
     whisper=Depends(get_whisper_service),
@@ -66,8 +139,8 @@ def chat_speech(
     temp_file = Path("tmp/uploads") / f"speech_{uuid.uuid4().hex}{suffix}"
 
     try:
-        user_text = whisper.transcribe_file(audio.file, temp_file)
-        result = conversation.respond(user_text, with_voice)
+        user_text = await whisper.transcribe_file_async(audio.file, temp_file)
+        result = await conversation.respond(user_text, with_voice)
     except LLMServiceError as exc:
         raise HTTPException(
             status_code=503,
@@ -82,13 +155,4 @@ def chat_speech(
         if temp_file.exists():
             temp_file.unlink(missing_ok=True)
 
-    audio_url = f"/static/generated/{result.ai_audio_path.name}" if result.ai_audio_path else None
-    return ChatResponse(
-        user_text=result.user_text,
-        ai_text=result.ai_text,
-        ai_audio_url=audio_url,
-        detected_emotion=result.detected_emotion,
-        response_tone=result.response_tone,
-        tone_reason=result.tone_reason,
-        response_source=result.response_source,
-    )
+    return _chat_response(result)
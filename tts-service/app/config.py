@@ -19,9 +19,15 @@ class Settings:
     ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
     ollama_model: str = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
     ollama_timeout_sec: int = int(os.getenv("OLLAMA_TIMEOUT_SEC", "120"))
+    ollama_connect_timeout_sec: float = float(os.getenv("OLLAMA_CONNECT_TIMEOUT_SEC", "5"))
+    # Open connections to the LLM server; further chats wait for one as
+    # coroutines, not threads.
+    ollama_pool_size: int = int(os.getenv("OLLAMA_POOL_SIZE", "40"))
+    ollama_discovery_ttl_sec: float = float(os.getenv("OLLAMA_DISCOVERY_TTL_SEC", "300"))
     enable_local_fallback: bool = _env_bool("ENABLE_LOCAL_FALLBACK", False)
 
     whisper_model: str = os.getenv("WHISPER_MODEL", "base")
+    whisper_workers: int = int(os.getenv("WHISPER_WORKERS", "1"))
     uploads_dir: Path = Path(os.getenv("UPLOADS_DIR", "tmp/uploads"))
 
     tts_output_dir: Path = Path(os.getenv("TTS_OUTPUT_DIR", "static/generated"))
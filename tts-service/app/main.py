@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from functools import lru_cache
 
 from fastapi import FastAPI
@@ -19,12 +20,15 @@ def get_ollama_client() -> OllamaClient:
         base_url=settings.ollama_base_url,
         model=settings.ollama_model,
         timeout_sec=settings.ollama_timeout_sec,
+        connect_timeout_sec=settings.ollama_connect_timeout_sec,
+        pool_size=settings.ollama_pool_size,
+        discovery_ttl_sec=settings.ollama_discovery_ttl_sec,
     )
 
 
 @lru_cache(maxsize=1)
 def get_whisper_service() -> WhisperService:
-    return WhisperService(settings.whisper_model)
+    return WhisperService(settings.whisper_model, workers=settings.whisper_workers)
 
 
 @lru_cache(maxsize=1)
@@ -37,7 +41,19 @@ def get_conversation_service() -> ConversationService:
     return ConversationService(llm=get_ollama_client(), tts=get_tts_service())
 
 
-app = FastAPI(title=settings.app_name)
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    yield
+    # Only close what was actually created; the getters build lazily.
+    if get_ollama_client.cache_info().currsize:
+        await get_ollama_client().aclose()
+    if get_whisper_service.cache_info().currsize:
+        get_whisper_service().close()
+    if get_tts_service.cache_info().currsize:
+        get_tts_service().close()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
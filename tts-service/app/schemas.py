@@ -16,6 +16,7 @@ class ChatResponse(BaseModel):
     user_text: str
     ai_text: str
     ai_audio_url: Optional[str] = None
+    ai_audio_segment_urls: Optional[list[str]] = None
     detected_emotion: Optional[str] = None
     response_tone: Optional[str] = None
     tone_reason: Optional[str] = None
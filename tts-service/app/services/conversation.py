@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from app.config import settings
 from app.services.llm_ollama import OllamaClient
 from app.services.llm_ollama import LLMServiceError
+from app.services.sentence_splitter import SentenceSplitter
 from app.services.tts_pyttsx3 import Pyttsx3Service
 from app.services.emotion_detector import EmotionDetector
 
@@ -52,6 +55,15 @@ TONE_PROMPTS = {
 }
 
 
+@dataclass
+class AudioSegment:
+    index: int
+    text: str
+    audio_path: Path
+    ready_ms: float
+    tts_ms: float
+
+
 @dataclass
 class ConversationResult:
     user_text: str
@@ -61,6 +73,15 @@ class ConversationResult:
     response_tone: str = "neutral"
     tone_reason: str = ""
     response_source: str = "llm"
+    timings: dict[str, float] = field(default_factory=dict)
+    audio_segments: list[AudioSegment] = field(default_factory=list)
+
+
+@dataclass
+class _PromptContext:
+    prompt: str
+    detected_emotion: str
+    response_tone: str
 
 
 class ConversationService:
@@ -69,7 +90,7 @@ class ConversationService:
         self.tts = tts
         self.emotion_detector = EmotionDetector()
 
-    def respond(
+    async def respond(
         self,
         user_text: str,
         with_voice: bool,
@@ -78,6 +99,142 @@ class ConversationService:
         facial_emotion: str | None = None,
         audio_emotion: str | None = None,
     ) -> ConversationResult:
+        context = self._build_prompt(user_text, tone_hint, tone_reason, facial_emotion, audio_emotion)
+        response_source = "llm"
+        try:
+            ai_text = await self.llm.generate(context.prompt)
+        except LLMServiceError:
+            if settings.enable_local_fallback:
+                # Optional resilience mode when external LLM is down.
+                ai_text = self._local_fallback_reply(user_text, context.detected_emotion)
+                response_source = "fallback"
+            else:
+                raise
+
+        audio_path = await self.tts.synthesize_async(ai_text) if with_voice else None
+        return ConversationResult(
+            user_text=user_text,
+            ai_text=ai_text,
+            ai_audio_path=audio_path,
+            detected_emotion=context.detected_emotion,
+            response_tone=context.response_tone,
+            tone_reason=tone_reason or "",
+            response_source=response_source,
+        )
+
+    async def respond_stream(
+        self,
+        user_text: str,
+        with_voice: bool,
+        tone_hint: str | None = None,
+        tone_reason: str | None = None,
+        facial_emotion: str | None = None,
+        audio_emotion: str | None = None,
+    ) -> AsyncIterator[str | AudioSegment | ConversationResult]:
+        """Yield the reply text chunk by chunk as the LLM streams it, then the full result.
+
+        With voice, every finished sentence is synthesized while the LLM keeps
+        generating, and its ``AudioSegment`` is yielded (in sentence order)
+        as soon as the audio file exists, interleaved with the text chunks.
+
+        The final ``ConversationResult`` carries ``timings``: ``ttft_ms``
+        (request to first chunk), ``llm_ms`` (request to last chunk),
+        ``first_audio_ms`` and ``tts_ms`` (summed synthesis time) when voice
+        was requested, and ``total_ms``.
+        """
+        started = time.perf_counter()
+        context = self._build_prompt(user_text, tone_hint, tone_reason, facial_emotion, audio_emotion)
+        response_source = "llm"
+        timings: dict[str, float] = {}
+        chunks: list[str] = []
+        segments: list[AudioSegment] = []
+        voice = _VoicePipeline(self.tts, started) if with_voice else None
+        try:
+            try:
+                async for event in self._llm_events(context.prompt, voice):
+                    if isinstance(event, AudioSegment):
+                        segments.append(event)
+                        yield event
+                        continue
+                    if not chunks:
+                        timings["ttft_ms"] = _elapsed_ms(started)
+                    chunks.append(event)
+                    if voice is not None:
+                        voice.feed(event)
+                    yield event
+            except LLMServiceError:
+                # Once text has been sent the reply cannot be swapped for a fallback.
+                if chunks or not settings.enable_local_fallback:
+                    raise
+                fallback = self._local_fallback_reply(user_text, context.detected_emotion)
+                timings["ttft_ms"] = _elapsed_ms(started)
+                chunks = [fallback]
+                response_source = "fallback"
+                if voice is not None:
+                    voice.feed(fallback)
+                yield fallback
+            timings["llm_ms"] = _elapsed_ms(started)
+
+            if voice is not None:
+                voice.finish()
+                async for segment in voice.remaining():
+                    segments.append(segment)
+                    yield segment
+                if segments:
+                    timings["first_audio_ms"] = segments[0].ready_ms
+                    timings["tts_ms"] = round(sum(segment.tts_ms for segment in segments), 1)
+        finally:
+            if voice is not None:
+                voice.cancel()
+
+        timings["total_ms"] = _elapsed_ms(started)
+        yield ConversationResult(
+            user_text=user_text,
+            ai_text="".join(chunks).strip(),
+            detected_emotion=context.detected_emotion,
+            response_tone=context.response_tone,
+            tone_reason=tone_reason or "",
+            response_source=response_source,
+            timings=timings,
+            audio_segments=segments,
+        )
+
+    async def _llm_events(
+        self, prompt: str, voice: _VoicePipeline | None
+    ) -> AsyncIterator[str | AudioSegment]:
+        """LLM chunks as they arrive, with voice segments slotted in the moment they are ready."""
+        stream = self.llm.generate_stream(prompt)
+        next_chunk = asyncio.ensure_future(anext(stream, None))
+        try:
+            while True:
+                if voice is not None and not next_chunk.done():
+                    next_segment = asyncio.ensure_future(voice.next_segment())
+                    await asyncio.wait({next_chunk, next_segment}, return_when=asyncio.FIRST_COMPLETED)
+                    if next_segment.done():
+                        segment = next_segment.result()
+                        if segment is not None:
+                            yield segment
+                        continue
+                    next_segment.cancel()
+                chunk = await next_chunk
+                if chunk is None:
+                    return
+                yield chunk
+                next_chunk = asyncio.ensure_future(anext(stream, None))
+        finally:
+            if not next_chunk.done():
+                next_chunk.cancel()
+                await asyncio.gather(next_chunk, return_exceptions=True)
+            await stream.aclose()
+
+    def _build_prompt(
+        self,
+        user_text: str,
+        tone_hint: str | None,
+        tone_reason: str | None,
+        facial_emotion: str | None,
+        audio_emotion: str | None,
+    ) -> _PromptContext:
         # Detect emotion from user input
         detected_emotion = self.emotion_detector.detect(user_text)
         emotion_context = EMOTION_PROMPTS.get(detected_emotion, EMOTION_PROMPTS["neutral"])
@@ -105,27 +262,10 @@ class ConversationService:
             f"User: {user_text}",
             "Rocky:",
         ])
-        prompt = "\n\n".join(prompt_parts)
-        response_source = "llm"
-        try:
-            ai_text = self.llm.generate(prompt)
-        except LLMServiceError:
-            if settings.enable_local_fallback:
-                # Optional resilience mode when external LLM is down.
-                ai_text = self._local_fallback_reply(user_text, detected_emotion)
-                response_source = "fallback"
-            else:
-                raise
-
-        audio_path = self.tts.synthesize(ai_text) if with_voice else None
-        return ConversationResult(
-            user_text=user_text,
-            ai_text=ai_text,
-            ai_audio_path=audio_path,
+        return _PromptContext(
+            prompt="\n\n".join(prompt_parts),
             detected_emotion=detected_emotion,
             response_tone=response_tone,
-            tone_reason=tone_reason or "",
-            response_source=response_source,
         )
 
     @staticmethod
@@ -161,3 +301,73 @@ class ConversationService:
             return "Love that energy. Want to turn it into a quick win on your current task?"
 
         return "I got you. Tell me your goal and constraints, and I will suggest the best next step."
+
+
+class _VoicePipeline:
+    """Synthesizes the reply sentence by sentence while the LLM is still streaming.
+
+    Sentences are queued as the splitter completes them and a single task
+    turns them into audio in order (the TTS engine is single-threaded
+    anyway), so the first sentence is audible while the rest is generated.
+    """
+
+    def __init__(self, tts: Pyttsx3Service, started: float) -> None:
+        self.tts = tts
+        self.started = started
+        self.splitter = SentenceSplitter()
+        self._sentences: asyncio.Queue[str | None] = asyncio.Queue()
+        self._segments: asyncio.Queue[AudioSegment | Exception | None] = asyncio.Queue()
+        self._finished = False
+        self._task = asyncio.create_task(self._run())
+
+    def feed(self, text: str) -> None:
+        for sentence in self.splitter.feed(text):
+            self._sentences.put_nowait(sentence)
+
+    def finish(self) -> None:
+        rest = self.splitter.flush()
+        if rest:
+            self._sentences.put_nowait(rest)
+        self._sentences.put_nowait(None)
+
+    async def next_segment(self) -> AudioSegment | None:
+        """The next synthesized segment, or None once the last one was handed out."""
+        item = await self._segments.get()
+        if item is None:
+            self._finished = True
+        elif isinstance(item, Exception):
+            self._finished = True
+            raise item
+        return item
+
+    async def remaining(self) -> AsyncIterator[AudioSegment]:
+        while not self._finished:
+            segment = await self.next_segment()
+            if segment is not None:
+                yield segment
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+    async def _run(self) -> None:
+        index = 0
+        try:
+            while (sentence := await self._sentences.get()) is not None:
+                tts_started = time.perf_counter()
+                audio_path = await self.tts.synthesize_async(sentence)
+                self._segments.put_nowait(AudioSegment(
+                    index=index,
+                    text=sentence,
+                    audio_path=audio_path,
+                    ready_ms=_elapsed_ms(self.started),
+                    tts_ms=_elapsed_ms(tts_started),
+                ))
+                index += 1
+        except Exception as exc:
+            self._segments.put_nowait(exc)
+            return
+        self._segments.put_nowait(None)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 1)
@@ -1,97 +1,304 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable
 
-import requests
+import httpx
 
 
 class LLMServiceError(RuntimeError):
     """Raised when the configured LLM endpoint cannot serve a completion request."""
 
 
+class _EndpointError(Exception):
+    """One endpoint attempt failed; the message is ``"<path>: <reason>"``."""
+
+
+@dataclass(frozen=True)
+class _Dialect:
+    """How to call one completion endpoint and read its replies."""
+
+    path: str
+    uses_messages: bool
+    parse_text: Callable[[dict], str]
+    parse_chunk: Callable[[dict], str]
+    server_sent_events: bool = False
+
+    def body(self, model_name: str, prompt: str, stream: bool) -> dict:
+        if self.uses_messages:
+            return {"model": model_name, "messages": [{"role": "user", "content": prompt}], "stream": stream}
+        return {"model": model_name, "prompt": prompt, "stream": stream}
+
+
+@dataclass
+class _Discovery:
+    model: str
+    dialect: _Dialect
+    discovered_at: datetime
+    expires_at: float
+
+
 @dataclass
 class OllamaClient:
     base_url: str
     model: str
     timeout_sec: int
+    # Seconds to establish a connection; ``timeout_sec`` is the read timeout.
+    connect_timeout_sec: float = 5.0
+    # Keep-alive connections to the LLM server. Requests beyond this wait
+    # (as coroutines) for a free connection, up to ``timeout_sec``.
+    pool_size: int = 10
+    # How long the resolved model and working endpoint are reused before
+    # /api/tags and the endpoint walk run again; 0 rediscovers on every call.
+    discovery_ttl_sec: float = 300.0
+    _discovery: _Discovery | None = field(default=None, init=False, repr=False)
+    _discovery_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _discovery_stats: dict = field(
+        default_factory=lambda: {"discoveries": 0, "cache_hits": 0, "invalidations": 0, "last_error": None},
+        init=False,
+        repr=False,
+    )
+    _client: httpx.AsyncClient = field(init=False, repr=False)
+    _transport_stats: dict = field(
+        default_factory=lambda: {"requests": 0, "connections_opened": 0}, init=False, repr=False
+    )
+
+    def __post_init__(self) -> None:
+        size = max(1, self.pool_size)
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+            timeout=httpx.Timeout(self.timeout_sec, connect=self.connect_timeout_sec),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
 
-    def generate(self, prompt: str) -> str:
-        base = self.base_url.rstrip("/")
-        model_name = self._resolve_model_name()
-
-        endpoint_candidates = [
-            (
-                "/api/generate",
-                {
-                    "model": model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                },
-                self._extract_generate_text,
-            ),
-            (
-                "/api/chat",
-                {
-                    "model": model_name,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "stream": False,
-                },
-                self._extract_chat_text,
-            ),
-            (
-                "/v1/chat/completions",
-                {
-                    "model": model_name,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "stream": False,
-                },
-                self._extract_openai_chat_text,
-            ),
-        ]
+    def transport_stats(self) -> dict:
+        """Connections opened against requests sent; reuse near 1.0 means keep-alive works."""
+        requests_sent = self._transport_stats["requests"]
+        opened = self._transport_stats["connections_opened"]
+        return {
+            "pool_size": self.pool_size,
+            "connect_timeout_sec": self.connect_timeout_sec,
+            "read_timeout_sec": self.timeout_sec,
+            "requests": requests_sent,
+            "connections_opened": opened,
+            "reuse_ratio": round(1.0 - opened / requests_sent, 4) if requests_sent else 0.0,
+        }
 
+    async def _trace(self, event_name: str, info: dict[str, Any]) -> None:
+        # httpcore's trace extension reports connection set-up and each request.
+        if event_name == "connection.connect_tcp.complete":
+            self._transport_stats["connections_opened"] += 1
+        elif event_name.endswith(".send_request_headers.started"):
+            self._transport_stats["requests"] += 1
+
+    async def generate(self, prompt: str) -> str:
         endpoint_errors: list[str] = []
 
-        for path, body, response_parser in endpoint_candidates:
+        async for model_name, dialect in self._attempts():
             try:
-                response = requests.post(
-                    f"{base}{path}",
-                    json=body,
-                    timeout=self.timeout_sec,
-                )
-            except requests.RequestException as exc:
-                endpoint_errors.append(f"{path}: network error ({exc})")
+                text = await self._generate_with(model_name, dialect, prompt)
+            except _EndpointError as exc:
+                self._forget(model_name, dialect, str(exc))
+                endpoint_errors.append(str(exc))
                 continue
 
-            if response.status_code == 404:
-                endpoint_errors.append(f"{path}: not found (404)")
-                continue
+            self._remember(model_name, dialect)
+            return text
 
-            if response.status_code >= 400:
-                endpoint_errors.append(
-                    f"{path}: HTTP {response.status_code} ({response.text[:200]})"
-                )
-                continue
+        raise self._failed(
+            "No compatible LLM completion endpoint found at "
+            f"{self.base_url}. Tried /api/generate, /api/chat, /v1/chat/completions. "
+            f"Details: {' | '.join(endpoint_errors)}"
+        )
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the reply in text chunks as the LLM produces them.
 
+        Tries the same endpoints as ``generate`` with streaming enabled:
+        Ollama's ``/api/generate`` and ``/api/chat`` send one JSON object per
+        line, ``/v1/chat/completions`` sends server-sent events. Falling back
+        to the next endpoint is only possible until the first chunk has been
+        yielded; a failure after that raises ``LLMServiceError``.
+        """
+        endpoint_errors: list[str] = []
+
+        async for model_name, dialect in self._attempts():
+            produced_text = False
             try:
-                payload = response.json()
-            except ValueError as exc:
-                endpoint_errors.append(f"{path}: invalid JSON response ({exc})")
+                async for text in self._stream_with(model_name, dialect, prompt):
+                    produced_text = True
+                    yield text
+            except _EndpointError as exc:
+                self._forget(model_name, dialect, str(exc))
+                if produced_text:
+                    raise self._failed(str(exc)) from exc
+                endpoint_errors.append(str(exc))
                 continue
 
-            text = response_parser(payload).strip()
-            if text:
-                return text
+            self._remember(model_name, dialect)
+            return
 
-            endpoint_errors.append(f"{path}: empty text in response")
-
-        raise LLMServiceError(
-            "No compatible LLM completion endpoint found at "
+        raise self._failed(
+            "No compatible LLM streaming endpoint found at "
             f"{self.base_url}. Tried /api/generate, /api/chat, /v1/chat/completions. "
             f"Details: {' | '.join(endpoint_errors)}"
         )
 
-    def _resolve_model_name(self) -> str:
-        available_models = self._list_available_models()
+    def discovery_info(self) -> dict:
+        """The cached model/endpoint (if any) and discovery counters, for /api/health."""
+        with self._discovery_lock:
+            discovery = self._discovery
+            info = {**self._discovery_stats, "ttl_sec": self.discovery_ttl_sec}
+        if discovery is None or discovery.expires_at <= time.monotonic():
+            return {"model": None, "endpoint": None, **info}
+        return {
+            "model": discovery.model,
+            "endpoint": discovery.dialect.path,
+            "discovered_at": discovery.discovered_at.isoformat(),
+            "expires_in_sec": round(discovery.expires_at - time.monotonic(), 1),
+            **info,
+        }
+
+    async def _attempts(self) -> AsyncIterator[tuple[str, _Dialect]]:
+        """Model and endpoint pairs to try: the cached pair alone while it works.
+
+        The full discovery below only runs when the caller asks for another
+        attempt, i.e. when there is no cached pair or it just failed.
+        """
+        with self._discovery_lock:
+            discovery = self._discovery
+            if discovery is not None and discovery.expires_at <= time.monotonic():
+                discovery = self._discovery = None
+            if discovery is not None:
+                self._discovery_stats["cache_hits"] += 1
+
+        if discovery is not None:
+            yield discovery.model, discovery.dialect
+
+        model_name = await self._resolve_model_name()
+        for dialect in DIALECTS:
+            yield model_name, dialect
+
+    def _remember(self, model_name: str, dialect: _Dialect) -> None:
+        with self._discovery_lock:
+            current = self._discovery
+            if current is not None and current.model == model_name and current.dialect is dialect:
+                return
+            self._discovery = _Discovery(
+                model=model_name,
+                dialect=dialect,
+                discovered_at=datetime.now(timezone.utc),
+                expires_at=time.monotonic() + self.discovery_ttl_sec,
+            )
+            self._discovery_stats["discoveries"] += 1
+
+    def _forget(self, model_name: str, dialect: _Dialect, reason: str) -> None:
+        """Drop the cached pair if that is what just failed."""
+        with self._discovery_lock:
+            current = self._discovery
+            if current is not None and current.model == model_name and current.dialect is dialect:
+                self._discovery = None
+                self._discovery_stats["invalidations"] += 1
+                self._discovery_stats["last_error"] = reason[:300]
+
+    def _failed(self, message: str) -> LLMServiceError:
+        with self._discovery_lock:
+            self._discovery_stats["last_error"] = message[:300]
+        return LLMServiceError(message)
+
+    async def _generate_with(self, model_name: str, dialect: _Dialect, prompt: str) -> str:
+        path = dialect.path
+        try:
+            response = await self._client.post(
+                f"{self.base_url.rstrip('/')}{path}",
+                json=dialect.body(model_name, prompt, stream=False),
+                extensions={"trace": self._trace},
+            )
+        except httpx.HTTPError as exc:
+            raise _EndpointError(f"{path}: network error ({exc})") from exc
+
+        self._check_status(path, response)
+
+        try:
+            payload = response.json()
+        except ValueError as exc:
+            raise _EndpointError(f"{path}: invalid JSON response ({exc})") from exc
+
+        text = dialect.parse_text(payload).strip()
+        if not text:
+            raise _EndpointError(f"{path}: empty text in response")
+        return text
+
+    async def _stream_with(self, model_name: str, dialect: _Dialect, prompt: str) -> AsyncIterator[str]:
+        path = dialect.path
+        request = self._client.build_request(
+            "POST",
+            f"{self.base_url.rstrip('/')}{path}",
+            json=dialect.body(model_name, prompt, stream=True),
+            extensions={"trace": self._trace},
+        )
+        try:
+            response = await self._client.send(request, stream=True)
+        except httpx.HTTPError as exc:
+            raise _EndpointError(f"{path}: network error ({exc})") from exc
+
+        try:
+            if response.status_code >= 400:
+                await response.aread()
+            self._check_status(path, response)
+
+            produced_text = False
+            try:
+                async for payload in self._iter_stream_payloads(response, dialect.server_sent_events):
+                    text = dialect.parse_chunk(payload)
+                    if text:
+                        produced_text = True
+                        yield text
+            except (httpx.HTTPError, ValueError) as exc:
+                reason = "stream interrupted" if produced_text else "invalid stream"
+                raise _EndpointError(f"{path}: {reason} ({exc})") from exc
+
+            if not produced_text:
+                raise _EndpointError(f"{path}: empty text in response")
+        finally:
+            await response.aclose()
+
+    @staticmethod
+    def _check_status(path: str, response: httpx.Response) -> None:
+        if response.status_code == 404:
+            raise _EndpointError(f"{path}: not found (404)")
+
+        if response.status_code >= 400:
+            raise _EndpointError(f"{path}: HTTP {response.status_code} ({response.text[:200]})")
+
+    @staticmethod
+    async def _iter_stream_payloads(response: httpx.Response, server_sent_events: bool) -> AsyncIterator[dict]:
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            if server_sent_events:
+                if not line.startswith("data:"):
+                    continue
+                line = line[len("data:"):].strip()
+                if line == "[DONE]":
+                    return
+            payload = json.loads(line)
+            if not isinstance(payload, dict):
+                raise ValueError(f"unexpected stream item {line[:200]!r}")
+            if payload.get("error"):
+                raise ValueError(str(payload["error"])[:200])
+            yield payload
+            if payload.get("done") is True:
+                return
+
+    async def _resolve_model_name(self) -> str:
+        available_models = await self._list_available_models()
         if not available_models:
             return self.model
 
@@ -105,10 +312,14 @@ class OllamaClient:
 
         return available_models[0]
 
-    def _list_available_models(self) -> list[str]:
+    async def _list_available_models(self) -> list[str]:
         try:
-            response = requests.get(f"{self.base_url.rstrip('/')}/api/tags", timeout=5)
-        except requests.RequestException:
+            response = await self._client.get(
+                f"{self.base_url.rstrip('/')}/api/tags",
+                timeout=httpx.Timeout(5, connect=self.connect_timeout_sec),
+                extensions={"trace": self._trace},
+            )
+        except httpx.HTTPError:
             return []
 
         if response.status_code >= 400:
@@ -129,10 +340,14 @@ class OllamaClient:
 
         return names
 
-    def health(self) -> bool:
+    async def health(self) -> bool:
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.ok
+            response = await self._client.get(
+                f"{self.base_url}/api/tags",
+                timeout=httpx.Timeout(5, connect=self.connect_timeout_sec),
+                extensions={"trace": self._trace},
+            )
+            return response.is_success
         except Exception:
             return False
 
@@ -156,3 +371,38 @@ class OllamaClient:
         message = first_choice.get("message") or {}
         content = message.get("content")
         return str(content) if content is not None else ""
+
+    @staticmethod
+    def _extract_openai_delta_text(payload: dict) -> str:
+        choices = payload.get("choices") or []
+        if not choices:
+            return ""
+
+        first_choice = choices[0] if isinstance(choices[0], dict) else {}
+        delta = first_choice.get("delta") or {}
+        content = delta.get("content")
+        return str(content) if content is not None else ""
+
+
+# Tried in this order until one answers; Ollama's native endpoints first.
+DIALECTS = (
+    _Dialect(
+        "/api/generate",
+        uses_messages=False,
+        parse_text=OllamaClient._extract_generate_text,
+        parse_chunk=OllamaClient._extract_generate_text,
+    ),
+    _Dialect(
+        "/api/chat",
+        uses_messages=True,
+        parse_text=OllamaClient._extract_chat_text,
+        parse_chunk=OllamaClient._extract_chat_text,
+    ),
+    _Dialect(
+        "/v1/chat/completions",
+        uses_messages=True,
+        parse_text=OllamaClient._extract_openai_chat_text,
+        parse_chunk=OllamaClient._extract_openai_delta_text,
+        server_sent_events=True,
+    ),
+)
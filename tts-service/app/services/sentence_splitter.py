@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import re
+
+
+# End punctuation (plus closing quotes/brackets) followed by whitespace, or a
+# line break. Requiring the whitespace keeps "3.14" or "v1.2" together and
+# means a sentence is only cut once the next token shows it has ended.
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+# Words whose period does not end the sentence ("Dr. Smith", "e.g. this").
+ABBREVIATIONS = frozenset({"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "e.g", "i.e"})
+
+
+class SentenceSplitter:
+    """Cut streamed text into sentences as soon as each one is complete.
+
+    Sentences shorter than ``min_chars`` are merged with the next one so the
+    TTS engine is not started for fragments like "Sure." on their own.
+    """
+
+    def __init__(self, min_chars: int = 20) -> None:
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        self._buffer += text
+        sentences: list[str] = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            if self._ends_abbreviation(match.start()):
+                continue
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest
+
+    def _ends_abbreviation(self, end: int) -> bool:
+        if self._buffer[end] != ".":
+            return False
+        words = self._buffer[:end].rsplit(maxsplit=1)
+        return bool(words) and words[-1].lstrip("\"'([").lower() in ABBREVIATIONS
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import BinaryIO
 
@@ -7,8 +9,11 @@ import whisper
 
 
 class WhisperService:
-    def __init__(self, model_name: str) -> None:
+    def __init__(self, model_name: str, workers: int = 1) -> None:
         self.model = whisper.load_model(model_name)
+        # Transcription is CPU-bound; it runs here instead of on the event
+        # loop or the threadpool that serves requests.
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="whisper")
 
     def transcribe_file(self, source_file: BinaryIO, destination: Path) -> str:
         destination.parent.mkdir(parents=True, exist_ok=True)
@@ -20,3 +25,11 @@ class WhisperService:
         if not text:
             raise RuntimeError("Whisper could not transcribe speech")
         return text
+
+    async def transcribe_file_async(self, source_file: BinaryIO, destination: Path) -> str:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.transcribe_file, source_file, destination
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pyttsx3
@@ -13,6 +15,9 @@ class Pyttsx3Service:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.rate = rate
         self._lock = threading.Lock()
+        # Synthesis is serialized by the lock anyway; one dedicated thread
+        # keeps it off the event loop and out of the request threadpool.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
         self._female_voice_id = self._find_female_voice()
 
     def _find_female_voice(self) -> str | None:
@@ -56,3 +61,9 @@ class Pyttsx3Service:
         if not output_file.exists():
             raise RuntimeError("TTS output file was not generated")
         return output_file
+
+    async def synthesize_async(self, text: str) -> Path:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.synthesize, text)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,74 @@
+"""Shared fixtures: stand-in Whisper and pyttsx3 modules and a mocked LLM server.
+
+The stubs are installed before ``app`` is imported, so the tests need
+neither model weights nor a speech engine. ``ollama_client`` wires an
+``OllamaClient`` to ``httpx.MockTransport``. ``app.main`` mounts ``static``
+relative to the working directory, so run the tests from the service folder.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import types
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+SERVICE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SERVICE_DIR))
+
+_scratch = Path(tempfile.mkdtemp(prefix="tts-service-tests-"))
+os.environ.setdefault("TTS_OUTPUT_DIR", str(_scratch / "generated"))
+os.environ.setdefault("UPLOADS_DIR", str(_scratch / "uploads"))
+
+
+class FakeWhisperModel:
+    def transcribe(self, path: str) -> dict:
+        return {"text": " hello from audio "}
+
+
+class FakeTTSEngine:
+    """Writes the text itself as the "audio" so tests can read back what was spoken."""
+
+    def getProperty(self, name: str) -> list:
+        return []
+
+    def setProperty(self, name: str, value) -> None:
+        pass
+
+    def save_to_file(self, text: str, path: str) -> None:
+        Path(path).write_text(text, encoding="utf-8")
+
+    def runAndWait(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def quit(self) -> None:
+        pass
+
+
+whisper_stub = types.ModuleType("whisper")
+whisper_stub.load_model = lambda name: FakeWhisperModel()
+pyttsx3_stub = types.ModuleType("pyttsx3")
+pyttsx3_stub.init = FakeTTSEngine
+sys.modules["whisper"] = whisper_stub
+sys.modules["pyttsx3"] = pyttsx3_stub
+
+from app.services.llm_ollama import OllamaClient  # noqa: E402
+
+
+def ollama_client(handler: Callable[[httpx.Request], httpx.Response], **kwargs) -> OllamaClient:
+    """An ``OllamaClient`` whose requests are answered by ``handler``."""
+    client = OllamaClient(base_url="http://llm.test", model="test-model", timeout_sec=5, **kwargs)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def ndjson(*payloads: dict) -> bytes:
+    return "".join(json.dumps(payload) + "\n" for payload in payloads).encode()
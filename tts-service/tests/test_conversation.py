@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+from app.services.conversation import AudioSegment, ConversationResult, ConversationService
+from conftest import ollama_client
+
+REPLY = ["The first sentence is here. ", "A second one follows it. ", "And a short tail"]
+
+
+def streaming_llm(chunks: list[str], delay: float):
+    """``/api/generate`` streaming ``chunks`` with ``delay`` seconds between them."""
+
+    async def body():
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield (json.dumps({"response": chunk}) + "\n").encode()
+        yield b'{"response": "", "done": true}\n'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/generate":
+            return httpx.Response(404)
+        return httpx.Response(200, content=body())
+
+    return handler
+
+
+class RecordingTTS:
+    """Synthesis that gets faster with every sentence, to catch reordering."""
+
+    def __init__(self, output_dir: Path) -> None:
+        self.output_dir = output_dir
+        self.spoken: list[str] = []
+
+    async def synthesize_async(self, text: str) -> Path:
+        await asyncio.sleep(max(0.0, 0.06 - 0.03 * len(self.spoken)))
+        self.spoken.append(text)
+        path = self.output_dir / f"segment_{len(self.spoken)}.wav"
+        path.write_text(text, encoding="utf-8")
+        return path
+
+
+def run_stream(service: ConversationService, with_voice: bool) -> list:
+    async def run() -> list:
+        return [event async for event in service.respond_stream("hello", with_voice)]
+
+    return asyncio.run(run())
+
+
+def test_voice_segments_arrive_in_sentence_order_while_text_streams(tmp_path):
+    tts = RecordingTTS(tmp_path)
+    service = ConversationService(llm=ollama_client(streaming_llm(REPLY, delay=0.1)), tts=tts)
+
+    events = run_stream(service, with_voice=True)
+
+    *stream, result = events
+    segments = [event for event in stream if isinstance(event, AudioSegment)]
+    assert isinstance(result, ConversationResult)
+    assert [segment.index for segment in segments] == [0, 1, 2]
+    assert [segment.text for segment in segments] == [text.strip() for text in REPLY]
+    assert tts.spoken == [segment.text for segment in segments]
+    assert result.audio_segments == segments
+    assert result.ai_text == "".join(REPLY).strip()
+    # The first sentence is spoken while the LLM is still producing the rest.
+    first_audio = stream.index(segments[0])
+    assert any(isinstance(event, str) for event in stream[first_audio:])
+    assert result.timings["first_audio_ms"] < result.timings["llm_ms"]
+
+
+def test_text_only_stream_does_not_synthesize(tmp_path):
+    tts = RecordingTTS(tmp_path)
+    service = ConversationService(llm=ollama_client(streaming_llm(REPLY, delay=0)), tts=tts)
+
+    *stream, result = run_stream(service, with_voice=False)
+
+    assert stream == REPLY
+    assert tts.spoken == [] and result.audio_segments == []
+    assert "first_audio_ms" not in result.timings
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.llm_ollama import DIALECTS, LLMServiceError, _EndpointError
+from conftest import ndjson, ollama_client
+
+GENERATE, CHAT, OPENAI = DIALECTS
+
+
+async def collect(client, dialect) -> list[str]:
+    try:
+        return [text async for text in client._stream_with("test-model", dialect, "hi")]
+    finally:
+        await client.aclose()
+
+
+def test_ndjson_stream_stops_at_done_and_skips_blank_lines():
+    body = ndjson({"response": "Hel"}, {"response": ""}, {"response": "lo", "done": False})
+    body += b"\n" + ndjson({"response": "!", "done": True}, {"response": "after done"})
+    client = ollama_client(lambda request: httpx.Response(200, content=body))
+
+    assert asyncio.run(collect(client, GENERATE)) == ["Hel", "lo", "!"]
+
+
+def test_chat_stream_reads_message_content():
+    body = ndjson({"message": {"role": "assistant", "content": "Hi"}}, {"message": {}, "done": True})
+    client = ollama_client(lambda request: httpx.Response(200, content=body))
+
+    assert asyncio.run(collect(client, CHAT)) == ["Hi"]
+
+
+def test_sse_stream_ignores_comments_and_stops_at_done_marker():
+    def event(text: str) -> str:
+        return "data: " + json.dumps({"choices": [{"delta": {"content": text}}]}) + "\n\n"
+
+    body = ": keep-alive\n\n" + event("Hi") + 'data: {"choices": []}\n\n' + event(" there") + "data: [DONE]\n\n"
+    body += event("after done")
+    client = ollama_client(lambda request: httpx.Response(200, content=body.encode()))
+
+    assert asyncio.run(collect(client, OPENAI)) == ["Hi", " there"]
+
+
+@pytest.mark.parametrize(
+    ("body", "reason"),
+    [
+        (ndjson({"error": "model not loaded"}), "invalid stream"),
+        (b"[1, 2]\n", "invalid stream"),
+        (ndjson({"response": "Hi"}) + b"{broken\n", "stream interrupted"),
+        (ndjson({"response": "", "done": True}), "empty text"),
+    ],
+)
+def test_stream_errors_name_the_endpoint(body, reason):
+    client = ollama_client(lambda request: httpx.Response(200, content=body))
+
+    with pytest.raises(_EndpointError, match=f"^/api/generate: {reason}"):
+        asyncio.run(collect(client, GENERATE))
+
+
+def test_failure_after_the_first_chunk_is_not_retried_elsewhere():
+    paths = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path == "/api/tags":
+            return httpx.Response(404)
+        return httpx.Response(200, content=ndjson({"response": "Hi"}) + b"{broken\n")
+
+    client = ollama_client(handler)
+
+    async def run() -> list[str]:
+        chunks = []
+        try:
+            async for text in client.generate_stream("hi"):
+                chunks.append(text)
+        finally:
+            await client.aclose()
+        return chunks
+
+    with pytest.raises(LLMServiceError, match="stream interrupted"):
+        asyncio.run(run())
+    assert paths == ["/api/tags", "/api/generate"]
+
+
+class FakeServer:
+    """``/api/tags`` plus the three completion endpoints, each failing on demand."""
+
+    def __init__(self, *working: str) -> None:
+        self.working = set(working)
+        self.requests: list[tuple[str, dict | None]] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/api/tags":
+            self.requests.append((path, None))
+            return httpx.Response(200, json={"models": [{"name": "other:latest"}, {"name": "llama3.2:3b"}]})
+        self.requests.append((path, json.loads(request.content)))
+        if path not in self.working:
+            return httpx.Response(404 if path == "/api/generate" else 500, text="nope")
+        if path == "/api/generate":
+            return httpx.Response(200, json={"response": "from generate"})
+        if path == "/api/chat":
+            return httpx.Response(200, json={"message": {"content": "from chat"}})
+        return httpx.Response(200, json={"choices": [{"message": {"content": "from openai"}}]})
+
+    def paths(self) -> list[str]:
+        paths = [path for path, _ in self.requests]
+        self.requests.clear()
+        return paths
+
+
+def generate(client, times: int = 1) -> list[str]:
+    async def run() -> list[str]:
+        return [await client.generate("hi") for _ in range(times)]
+
+    return asyncio.run(run())
+
+
+def test_endpoints_are_tried_in_order_with_the_preferred_model():
+    server = FakeServer("/v1/chat/completions")
+    client = ollama_client(server)
+
+    assert generate(client) == ["from openai"]
+
+    bodies = dict(server.requests)
+    assert server.paths() == ["/api/tags", "/api/generate", "/api/chat", "/v1/chat/completions"]
+    assert bodies["/api/generate"] == {"model": "llama3.2:3b", "prompt": "hi", "stream": False}
+    assert bodies["/v1/chat/completions"]["messages"] == [{"role": "user", "content": "hi"}]
+
+
+def test_working_pair_is_cached_until_it_fails():
+    server = FakeServer("/v1/chat/completions")
+    client = ollama_client(server)
+    generate(client)
+    server.paths()
+
+    assert generate(client, times=2) == ["from openai", "from openai"]
+    assert server.paths() == ["/v1/chat/completions", "/v1/chat/completions"]
+
+    server.working = {"/api/generate"}
+    assert generate(client) == ["from generate"]
+    assert server.paths() == ["/v1/chat/completions", "/api/tags", "/api/generate"]
+
+    info = client.discovery_info()
+    assert (info["model"], info["endpoint"]) == ("llama3.2:3b", "/api/generate")
+    assert (info["discoveries"], info["cache_hits"], info["invalidations"]) == (2, 3, 1)
+    assert info["last_error"].startswith("/v1/chat/completions: HTTP 500")
+
+
+def test_zero_ttl_rediscovers_on_every_call():
+    server = FakeServer("/api/generate")
+    client = ollama_client(server, discovery_ttl_sec=0)
+
+    generate(client, times=2)
+
+    assert server.paths() == ["/api/tags", "/api/generate"] * 2
+    assert client.discovery_info()["endpoint"] is None
+
+
+def test_remember_and_forget_only_touch_the_cached_pair():
+    client = ollama_client(FakeServer())
+    client._remember("m", GENERATE)
+    client._remember("m", GENERATE)
+    client._forget("m", CHAT, "chat failed")
+    client._forget("other", GENERATE, "other model failed")
+
+    info = client.discovery_info()
+    assert (info["endpoint"], info["discoveries"], info["invalidations"]) == ("/api/generate", 1, 0)
+
+    client._forget("m", GENERATE, "generate failed")
+    info = client.discovery_info()
+    assert (info["endpoint"], info["invalidations"], info["last_error"]) == (None, 1, "generate failed")
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app, get_conversation_service, get_tts_service
+from app.services.conversation import ConversationService
+from conftest import ndjson, ollama_client
+
+
+def generate_handler(*chunks: str, tail: bytes = b"", status: int = 200):
+    """Serve ``chunks`` from a streaming ``/api/generate`` and 404 everything else."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/api/generate":
+            return httpx.Response(404)
+        if status != 200:
+            return httpx.Response(status, text="boom")
+        if not json.loads(request.content)["stream"]:
+            return httpx.Response(200, json={"response": "".join(chunks)})
+        body = ndjson(*({"response": chunk} for chunk in chunks), {"response": "", "done": True})
+        return httpx.Response(200, content=tail or body)
+
+    return handler
+
+
+@pytest.fixture
+def use_llm():
+    def install(handler) -> None:
+        conversation = ConversationService(llm=ollama_client(handler), tts=get_tts_service())
+        app.dependency_overrides[get_conversation_service] = lambda: conversation
+
+    yield install
+    app.dependency_overrides.clear()
+
+
+def stream_lines(message: str, **body) -> tuple[int, list[dict]]:
+    with TestClient(app).stream("POST", "/api/chat/text/stream", json={"message": message, **body}) as response:
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+        return response.status_code, lines
+
+
+def test_text_stream_sends_tokens_then_done(use_llm):
+    use_llm(generate_handler("Hi", " there", "!"))
+
+    status, lines = stream_lines("hello")
+
+    assert status == 200
+    *tokens, done = lines
+    assert tokens == [{"type": "token", "text": text} for text in ("Hi", " there", "!")]
+    assert done["type"] == "done"
+    assert done["ai_text"] == "Hi there!"
+    assert done["user_text"] == "hello"
+    assert done["response_source"] == "llm"
+    assert done["ai_audio_url"] is None and done["ai_audio_segment_urls"] is None
+    assert 0 <= done["timings"]["ttft_ms"] <= done["timings"]["llm_ms"] <= done["timings"]["total_ms"]
+
+
+def test_text_stream_is_503_when_the_llm_fails_before_the_first_token(use_llm):
+    use_llm(generate_handler(status=500))
+
+    response = TestClient(app).post("/api/chat/text/stream", json={"message": "hello"})
+
+    assert response.status_code == 503
+    assert "local LLM backend unavailable" in response.json()["detail"]
+
+
+def test_text_stream_ends_with_an_error_line_after_a_late_failure(use_llm):
+    use_llm(generate_handler(tail=ndjson({"response": "Hi"}) + b"{broken\n"))
+
+    status, lines = stream_lines("hello")
+
+    assert status == 200
+    assert lines[0] == {"type": "token", "text": "Hi"}
+    assert lines[-1]["type"] == "error"
+    assert "stream interrupted" in lines[-1]["detail"]
+
+
+def test_concurrent_chats_wait_on_the_llm_together(use_llm):
+    chats = 5
+    arrived = 0
+    all_arrived = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal arrived
+        if request.url.path != "/api/generate":
+            return httpx.Response(404)
+        arrived += 1
+        if arrived == chats:
+            all_arrived.set()
+        # Only answers once every chat is waiting, so a serialized path would time out.
+        await asyncio.wait_for(all_arrived.wait(), timeout=2)
+        return httpx.Response(200, json={"response": "Hi"})
+
+    use_llm(handler)
+
+    async def run() -> list[httpx.Response]:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                *(client.post("/api/chat/text", json={"message": f"hello {index}"}) for index in range(chats))
+            )
+
+    responses = asyncio.run(run())
+
+    assert [response.status_code for response in responses] == [200] * chats
+    assert {response.json()["ai_text"] for response in responses} == {"Hi"}
+
+
+def test_speech_chat_transcribes_and_speaks_the_reply(use_llm):
+    use_llm(generate_handler("Nice to hear you."))
+
+    response = TestClient(app).post(
+        "/api/chat/speech",
+        files={"audio": ("clip.webm", b"not really audio", "audio/webm")},
+        data={"with_voice": "true"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["user_text"], body["ai_text"]) == ("hello from audio", "Nice to hear you.")
+    spoken = settings.tts_output_dir / body["ai_audio_url"].rsplit("/", 1)[-1]
+    assert spoken.read_text(encoding="utf-8") == "Nice to hear you."
+
+
+def test_voice_stream_sends_audio_lines_in_order(use_llm):
+    use_llm(generate_handler("This is the first sentence. ", "Here comes the second one. ", "Bye"))
+
+    status, lines = stream_lines("hello", with_voice=True)
+
+    assert status == 200
+    audio = [line for line in lines if line["type"] == "audio"]
+    assert [line["index"] for line in audio] == [0, 1, 2]
+    assert [line["text"] for line in audio] == ["This is the first sentence.", "Here comes the second one.", "Bye"]
+    assert lines[-1]["ai_audio_segment_urls"] == [line["audio_url"] for line in audio]
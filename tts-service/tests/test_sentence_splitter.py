@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from app.services.sentence_splitter import SentenceSplitter
+
+
+def split(*chunks: str) -> tuple[list[str], str]:
+    splitter = SentenceSplitter()
+    sentences = [sentence for chunk in chunks for sentence in splitter.feed(chunk)]
+    return sentences, splitter.flush()
+
+
+def test_sentences_are_cut_once_the_next_token_starts():
+    assert split("That is a good first step. ", "Now try ") == (["That is a good first step."], "Now try")
+    assert split("That is a good first step.") == ([], "That is a good first step.")
+
+
+def test_token_boundaries_do_not_change_the_split():
+    text = "Keep going, you are close! Is the build green now? Great work today. "
+    whole = split(text)
+    assert split(*text) == whole
+    # The last sentence is under min_chars, so it waits for more text or the flush.
+    assert whole == (["Keep going, you are close!", "Is the build green now?"], "Great work today.")
+
+
+def test_short_sentences_are_merged_with_the_next_one():
+    assert split("Sure. That sounds like a plan to me. ") == (["Sure. That sounds like a plan to me."], "")
+
+
+def test_abbreviations_and_decimals_do_not_end_a_sentence():
+    sentences, rest = split("Yesterday I talked with Dr. Smith about it. Pi is about 3.14 in e.g. circles. ")
+    assert sentences == ["Yesterday I talked with Dr. Smith about it.", "Pi is about 3.14 in e.g. circles."]
+    assert rest == ""
+
+
+def test_closing_quotes_and_line_breaks_end_a_sentence():
+    sentences, rest = split('She said "that is really nice." Then a line without a stop\n', "and a tail")
+    assert sentences == ['She said "that is really nice."', "Then a line without a stop"]
+    assert rest == "and a tail"
+
+
+def test_trailing_fragment_without_terminator_is_flushed_once():
+    splitter = SentenceSplitter()
+    assert splitter.feed("This part is long enough to speak. and then it just stops") == [
+        "This part is long enough to speak."
+    ]
+    assert splitter.flush() == "and then it just stops"
+    assert splitter.flush() == ""
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.llm_ollama import OllamaClient
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Minimal HTTP/1.1 Ollama: ``/api/tags`` and a non-streaming ``/api/generate``."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._reply({"models": [{"name": "test-model"}]})
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._reply({"response": "hello"})
+
+    def _reply(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sequential_requests_reuse_one_connection(server_url):
+    client = OllamaClient(base_url=server_url, model="test-model", timeout_sec=5, pool_size=4)
+
+    async def run() -> None:
+        try:
+            for _ in range(5):
+                assert await client.generate("hi") == "hello"
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+    # /api/tags once for discovery, then five generates on the same socket.
+    assert client.transport_stats() == {
+        "pool_size": 4,
+        "connect_timeout_sec": 5.0,
+        "read_timeout_sec": 5,
+        "requests": 6,
+        "connections_opened": 1,
+        "reuse_ratio": round(1 - 1 / 6, 4),
+    }
+
+
+def test_concurrent_requests_open_at_most_pool_size_connections(server_url):
+    client = OllamaClient(base_url=server_url, model="test-model", timeout_sec=5, pool_size=2)
+
+    async def run() -> None:
+        try:
+            await client.generate("warm up")
+            await asyncio.gather(*(client.generate("hi") for _ in range(10)))
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+    stats = client.transport_stats()
+    assert stats["requests"] == 12
+    assert 1 <= stats["connections_opened"] <= 2
+
+
+def test_transport_stats_before_any_request():
+    client = OllamaClient(base_url="http://llm.test", model="test-model", timeout_sec=5)
+
+    stats = client.transport_stats()
+
+    assert (stats["requests"], stats["connections_opened"], stats["reuse_ratio"]) == (0, 0, 0.0)
+    asyncio.run(client.aclose())